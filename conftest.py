@@ -11,7 +11,10 @@ from src.characters.models import Base, Character
 from src.films.models import Film
 from src.main import app
 from src.starships.models import Starship
+from src.users.models import User
+from src.utils.pagination import count_cache
 from src.utils.session import get_session
+from src.votes.model import Vote
 
 # Use an in-memory SQLite database for testing
 TEST_DB_URL = "sqlite+aiosqlite:///:memory:"
@@ -58,6 +61,33 @@ async def client(session: AsyncSession):
     app.dependency_overrides.clear()
 
 
+# ---------------------------------------------------------------------------- #
+#                              Redis Fixtures                                  #
+# ---------------------------------------------------------------------------- #
+class InMemoryRedis:
+    """The part of the Redis client used by the app, kept in a dict (no TTL)."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value, ex: int | None = None) -> None:
+        self.data[key] = str(value).encode()
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch) -> InMemoryRedis:
+    """Serve the Redis caches from memory."""
+    client = InMemoryRedis()
+    monkeypatch.setattr(count_cache, "_client", lambda: client)
+    return client
+
+
 # ---------------------------------------------------------------------------- #
 #                           Generic Fixtures                                   #
 # ---------------------------------------------------------------------------- #
@@ -112,10 +142,34 @@ class StarshipFactory(AsyncSQLAlchemyFactory):
     url = factory.Sequence(lambda n: f"https://example.invalid/film-{n}")
 
 
+class UserFactory(AsyncSQLAlchemyFactory):
+    """Factory for creating User instances."""
+
+    class Meta:
+        model = User
+
+    email = factory.Sequence(lambda n: f"user-{n}@example.invalid")
+    password = factory.Faker("password")
+    full_name = factory.Faker("name")
+    is_active = True
+
+
+class VoteFactory(AsyncSQLAlchemyFactory):
+    """Factory for creating Vote instances."""
+
+    class Meta:
+        model = Vote
+
+    value = factory.Faker("random_int", min=1, max=5)
+    feedback = factory.Faker("sentence")
+
+
 @pytest.fixture(autouse=True)
 async def _wire_factories(session: AsyncSession):
     """Automatically wire factories to the test session."""
     CharacterFactory._meta.sqlalchemy_session = session
     FilmFactory._meta.sqlalchemy_session = session
     StarshipFactory._meta.sqlalchemy_session = session
+    UserFactory._meta.sqlalchemy_session = session
+    VoteFactory._meta.sqlalchemy_session = session
     yield
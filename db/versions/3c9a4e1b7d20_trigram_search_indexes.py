@@ -0,0 +1,45 @@
+"""trigram search indexes
+
+Revision ID: 3c9a4e1b7d20
+Revises: f798c1bb9445
+Create Date: 2026-10-18 10:12:41.503188
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9a4e1b7d20"
+down_revision: Union[str, Sequence[str], None] = "f798c1bb9445"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column) of every pg_trgm GIN index.
+TRIGRAM_INDEXES = (
+    ("ix_characters_name_trgm", "characters", "name"),
+    ("ix_films_title_trgm", "films", "title"),
+    ("ix_starships_name_trgm", "starships", "name"),
+    ("ix_votes_feedback_trgm", "votes", "feedback"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, table_name, column_name in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name,
+            table_name,
+            [column_name],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column_name: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for index_name, table_name, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,63 @@
+"""film vote stats
+
+Revision ID: 8d2f6b0e4a17
+Revises: 3c9a4e1b7d20
+Create Date: 2026-10-18 14:03:27.118406
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2f6b0e4a17"
+down_revision: Union[str, Sequence[str], None] = "3c9a4e1b7d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    counter = dict(nullable=False, server_default="0")
+    op.create_table(
+        "film_vote_stats",
+        sa.Column("film_id", sa.Integer(), nullable=False),
+        sa.Column("vote_count", sa.Integer(), **counter),
+        sa.Column("vote_sum", sa.Integer(), **counter),
+        sa.Column("count_1", sa.Integer(), **counter),
+        sa.Column("count_2", sa.Integer(), **counter),
+        sa.Column("count_3", sa.Integer(), **counter),
+        sa.Column("count_4", sa.Integer(), **counter),
+        sa.Column("count_5", sa.Integer(), **counter),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["film_id"], ["films.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("film_id"),
+    )
+    # Backfill from the existing votes.
+    op.execute(
+        """
+        INSERT INTO film_vote_stats (
+            film_id, vote_count, vote_sum, count_1, count_2, count_3, count_4, count_5
+        )
+        SELECT
+            film_id,
+            count(*),
+            sum(value),
+            count(*) FILTER (WHERE value = 1),
+            count(*) FILTER (WHERE value = 2),
+            count(*) FILTER (WHERE value = 3),
+            count(*) FILTER (WHERE value = 4),
+            count(*) FILTER (WHERE value = 5)
+        FROM votes
+        GROUP BY film_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("film_vote_stats")
@@ -0,0 +1,34 @@
+"""sync fingerprints
+
+Revision ID: b7e3c1f9a2d5
+Revises: 8d2f6b0e4a17
+Create Date: 2026-10-18 16:41:09.274113
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3c1f9a2d5"
+down_revision: Union[str, Sequence[str], None] = "8d2f6b0e4a17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables synced from upstream. Existing rows have no fingerprint until the
+# next sync rewrites them once.
+SYNCED_TABLES = ("films", "characters", "starships")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in SYNCED_TABLES:
+        op.add_column(table, sa.Column("fingerprint", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in SYNCED_TABLES:
+        op.drop_column(table, "fingerprint")
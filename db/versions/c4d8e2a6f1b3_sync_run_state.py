@@ -0,0 +1,39 @@
+"""sync run state
+
+Revision ID: c4d8e2a6f1b3
+Revises: b7e3c1f9a2d5
+Create Date: 2026-10-18 19:12:45.508316
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d8e2a6f1b3"
+down_revision: Union[str, Sequence[str], None] = "b7e3c1f9a2d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables synced from upstream. Existing rows are stamped by the next sync that
+# sees them, and the relationship URLs change the film fingerprints, so the
+# next sync rewrites every film once with its URLs.
+SYNCED_TABLES = ("films", "characters", "starships")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in SYNCED_TABLES:
+        op.add_column(table, sa.Column("synced_at", sa.DateTime(), nullable=True))
+    op.add_column("films", sa.Column("character_urls", sa.JSON(), nullable=True))
+    op.add_column("films", sa.Column("starship_urls", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("films", "starship_urls")
+    op.drop_column("films", "character_urls")
+    for table in SYNCED_TABLES:
+        op.drop_column(table, "synced_at")
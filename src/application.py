@@ -11,9 +11,11 @@ from src.routers import base_router
 from src.settings import settings
 from src.starships.router import starships_router
 from src.users.router import users_router
+from src.utils.password import password_service
 
 # from src.users.router import user_router
 from src.version import __version__
+from src.votes.buffer import vote_buffer
 from src.votes.router import votes_router
 
 logger = logging.getLogger(__name__)
@@ -23,12 +25,16 @@ async def startup_handler() -> None:
     """Dummy startup event, it will be executed before the app is ready, such
     as loading ml model, creating superuser in DB etc."""
     logger.info("Starting up ...")
+    if settings.VOTE_BUFFER_ENABLED:
+        vote_buffer.start()
 
 
 async def shutdown_handler() -> None:
     """Dummy shutdown event, it will be executed before the app is shutting
     down, such as removing temporary files, close DB connection etc."""
     logger.info("Shutting down ...")
+    await vote_buffer.stop()
+    password_service.shutdown()
 
 
 def create_application() -> FastAPI:
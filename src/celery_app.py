@@ -2,8 +2,9 @@ from logging.config import dictConfig
 from typing import Any
 
 from celery import Celery
-from celery.signals import setup_logging
+from celery.signals import setup_logging, worker_process_init, worker_process_shutdown
 
+from src.integrations.worker import worker
 from src.settings import settings
 
 app = Celery("star_wars_characters", broker=settings.CELERY_CONFIG.broker_url)
@@ -25,3 +26,15 @@ def config_loggers(*args: Any, **kwags: Any) -> None:
     specified in the settings.
     """
     dictConfig(settings.LOGGING_CONFIG)
+
+
+@worker_process_init.connect
+def start_worker_runtime(*args: Any, **kwargs: Any) -> None:
+    """Create the event loop and database engine of the worker process."""
+    worker.start()
+
+
+@worker_process_shutdown.connect
+def stop_worker_runtime(*args: Any, **kwargs: Any) -> None:
+    """Close the database connections and event loop of the worker process."""
+    worker.stop()
@@ -3,10 +3,10 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Integer, String
+from sqlalchemy import Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.models import Base, Timestamps, film_characters
+from src.models import Base, Fingerprinted, Timestamps, film_characters
 
 if TYPE_CHECKING:
     from src.films.models import Film  # noqa: F401
@@ -14,10 +14,19 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-class Character(Base, Timestamps):
+class Character(Base, Timestamps, Fingerprinted):
     """Character ORM model."""
 
     __tablename__ = "characters"
+    __table_args__ = (
+        # Serves the substring search (ILIKE) in `CharacterRepository.search`.
+        Index(
+            "ix_characters_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String, nullable=False, index=True)
@@ -34,15 +43,20 @@ class Character(Base, Timestamps):
     )
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Film":
+    def from_dict(cls, data: dict) -> "Character":
         """Create a Character instance from a dictionary."""
+        return cls(**cls.values_from_dict(data))
+
+    @classmethod
+    def values_from_dict(cls, data: dict) -> dict:
+        """Map an upstream dictionary to column values."""
         height = data.get("height")
         if height not in {"unknown", "n/a", "none", ""}:
             height = int(height)
         else:
             height = None
 
-        return cls(
+        return dict(
             name=data["name"],
             height=height,
             hair_color=data.get("hair_color"),
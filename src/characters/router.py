@@ -6,7 +6,9 @@ from fastapi import APIRouter, HTTPException, Path, Query
 
 from src.characters.schemas import CharacterOut
 from src.depends import CharacterServiceDI
-from src.exceptions import ORMNotFoundException
+from src.exceptions import InvalidCursorException, ORMNotFoundException
+from src.repository import LoadProfile
+from src.utils.pagination import AFTER_CURSOR_DESCRIPTION, CountStrategy
 from src.utils.schemas import Page
 
 logger = logging.getLogger(__name__)
@@ -23,9 +25,13 @@ characters_router = APIRouter(
 async def search_characters(
     CharacterServiceDI: CharacterServiceDI,
     query: str = Query(min_length=1),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
 ) -> list[CharacterOut]:
     """Search characters by name."""
-    characters = await CharacterServiceDI.search(query=query)
+    characters = await CharacterServiceDI.search(
+        query=query, limit=limit, offset=offset, profile=LoadProfile.NONE
+    )
     return characters
 
 
@@ -36,9 +42,21 @@ async def list_characters(
     CharacterServiceDI: CharacterServiceDI,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=1000),
+    after: str | None = Query(None, description=AFTER_CURSOR_DESCRIPTION),
+    include_total: bool = Query(True),
+    count_strategy: CountStrategy | None = Query(None),
 ) -> Page[CharacterOut]:
     """Fetch and store all characters in DB."""
-    characters = await CharacterServiceDI.list(page=page, page_size=page_size)
+    try:
+        characters = await CharacterServiceDI.list(
+            page=page,
+            page_size=page_size,
+            after=after,
+            count_strategy=count_strategy if include_total else CountStrategy.NONE,
+            profile=LoadProfile.NONE,
+        )
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
     return characters
 
 
@@ -50,7 +68,7 @@ async def retrieve_character(
 ) -> CharacterOut:
     """Fetch and store all characters in DB."""
     try:
-        character = await CharacterServiceDI.get(id=id)
+        character = await CharacterServiceDI.get(id=id, profile=LoadProfile.NONE)
     except ORMNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail) from e
     return CharacterOut.model_validate(character)
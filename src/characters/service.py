@@ -1,15 +1,17 @@
 import logging
+from typing import AsyncIterable, Iterable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.characters.models import Character
 from src.characters.repository import CharacterRepository
-from src.exceptions import ORMNotFoundException
 from src.service import (
     CreateORMService,
     GetORMService,
     ListPaginationORMService,
     SearchORMService,
+    SyncORMService,
+    SyncReport,
 )
 
 logger = logging.getLogger(__name__)
@@ -20,19 +22,24 @@ class CharacterService(
     GetORMService[Character],
     ListPaginationORMService[Character],
     SearchORMService[Character],
+    SyncORMService[Character],
 ):
     def __init__(self, session: AsyncSession):
         self.session = session
         self._repository = CharacterRepository(session)
         super().__init__(repository=self._repository)
 
-    async def add_characters(self, characters: list[dict]) -> None:
-        """Add multiple characters in DB."""
-        async with self.session.begin():
-            for character_data in characters:
-                character = Character.from_dict(data=character_data)
-                logger.debug(f"Syncing character: {character.name}")
-                try:
-                    await self.by_url(url=character.url)
-                except ORMNotFoundException:
-                    await self.create(obj=character)
+    async def add_characters(
+        self,
+        characters: Iterable[dict] | AsyncIterable[dict],
+        *,
+        prune: bool = False,
+    ) -> SyncReport:
+        """Add or update characters in DB in batches, skipping the unchanged ones.
+
+        With `prune`, `characters` is the whole upstream collection and the
+        characters missing from it are deleted.
+        """
+        report = await self.sync(characters, Character.values_from_dict, prune=prune)
+        logger.debug(f"Synced characters: {report}")
+        return report
@@ -3,27 +3,30 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from src.characters.service import CharacterService
-from src.exceptions import ORMNotFoundException
+from src.models import fingerprint
 
 
 @pytest.mark.asyncio
 async def test_add_characters():
     # Mock dependencies
-    mock_session = AsyncMock()
+    mock_session = MagicMock()
     mock_repository = MagicMock()
-    mock_character = MagicMock()
-    mock_character.name = "Luke Skywalker"
-    mock_character.url = "http://swapi.dev/api/people/1/"
-
-    # Patch Character.from_dict to return a mock character
+    mock_repository.session = mock_session
+    mock_repository.fingerprints = AsyncMock(return_value={})
+    mock_repository.upsert_many = AsyncMock(return_value=[1])
+    character_values = {
+        "name": "Luke Skywalker",
+        "url": "http://swapi.dev/api/people/1/",
+    }
+
+    # Patch Character.values_from_dict to return the column values
     with patch(
-        "src.characters.models.Character.from_dict", return_value=mock_character
+        "src.characters.models.Character.values_from_dict",
+        return_value=character_values,
     ):
         # Instantiate the service
         service = CharacterService(session=mock_session)
         service._repository = mock_repository
-        service.by_url = AsyncMock(side_effect=ORMNotFoundException)
-        service.create = AsyncMock()
 
         # Input data
         characters = [
@@ -31,10 +34,16 @@ async def test_add_characters():
         ]
 
         # Call the method
-        await service.add_characters(characters=characters)
+        report = await service.add_characters(characters=characters)
 
         # Assertions
         mock_session.begin.assert_called_once()
-        service.by_url.assert_awaited_once_with(url="http://swapi.dev/api/people/1/")
-        service.create.assert_awaited_once_with(obj=mock_character)
-        mock_repository.create.assert_not_called()  # Ensure repository create is not directly called
+        mock_repository.upsert_many.assert_awaited_once()
+        (rows,), _ = mock_repository.upsert_many.call_args
+        (row,) = rows
+        assert row == {
+            **character_values,
+            "fingerprint": fingerprint(character_values),
+            "synced_at": row["synced_at"],
+        }
+        assert report.inserted == 1
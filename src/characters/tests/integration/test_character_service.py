@@ -1,4 +1,5 @@
 import logging
+from unittest.mock import patch
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,6 +7,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from conftest import CharacterFactory
 from src.characters.models import Character
 from src.characters.service import CharacterService
+from src.exceptions import ORMNotFoundException
+from src.service import SyncReport
+from src.utils.pagination import CountStrategy, count_cache
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +33,83 @@ class TestCharacterServce:
         assert result.total >= 10
         assert len(result.items) == 5
 
+    async def test_list_cursor(self) -> None:
+        """Test listing characters with a cursor returns the following page."""
+        first_page = await self.service.list(page=1, page_size=5)
+        second_page = await self.service.list(page_size=5, after=first_page.next_cursor)
+        assert second_page.page is None
+        assert len(second_page.items) == 5
+        assert second_page.items[0].id > first_page.items[-1].id
+
+    async def test_list_window_count(self) -> None:
+        """Test the window count strategy returns the exact total."""
+        exact = await self.service.list(page=1, page_size=5)
+        result = await self.service.list(
+            page=1, page_size=5, count_strategy=CountStrategy.WINDOW
+        )
+        assert result.total == exact.total
+        assert result.total_exact is True
+        assert [c.id for c in result.items] == [c.id for c in exact.items]
+
+    async def test_list_without_total(self) -> None:
+        """Test the none count strategy skips the total."""
+        result = await self.service.list(
+            page=1, page_size=5, count_strategy=CountStrategy.NONE
+        )
+        assert result.total is None
+        assert result.pages is None
+        assert result.total_exact is False
+        assert len(result.items) == 5
+
+    async def test_list_cached_count(self) -> None:
+        """Test the cached count strategy reuses the total until invalidated."""
+        first = await self.service.list(
+            page=1, page_size=5, count_strategy=CountStrategy.CACHED
+        )
+        assert first.total_exact is True
+
+        await CharacterFactory.create()
+        cached = await self.service.list(
+            page=1, page_size=5, count_strategy=CountStrategy.CACHED
+        )
+        assert cached.total == first.total
+        assert cached.total_exact is False
+
+        await count_cache.invalidate(Character.__tablename__)
+        refreshed = await self.service.list(
+            page=1, page_size=5, count_strategy=CountStrategy.CACHED
+        )
+        assert refreshed.total == first.total + 1
+
+    async def test_sync_invalidates_cached_count(self, session: AsyncSession) -> None:
+        """Test syncing new characters drops the cached total."""
+        first = await self.service.list(
+            page=1, page_size=5, count_strategy=CountStrategy.CACHED
+        )
+        await session.commit()
+        await self.service.add_characters(
+            [
+                {
+                    "name": "Cached",
+                    "height": "unknown",
+                    "url": "http://swapi.dev/api/people/1200/",
+                }
+            ]
+        )
+        synced = await self.service.list(
+            page=1, page_size=5, count_strategy=CountStrategy.CACHED
+        )
+        assert synced.total == first.total + 1
+        assert synced.total_exact is True
+
+    async def test_list_estimated_count_without_estimate(self) -> None:
+        """Test the estimate strategy reports the exact count it falls back to."""
+        result = await self.service.list(
+            page=1, page_size=5, count_strategy=CountStrategy.ESTIMATE
+        )
+        assert result.total == await self.service._repository.count()
+        assert result.total_exact is True
+
     async def test_get(self) -> None:
         """Test getting a character by ID."""
         character = self.entities[0]
@@ -60,6 +141,112 @@ class TestCharacterServce:
         assert created_character.id is not None
         assert created_character.name == new_character_data["name"]
 
+    async def test_add_characters_updates_existing(self) -> None:
+        """Test syncing characters inserts new rows and updates existing ones."""
+        character = self.entities[0]
+        characters_data = [
+            {"name": "Renamed Character", "height": "172", "url": character.url},
+            {
+                "name": "Synced Character",
+                "height": "unknown",
+                "url": "http://swapi.dev/api/people/1001/",
+            },
+        ]
+        await self.service.add_characters(characters_data)
+
+        updated = await self.service.by_url(character.url)
+        await self.service.session.refresh(updated)
+        assert updated.id == character.id
+        assert updated.name == "Renamed Character"
+        assert updated.height == 172
+
+        added = await self.service.by_url("http://swapi.dev/api/people/1001/")
+        assert added.name == "Synced Character"
+        assert added.height is None
+
+    async def test_add_characters_skips_unchanged(self) -> None:
+        """Test syncing the same characters twice writes nothing the second time."""
+        characters_data = [
+            {
+                "name": "Fingerprinted",
+                "height": "unknown",
+                "url": "http://swapi.dev/api/people/1002/",
+            },
+            {
+                "name": "Also Fingerprinted",
+                "height": "180",
+                "url": "http://swapi.dev/api/people/1003/",
+            },
+        ]
+        report = await self.service.add_characters(characters_data)
+        assert report == SyncReport(inserted=2, updated=0, deleted=0, unchanged=0)
+
+        report = await self.service.add_characters(characters_data)
+        assert report == SyncReport(inserted=0, updated=0, deleted=0, unchanged=2)
+
+        characters_data[1] = {**characters_data[1], "gender": "n/a"}
+        report = await self.service.add_characters(characters_data)
+        assert report == SyncReport(inserted=0, updated=1, deleted=0, unchanged=1)
+        synced = await self.service.by_url("http://swapi.dev/api/people/1003/")
+        assert synced.gender == "n/a"
+        assert synced.fingerprint is not None
+
+    async def test_add_characters_from_async_iterator(self) -> None:
+        """Test syncing streamed characters writes every batch as it arrives."""
+        self.service.SYNC_BATCH_SIZE = 2
+        events = []
+        upsert_many = self.service._repository.upsert_many
+
+        async def record_upsert_many(rows, **kwargs):
+            events.append(f"write {len(rows)}")
+            return await upsert_many(rows, **kwargs)
+
+        async def stream():
+            for n in range(5):
+                events.append(f"read {n}")
+                yield {
+                    "name": f"Streamed {n}",
+                    "height": "unknown",
+                    "url": f"http://swapi.dev/api/people/{1100 + n}/",
+                }
+
+        with patch.object(
+            self.service._repository, "upsert_many", side_effect=record_upsert_many
+        ):
+            report = await self.service.add_characters(stream())
+
+        assert report == SyncReport(inserted=5, updated=0, deleted=0, unchanged=0)
+        assert events == [
+            "read 0",
+            "read 1",
+            "write 2",
+            "read 2",
+            "read 3",
+            "write 2",
+            "read 4",
+            "write 1",
+        ]
+        streamed = await self.service.by_url("http://swapi.dev/api/people/1104/")
+        assert streamed.name == "Streamed 4"
+
+    async def test_add_characters_prune(self) -> None:
+        """Test pruning deletes the characters missing upstream."""
+        kept, removed = self.entities[:2]
+        kept_id, kept_url, removed_url = kept.id, kept.url, removed.url
+        upstream = [{"name": kept.name, "height": "unknown", "url": kept_url}]
+        report = await self.service.add_characters(upstream, prune=True)
+        assert report.deleted >= 1
+        # Unchanged rows are kept, although they are not written.
+        report = await self.service.add_characters(upstream, prune=True)
+        assert report == SyncReport(unchanged=1)
+        # An empty upstream collection deletes nothing.
+        report = await self.service.add_characters([], prune=True)
+        assert report == SyncReport()
+
+        assert (await self.service.by_url(kept_url)).id == kept_id
+        with pytest.raises(ORMNotFoundException):
+            await self.service.by_url(removed_url)
+
     async def test_search(self) -> None:
         """Test searching characters by name."""
         character = self.entities[0]
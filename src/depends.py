@@ -2,7 +2,6 @@ import http
 from typing import Annotated
 
 from fastapi import Depends, HTTPException
-from jwt import InvalidTokenError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.characters.service import CharacterService
@@ -63,20 +62,14 @@ jwt_bearer = JwtHTTPBearer(auth_service=JwtAuthenticationService())
 
 
 async def get_user_id(
-    token: Annotated[str, Depends(jwt_bearer)],
-):
-    """
-    Decode token again to read claims (JwtHTTPBearer only checks validity).
-    Fetch the user and return it, or raise 401/403 as needed.
-    """
-    auth = JwtAuthenticationService()
+    claims: Annotated[dict, Depends(jwt_bearer)],
+) -> int:
+    """Return the ID of the authenticated user from the verified token claims."""
     try:
-        payload = auth.verify(token)
-        user_id = int(payload["sub"])
-    except (InvalidTokenError, KeyError, ValueError):
+        return int(claims["sub"])
+    except (KeyError, ValueError):
         raise HTTPException(
             status_code=http.HTTPStatus.UNAUTHORIZED,
             detail="Invalid or expired token.",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user_id
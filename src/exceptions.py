@@ -26,3 +26,39 @@ class ServicePermissionDenied(Exception):
         self.detail = detail
         self.status_code = http.HTTPStatus.FORBIDDEN
         super().__init__(self.detail)
+
+
+class InvalidCursorException(Exception):
+    """Exception raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self, cursor: str):
+        self.detail = f"Invalid pagination cursor: {cursor!r}."
+        self.status_code = http.HTTPStatus.BAD_REQUEST
+        super().__init__(self.detail)
+
+
+class PasswordServiceBusyException(Exception):
+    """Exception raised when too many password hashes are already in progress."""
+
+    def __init__(self):
+        self.detail = "Too many requests in progress, retry later."
+        self.status_code = http.HTTPStatus.SERVICE_UNAVAILABLE
+        super().__init__(self.detail)
+
+
+class VoteBufferFullException(Exception):
+    """Exception raised when the vote buffer holds too many votes."""
+
+    def __init__(self):
+        self.detail = "Too many votes queued, retry later."
+        self.status_code = http.HTTPStatus.SERVICE_UNAVAILABLE
+        super().__init__(self.detail)
+
+
+class UnknownUserException(Exception):
+    """Exception raised when the authenticated user no longer exists."""
+
+    def __init__(self, id: int):
+        self.detail = f"User with ID {id} does not exist."
+        self.status_code = http.HTTPStatus.UNAUTHORIZED
+        super().__init__(self.detail)
@@ -0,0 +1 @@
+FILM_DETAIL_PROFILE = "film_detail"  # Film with characters and starships
@@ -3,20 +3,29 @@ from __future__ import annotations
 import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import JSON, DateTime, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.models import Base, Timestamps, film_characters, starship_films
+from src.models import Base, Fingerprinted, Timestamps, film_characters, starship_films
 
 if TYPE_CHECKING:
     from src.characters.models import Character  # noqa: F401
     from src.starships.models import Starship  # noqa: F401
 
 
-class Film(Base, Timestamps):
+class Film(Base, Timestamps, Fingerprinted):
     """Starship ORM model."""
 
     __tablename__ = "films"
+    __table_args__ = (
+        # Serves the substring search (ILIKE) in `FilmRepository.search`.
+        Index(
+            "ix_films_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String, index=True)
@@ -25,6 +34,9 @@ class Film(Base, Timestamps):
     producer: Mapped[str] = mapped_column(String, nullable=True)
     release_date: Mapped[DateTime] = mapped_column(DateTime, nullable=True)
     url: Mapped[str] = mapped_column(String, unique=True, index=True)
+    # Upstream URLs of the characters and starships, linked after a sync.
+    character_urls: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
+    starship_urls: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
     characters: Mapped[list["Character"]] = relationship(
         "Character", secondary=film_characters, back_populates="films"
     )
@@ -35,15 +47,22 @@ class Film(Base, Timestamps):
     @classmethod
     def from_dict(cls, data: dict) -> "Film":
         """Create a Film instance from a dictionary."""
+        return cls(**cls.values_from_dict(data))
+
+    @classmethod
+    def values_from_dict(cls, data: dict) -> dict:
+        """Map an upstream dictionary to column values."""
         release_date = data.get("release_date")
         if release_date:
             release_date = datetime.datetime.fromisoformat(release_date)
 
-        return cls(
+        return dict(
             title=data["title"],
             opening_crawl=data.get("opening_crawl"),
             director=data.get("director"),
             producer=data.get("producer"),
             release_date=release_date,
             url=data.get("url"),
+            character_urls=list(data.get("characters", [])),
+            starship_urls=list(data.get("starships", [])),
         )
@@ -1,5 +1,12 @@
+from typing import Iterable
+
+from sqlalchemy import Table, select
+
+from src.films.constants import FILM_DETAIL_PROFILE
 from src.films.models import Film
+from src.models import film_characters, starship_films
 from src.repository import Repository
+from src.utils.iterables import chunked
 
 
 class FilmRepository(Repository[Film]):
@@ -8,3 +15,60 @@ class FilmRepository(Repository[Film]):
     _model = Film
 
     SEARCH_QUERY_ATTR = "title"
+    LOAD_PROFILES = {FILM_DETAIL_PROFILE: ("characters", "starships")}
+
+    async def relationships(self, *, after: int = 0, limit: int) -> list[dict]:
+        """Return the relationship URLs of up to `limit` films, by ID after `after`.
+
+        Films are returned as `{"id", "url", "characters", "starships"}`.
+        """
+        stmt = (
+            select(Film.id, Film.url, Film.character_urls, Film.starship_urls)
+            .where(Film.id > after)
+            .order_by(Film.id)
+            .limit(limit)
+        )
+        return [
+            {
+                "id": id,
+                "url": url,
+                "characters": character_urls or [],
+                "starships": starship_urls or [],
+            }
+            for id, url, character_urls, starship_urls in await self.session.execute(
+                stmt
+            )
+        ]
+
+    async def link_characters(self, links: Iterable[tuple[int, int]]) -> int:
+        """Insert the missing (film_id, character_id) links.
+
+        Returns the number of links that were added.
+        """
+        return await self._link(film_characters, "character_id", links)
+
+    async def link_starships(self, links: Iterable[tuple[int, int]]) -> int:
+        """Insert the missing (film_id, starship_id) links.
+
+        Returns the number of links that were added.
+        """
+        return await self._link(starship_films, "startship_id", links)
+
+    async def _link(
+        self, table: Table, column: str, links: Iterable[tuple[int, int]]
+    ) -> int:
+        """Insert links with multi-row INSERT ... ON CONFLICT DO NOTHING.
+
+        The association primary key does the diffing, so existing links are
+        skipped by the database instead of being loaded and compared.
+        """
+        added = 0
+        for batch in chunked(links, self.UPSERT_BATCH_SIZE):
+            stmt = (
+                self._insert(table)
+                .values([{"film_id": f_id, column: o_id} for f_id, o_id in batch])
+                .on_conflict_do_nothing()
+                .returning(table.c.film_id)
+            )
+            added += len((await self.session.execute(stmt)).all())
+        return added
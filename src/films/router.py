@@ -4,10 +4,13 @@ import logging
 
 from fastapi import APIRouter, HTTPException, Path, Query
 
-from src.depends import FilmServiceDI
-from src.exceptions import ORMNotFoundException
+from src.depends import FilmServiceDI, VoteServiceDI
+from src.exceptions import InvalidCursorException, ORMNotFoundException
+from src.films.constants import FILM_DETAIL_PROFILE
 from src.films.schemas import FilmOut
+from src.utils.pagination import AFTER_CURSOR_DESCRIPTION, CountStrategy
 from src.utils.schemas import Page
+from src.votes.schemas import FilmRatingOut, RankedFilmOut
 
 logger = logging.getLogger(__name__)
 
@@ -21,20 +24,48 @@ films_router = APIRouter(
 async def search_films(
     FilmServiceDI: FilmServiceDI,
     query: str = Query(min_length=1),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
 ) -> list[FilmOut]:
     """Search characters by name."""
-    characters = await FilmServiceDI.search(query=query)
+    characters = await FilmServiceDI.search(
+        query=query, limit=limit, offset=offset, profile=FILM_DETAIL_PROFILE
+    )
     return characters
 
 
+@films_router.get(
+    "/top/", description="GET top rated films", response_model=list[RankedFilmOut]
+)
+async def top_films(
+    VoteServiceDI: VoteServiceDI,
+    limit: int = Query(10, ge=1, le=100),
+) -> list[RankedFilmOut]:
+    """Rank films by Bayesian average rating, from a periodically refreshed ranking."""
+    films = await VoteServiceDI.top_films(limit=limit)
+    return [RankedFilmOut.model_validate(film) for film in films]
+
+
 @films_router.get("/", description="GET films", response_model=Page[FilmOut])
 async def list_films(
     FilmServiceDI: FilmServiceDI,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=1000),
+    after: str | None = Query(None, description=AFTER_CURSOR_DESCRIPTION),
+    include_total: bool = Query(True),
+    count_strategy: CountStrategy | None = Query(None),
 ) -> Page[FilmOut]:
     """Fetch and store all characters in DB."""
-    characters = await FilmServiceDI.list(page=page, page_size=page_size)
+    try:
+        characters = await FilmServiceDI.list(
+            page=page,
+            page_size=page_size,
+            after=after,
+            count_strategy=count_strategy if include_total else CountStrategy.NONE,
+            profile=FILM_DETAIL_PROFILE,
+        )
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
     return characters
 
 
@@ -44,7 +75,21 @@ async def retrieve_films(
 ) -> FilmOut:
     """Fetch and store all characters in DB."""
     try:
-        character = await FilmServiceDI.get(id=id)
+        character = await FilmServiceDI.get(id=id, profile=FILM_DETAIL_PROFILE)
     except ORMNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail) from e
     return FilmOut.model_validate(character)
+
+
+@films_router.get(
+    "/{id}/rating/", description="GET film rating", response_model=FilmRatingOut
+)
+async def retrieve_film_rating(
+    VoteServiceDI: VoteServiceDI, id: int = Path(..., ge=1)
+) -> FilmRatingOut:
+    """Fetch the vote statistics of a film."""
+    try:
+        stats = await VoteServiceDI.rating(film_id=id)
+    except ORMNotFoundException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+    return FilmRatingOut.model_validate(stats)
@@ -1,72 +1,145 @@
 import logging
+from typing import AsyncIterable, Iterable, NamedTuple, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.characters.repository import CharacterRepository
-from src.exceptions import ORMNotFoundException
 from src.films.models import Film
 from src.films.repository import FilmRepository
-from src.integrations.swapi.plugin import SwapiPlugin
 from src.service import (
     CreateORMService,
     GetORMService,
     ListPaginationORMService,
     SearchORMService,
+    SyncORMService,
+    SyncReport,
 )
+from src.settings import settings
 from src.starships.repository import StarshipRepository
+from src.utils.pagination import count_cache
+from src.votes.leaderboard import film_leaderboard
+from src.votes.model import Vote
 
 logger = logging.getLogger(__name__)
 
 
+class LinkReport(NamedTuple):
+    """Outcome of linking films to their characters and starships."""
+
+    films: int = 0  # Films found in DB
+    missing: int = 0  # URLs not in DB (per chunk), their links are skipped
+
+
 class FilmService(
     CreateORMService[Film],
     GetORMService[Film],
     ListPaginationORMService[Film],
     SearchORMService[Film],
+    SyncORMService[Film],
 ):
     """Film service."""
 
+    # Films linked per transaction by `sync_relationships`.
+    RELATIONSHIP_CHUNK_SIZE = settings.SYNC_RELATIONSHIP_CHUNK_SIZE
+
     def __init__(self, session: AsyncSession):
         self.session = session
         self._repository = FilmRepository(session)
         super().__init__(repository=self._repository)
 
-    async def add_films(self, films: list[dict]) -> None:
-        """Add multiple films in DB."""
-        async with self.session.begin():
-            for film_data in films:
-                film = Film.from_dict(data=film_data)
-                logger.debug(f"Syncing film: {film.title}")
-                try:
-                    film = await self.by_url(url=film.url)
-                except ORMNotFoundException:
-                    film = await self.create(obj=film)
-
-    async def create_relationships(self, film_id: int) -> None:
-        """Create relationships between film and characters."""
-        character_repo = CharacterRepository(self.session)
-        starship_repo = StarshipRepository(self.session)
-        plugin = SwapiPlugin()
-
-        # Find the relationships from the plugin
-        film_data = await plugin.film(film_id)
-        async with self.session.begin():
-            film = await self.get(id=film_id)
-
-            await self.session.refresh(film, attribute_names=["characters"])
-            for character_url in film_data["characters"]:
-                character = await character_repo.by_url(url=character_url)
-                if character not in film.characters:
-                    logger.debug(
-                        f"Linking character {character.name} to film {film.title}"
-                    )
-                    film.characters.append(character)
-
-            await self.session.refresh(film, attribute_names=["starships"])
-            for starship_url in film_data["starships"]:
-                starship = await starship_repo.by_url(url=starship_url)
-                if starship not in film.starships:
-                    logger.debug(
-                        f"Linking starship {starship.name} to film {film.title}"
-                    )
-                    film.starships.append(starship)
+    async def add_films(
+        self,
+        films: Iterable[dict] | AsyncIterable[dict],
+        *,
+        prune: bool = False,
+    ) -> SyncReport:
+        """Add or update films in DB in batches, skipping the unchanged ones.
+
+        With `prune`, `films` is the whole upstream collection and the
+        films missing from it are deleted, along with their votes. The film
+        leaderboard of this process and the cached total of votes are then
+        invalidated, other processes drop the deleted films from their
+        leaderboard on its next reload.
+        """
+        report = await self.sync(films, Film.values_from_dict, prune=prune)
+        if report.deleted:
+            film_leaderboard.invalidate()
+            await count_cache.invalidate(Vote.__tablename__)
+        logger.debug(f"Synced films: {report}")
+        return report
+
+    async def sync_relationships(self, *, chunk_size: int | None = None) -> LinkReport:
+        """Link every film to its characters and starships, chunk by chunk.
+
+        Films are read from the database with the relationship URLs stored by
+        their last sync, `chunk_size` (RELATIONSHIP_CHUNK_SIZE by default) at
+        a time, and each chunk is linked with one set of bulk queries in its
+        own transaction.
+        """
+        found = missing = after = 0
+        while True:
+            async with self.session.begin():
+                films = await self._repository.relationships(
+                    after=after, limit=chunk_size or self.RELATIONSHIP_CHUNK_SIZE
+                )
+                if not films:
+                    break
+                report = await self.link_relationships(films=films)
+            found += report.films
+            missing += report.missing
+            after = films[-1]["id"]
+        return LinkReport(films=found, missing=missing)
+
+    async def link_relationships(self, films: Sequence[dict]) -> LinkReport:
+        """Link films to their characters and starships (does not commit).
+
+        `films` are upstream film payloads, or rows of
+        `FilmRepository.relationships`, with `url`, `characters` and
+        `starships` URLs. URLs are resolved with one query per entity type and
+        missing links are inserted with one statement per association table,
+        so the statement count does not grow with the number of links.
+        """
+        character_urls = {url for f in films for url in f["characters"]}
+        starship_urls = {url for f in films for url in f["starships"]}
+        film_ids = await self._repository.ids_by_urls({f["url"] for f in films})
+        character_ids = await CharacterRepository(self.session).ids_by_urls(
+            character_urls
+        )
+        starship_ids = await StarshipRepository(self.session).ids_by_urls(starship_urls)
+        missing = len(films) - len(film_ids)
+        if missing_characters := character_urls - character_ids.keys():
+            missing += len(missing_characters)
+            logger.warning(
+                f"Skipping links to {len(missing_characters)} unsynced characters"
+            )
+        if missing_starships := starship_urls - starship_ids.keys():
+            missing += len(missing_starships)
+            logger.warning(
+                f"Skipping links to {len(missing_starships)} unsynced starships"
+            )
+
+        character_links: set[tuple[int, int]] = set()
+        starship_links: set[tuple[int, int]] = set()
+        for film in films:
+            film_id = film_ids.get(film["url"])
+            if film_id is None:
+                logger.warning(f"Film {film['url']} is not synced, skipping links")
+                continue
+            character_links.update(
+                (film_id, character_ids[url])
+                for url in film["characters"]
+                if url in character_ids
+            )
+            starship_links.update(
+                (film_id, starship_ids[url])
+                for url in film["starships"]
+                if url in starship_ids
+            )
+
+        added_characters = await self._repository.link_characters(character_links)
+        added_starships = await self._repository.link_starships(starship_links)
+        logger.debug(
+            f"Linked {added_characters} characters and {added_starships} starships "
+            f"to {len(film_ids)} films"
+        )
+        return LinkReport(films=len(film_ids), missing=missing)
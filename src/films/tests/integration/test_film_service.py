@@ -1,11 +1,16 @@
 import logging
+from unittest.mock import AsyncMock, patch
 
 import pytest
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from conftest import FilmFactory
+from conftest import CharacterFactory, FilmFactory, StarshipFactory
+from src.films.constants import FILM_DETAIL_PROFILE
 from src.films.models import Film
-from src.films.service import FilmService
+from src.films.service import FilmService, LinkReport
+from src.repository import LoadProfile
+from src.service import SyncReport
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +34,13 @@ class TestFilmServce:
         assert result.total >= 10
         assert len(result.items) == 5
 
+    async def test_list_all(self) -> None:
+        """Test walking every film in batches."""
+        total = (await self.service.list(page=1, page_size=5)).total
+        ids = [film.id async for film in self.service.list_all(fetch_size=3)]
+        assert len(ids) == total
+        assert ids == sorted(ids)
+
     async def test_get(self) -> None:
         """Test getting a film by ID."""
         film = self.entities[0]
@@ -36,6 +48,27 @@ class TestFilmServce:
         assert fetched_film.id == film.id
         assert fetched_film.title == film.title
 
+    async def test_get_film_detail_profile(self, session: AsyncSession) -> None:
+        """Test the film detail profile loads characters and starships."""
+        film = self.entities[0]
+        session.expunge_all()
+        fetched_film = await self.service.get(film.id, profile=FILM_DETAIL_PROFILE)
+        assert fetched_film.characters == []
+        assert fetched_film.starships == []
+
+    async def test_get_none_profile(self, session: AsyncSession) -> None:
+        """Test the none profile leaves relationships unloaded."""
+        film = self.entities[0]
+        session.expunge_all()
+        fetched_film = await self.service.get(film.id, profile=LoadProfile.NONE)
+        with pytest.raises(InvalidRequestError):
+            fetched_film.characters
+
+    async def test_get_unknown_profile(self) -> None:
+        """Test an unknown loading profile is rejected."""
+        with pytest.raises(ValueError):
+            await self.service.get(self.entities[0].id, profile="unknown")
+
     async def test_by_url(self) -> None:
         """Test getting a film by URL."""
         film = self.entities[0]
@@ -78,6 +111,79 @@ class TestFilmServce:
                 "url": "http://swapi.dev/api/films/100/",
             }
         ]
-        await self.service.add_films(new_films_data)
+        report = await self.service.add_films(new_films_data)
+        assert (report.inserted, report.unchanged) == (1, 0)
+        report = await self.service.add_films(new_films_data)
+        assert (report.inserted, report.updated, report.unchanged) == (0, 0, 1)
+
         added_film = await self.service.by_url("http://swapi.dev/api/films/100/")
         assert added_film.title == "Another New Film"
+
+    @pytest.mark.parametrize("deleted, invalidated", [(0, False), (1, True)])
+    async def test_add_films_prune_invalidates_leaderboard(
+        self, deleted: int, invalidated: bool
+    ) -> None:
+        """Test deleting films invalidates the film leaderboard."""
+        report = SyncReport(unchanged=1, deleted=deleted)
+        with (
+            patch.object(self.service, "sync", AsyncMock(return_value=report)),
+            patch("src.films.service.film_leaderboard") as leaderboard,
+        ):
+            assert await self.service.add_films([], prune=True) == report
+        assert leaderboard.invalidate.called is invalidated
+
+    async def test_link_relationships(self, session: AsyncSession) -> None:
+        """Test linking a film to its characters and starships in bulk."""
+        film = self.entities[0]
+        characters = await CharacterFactory.create_batch(3)
+        starships = await StarshipFactory.create_batch(2)
+        film_data = {
+            "url": film.url,
+            "characters": [c.url for c in characters] + ["http://unknown/1/"],
+            "starships": [s.url for s in starships],
+        }
+
+        async with session.begin():
+            report = await self.service.link_relationships([film_data])
+        assert report == LinkReport(films=1, missing=1)
+        # Linking again must not duplicate links
+        async with session.begin():
+            await self.service.link_relationships([film_data])
+
+        session.expunge_all()
+        linked = await self.service.get(film.id, profile=FILM_DETAIL_PROFILE)
+        assert {c.id for c in linked.characters} == {c.id for c in characters}
+        assert {s.id for s in linked.starships} == {s.id for s in starships}
+
+    async def test_sync_relationships(self, session: AsyncSession) -> None:
+        """Test linking films chunk by chunk from their stored relationships."""
+        characters = await CharacterFactory.create_batch(2)
+        starships = await StarshipFactory.create_batch(1)
+        films = [
+            await FilmFactory.create(
+                character_urls=[c.url for c in characters[: n + 1]],
+                starship_urls=[s.url for s in starships] if n else [],
+            )
+            for n in range(3)
+        ]
+        film_id = films[2].id
+        await FilmFactory.create(character_urls=["http://unknown/people/"])
+
+        with patch.object(
+            self.service, "link_relationships", wraps=self.service.link_relationships
+        ) as link_relationships:
+            report = await self.service.sync_relationships(chunk_size=3)
+
+        total = (await self.service.list(page=1, page_size=5)).total
+        assert report.films == total
+        assert report.missing >= 1
+        chunks = [c.kwargs["films"] for c in link_relationships.call_args_list]
+        assert [len(chunk) for chunk in chunks] == [3] * (total // 3) + (
+            [total % 3] if total % 3 else []
+        )
+        ids = [film["id"] for chunk in chunks for film in chunk]
+        assert ids == sorted(ids)
+        session.expunge_all()
+        linked = await self.service.get(film_id, profile=FILM_DETAIL_PROFILE)
+        assert {c.id for c in linked.characters} == {c.id for c in characters}
+        assert {s.id for s in linked.starships} == {s.id for s in starships}
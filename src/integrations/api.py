@@ -1,14 +1,135 @@
+import asyncio
+import functools
+import hashlib
+import http
+import json as jsonlib
 import logging
-from typing import Any, Literal, Mapping, MutableMapping, MutableSequence
+from collections import Counter
+from types import SimpleNamespace
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    Literal,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    NamedTuple,
+)
 
 import aiohttp
 from yarl import URL
 
+from src.integrations.cache import CachedResponse, HTTPCache
+from src.settings import settings
+from src.utils.json_stream import JSONArrayDecoder
+
 logger = logging.getLogger(__name__)
 
 
+class ConnectionMetrics:
+    """Count requests, connections and DNS lookups of a client session."""
+
+    # Counted TraceConfig signal -> metric name.
+    SIGNALS = {
+        "on_request_start": "requests",
+        "on_connection_create_end": "connections_created",
+        "on_connection_reuseconn": "connections_reused",
+        "on_connection_queued_start": "connections_queued",
+        "on_dns_resolvehost_end": "dns_lookups",
+        "on_dns_cache_hit": "dns_cache_hits",
+    }
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return a trace config feeding these metrics."""
+        trace_config = aiohttp.TraceConfig()
+        for signal, name in self.SIGNALS.items():
+            getattr(trace_config, signal).append(self._counter(name))
+        return trace_config
+
+    def _counter(self, name: str):
+        async def count(
+            session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+        ) -> None:
+            self.counts[name] += 1
+
+        return count
+
+    def as_dict(self) -> dict[str, int]:
+        return {name: self.counts[name] for name in self.SIGNALS.values()}
+
+
+class FetchResult(NamedTuple):
+    """Outcome of one request of a batch, either `data` or `error` is set."""
+
+    url: str
+    data: Any = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ItemStream:
+    """Items of a JSON array streamed by a plugin, see `Plugin._stream`.
+
+    Once the items are exhausted, `changed` tells whether the array differs
+    from the last one cached for the URL, by content hash.
+    """
+
+    def __init__(
+        self, items: AsyncIterator[Any], digest: Any, cached_hash: str | None = None
+    ):
+        self._items = items
+        self._digest = digest
+        self._cached_hash = cached_hash
+        self.changed: bool | None = None
+
+    def __aiter__(self) -> "ItemStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self._items.__anext__()
+        except StopAsyncIteration:
+            self.changed = self._digest.hexdigest() != self._cached_hash
+            raise
+
+    async def aclose(self) -> None:
+        await self._items.aclose()
+
+
+@functools.cache
+def _http_cache(path: str) -> HTTPCache:
+    """Return the HTTP cache stored at `path`, shared by the process."""
+    return HTTPCache(path)
+
+
 class Plugin:
-    """Base class for plugins to interact with external APIs."""
+    """Base class for plugins to interact with external APIs.
+
+    Use a plugin as an async context manager to share one pooled client
+    session, with keep-alive, across its requests:
+
+        async with SwapiPlugin() as plugin:
+            films = [await plugin.film(id) for id in ids]
+
+    Outside of it, every request opens and closes its own session.
+
+    With HTTP_CACHE_PATH set, GET responses are cached on disk and revalidated
+    with `If-None-Match` / `If-Modified-Since`. Responses fetched inside the
+    context are only cached when it exits without an exception, so
+    `_stream_if_changed` keeps reporting a change until it has been processed.
+    Processing that outlives the context can `unstage` a response and cache it
+    with `cache_responses` once done.
+
+    Large collections can be streamed with `_stream` / `_stream_if_changed`,
+    which yield the items of a JSON array while its body downloads.
+    """
 
     NAME: str  # Unique name for the plugin
 
@@ -17,18 +138,263 @@ class Plugin:
 
     BASE_URL: str
 
+    # Connection pool of the shared session.
+    CONNECTION_LIMIT: int = settings.PLUGIN_CONNECTION_LIMIT
+    CONNECTION_LIMIT_PER_HOST: int = settings.PLUGIN_CONNECTION_LIMIT_PER_HOST
+    DNS_CACHE_TTL: int = settings.PLUGIN_DNS_CACHE_TTL  # seconds
+    KEEPALIVE_TIMEOUT: float = settings.PLUGIN_KEEPALIVE_TIMEOUT  # seconds
+    # Requests in flight at once in `fetch_many`.
+    MAX_CONCURRENCY: int = settings.PLUGIN_MAX_CONCURRENCY
+    # SQLite file caching GET responses, empty to disable.
+    HTTP_CACHE_PATH: str = settings.PLUGIN_HTTP_CACHE_PATH
+    # Bytes read at once from streamed responses.
+    STREAM_CHUNK_SIZE: int = 64 * 1024
+    # Largest item of a streamed array, in characters, larger ones raise.
+    STREAM_MAX_ITEM_SIZE: int = 1024 * 1024
+
+    def __init__(self) -> None:
+        self._session: aiohttp.ClientSession | None = None
+        self.metrics = ConnectionMetrics()
+        # Responses to cache when the context exits without an exception.
+        self._staged: dict[str, CachedResponse] = {}
+
+    async def __aenter__(self) -> "Plugin":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type: type | None, *exc_info: Any) -> None:
+        staged, self._staged = self._staged, {}
+        if exc_type is None and staged:
+            _http_cache(self.HTTP_CACHE_PATH).set_many(list(staged.values()))
+        await self.close()
+
+    def unstage(self, url: str | URL) -> CachedResponse | None:
+        """Remove the response of `url` from the ones cached on exit, if staged.
+
+        The caller caches it with `cache_responses` once it has processed it.
+        """
+        return self._staged.pop(str(self._url(url)), None)
+
+    @classmethod
+    def cache_responses(cls, responses: Iterable[CachedResponse]) -> None:
+        """Cache responses, e.g. unstaged ones once processed."""
+        if cls.HTTP_CACHE_PATH and (responses := list(responses)):
+            _http_cache(cls.HTTP_CACHE_PATH).set_many(responses)
+
+    async def open(self) -> None:
+        """Open the shared client session, if not open yet."""
+        if self._session is None or self._session.closed:
+            self._session = self._client_session()
+
+    async def close(self) -> None:
+        """Close the shared client session and its connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.info(f"{self.NAME} connections: {self.metrics.as_dict()}")
+
+    def _client_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.CONNECTION_LIMIT,
+            limit_per_host=self.CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=self.DNS_CACHE_TTL,
+            keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.API_TIMEOUT),
+            trace_configs=[self.metrics.trace_config()],
+        )
+
     def _base_url(self) -> URL:
         """Construct the base URL for the API."""
         return URL(self.BASE_URL)
 
+    async def fetch_many(
+        self, urls: Iterable[str], *, concurrency: int | None = None
+    ) -> list[FetchResult]:
+        """GET many URLs concurrently, at most `concurrency` at a time.
+
+        Returns a result per URL, in order. A failed request is reported in
+        its result and does not fail the others. The shared session is opened
+        for the duration of the batch if it is not open yet.
+        """
+        if self._session is None:
+            async with self:
+                return await self.fetch_many(urls, concurrency=concurrency)
+
+        semaphore = asyncio.Semaphore(concurrency or self.MAX_CONCURRENCY)
+
+        async def fetch(url: str) -> FetchResult:
+            async with semaphore:
+                try:
+                    return FetchResult(url=url, data=await self._get(url))
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    logger.warning(f"{self.NAME}: failed to fetch {url}: {e!r}")
+                    return FetchResult(url=url, error=e)
+
+        return await asyncio.gather(*(fetch(url) for url in urls))
+
     async def _get(
         self,
         url: str | URL,
         params: Mapping[str, str] | None = None,
         headers: MutableMapping[str, str] | None = None,
-    ) -> dict:
+    ) -> Any:
         """Wrapper for making GET requests."""
-        return await self._http("GET", url, params=params, headers=headers)
+        if not self.HTTP_CACHE_PATH:
+            return await self._http("GET", url, params=params, headers=headers)
+        return await self._cached_get(url, params=params, headers=headers)
+
+    async def _cached_get(
+        self,
+        url: str | URL,
+        params: Mapping[str, str] | None = None,
+        headers: MutableMapping[str, str] | None = None,
+    ) -> Any:
+        """GET through the HTTP cache."""
+        full_url = self._url(url).update_query(params or {})
+        key = str(full_url)
+        cache = _http_cache(self.HTTP_CACHE_PATH)
+        cached = self._staged.get(key) or cache.get(key)
+
+        # Streamed responses are cached without body, so cannot be revalidated.
+        validated = cached if cached is not None and cached.body else None
+        status, response_headers, body = await self._send(
+            "GET",
+            full_url,
+            headers=_conditional_headers(validated, headers),
+            auth=self.auth,
+        )
+        if status == http.HTTPStatus.NOT_MODIFIED and validated is not None:
+            return _decode(validated.body)
+
+        response = CachedResponse(
+            url=key,
+            etag=response_headers.get("ETag"),
+            last_modified=response_headers.get("Last-Modified"),
+            content_hash=hashlib.sha256(body).hexdigest(),
+            body=body,
+        )
+        self._cache(response)
+        return _decode(body)
+
+    def _cache(self, response: CachedResponse) -> None:
+        """Cache a response, staged until the shared session closes if open."""
+        if self._session is not None:
+            self._staged[response.url] = response
+        else:
+            _http_cache(self.HTTP_CACHE_PATH).set_many([response])
+
+    async def _stream(
+        self,
+        url: str | URL,
+        params: Mapping[str, str] | None = None,
+        headers: MutableMapping[str, str] | None = None,
+    ) -> ItemStream:
+        """GET a JSON array and return an iterator of its items.
+
+        Items are decoded as the body downloads and only the item being
+        downloaded is buffered, so memory does not grow with the array. Items
+        larger than STREAM_MAX_ITEM_SIZE raise ValueError. The iterator holds
+        the connection until it is exhausted or closed.
+        """
+        full_url = self._url(url).update_query(params or {})
+        response, session = await self._open_stream(full_url, headers)
+        digest = hashlib.sha256()
+        return ItemStream(self._iter_items(response, session, digest), digest)
+
+    async def _stream_if_changed(
+        self,
+        url: str | URL,
+        params: Mapping[str, str] | None = None,
+        headers: MutableMapping[str, str] | None = None,
+    ) -> ItemStream | None:
+        """Like `_stream`, or None if the array did not change since it was cached.
+
+        Unchanged means a 304 Not Modified to a request conditional on the
+        validators of the last response, which streams cache without body once
+        fully read. A body with the same hash is only known once read, it is
+        reported by the `changed` flag of the iterator. Without HTTP cache every
+        array is reported as changed.
+        """
+        if not self.HTTP_CACHE_PATH:
+            return await self._stream(url, params=params, headers=headers)
+        full_url = self._url(url).update_query(params or {})
+        key = str(full_url)
+        cached = self._staged.get(key) or _http_cache(self.HTTP_CACHE_PATH).get(key)
+
+        response, session = await self._open_stream(
+            full_url, _conditional_headers(cached, headers)
+        )
+        if response.status == http.HTTPStatus.NOT_MODIFIED:
+            response.release()
+            if session is not None:
+                await session.close()
+            return None
+        digest = hashlib.sha256()
+        return ItemStream(
+            self._iter_items(response, session, digest, cache_key=key),
+            digest,
+            cached_hash=cached.content_hash if cached is not None else None,
+        )
+
+    async def _open_stream(
+        self, url: URL, headers: Mapping[str, str] | None
+    ) -> tuple[aiohttp.ClientResponse, aiohttp.ClientSession | None]:
+        """Send a GET and return the response with its body unread.
+
+        Also returns the session opened for the request, if the shared session
+        is not open. Only reads time out: consumers may take their time.
+        """
+        logger.debug(f"Streaming GET request to {url} with headers: {headers}")
+        session = self._client_session() if self._session is None else None
+        try:
+            response = await (self._session or session).get(
+                url,
+                headers=headers,
+                auth=self.auth,
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.API_TIMEOUT, sock_read=self.API_TIMEOUT
+                ),
+            )
+            if response.status != http.HTTPStatus.NOT_MODIFIED:
+                response.raise_for_status()
+        except BaseException:
+            if session is not None:
+                await session.close()
+            raise
+        return response, session
+
+    async def _iter_items(
+        self,
+        response: aiohttp.ClientResponse,
+        session: aiohttp.ClientSession | None,
+        digest: Any,
+        cache_key: str | None = None,
+    ) -> AsyncIterator[Any]:
+        """Yield the items of a response, hashing its body into `digest`."""
+        decoder = JSONArrayDecoder(max_item_size=self.STREAM_MAX_ITEM_SIZE)
+        try:
+            async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+                digest.update(chunk)
+                for item in decoder.feed(chunk):
+                    yield item
+            decoder.close()
+        finally:
+            response.release()
+            if session is not None:
+                await session.close()
+        if cache_key is not None:
+            self._cache(
+                CachedResponse(
+                    url=cache_key,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    content_hash=digest.hexdigest(),
+                    body=b"",
+                )
+            )
 
     async def _http(
         self,
@@ -38,29 +404,61 @@ class Plugin:
         headers: MutableMapping[str, str] | None = None,
         json: MutableSequence[Any] | Mapping[str, Any] | None = None,
         data: Mapping[str, str] | None = None,
-    ) -> dict:
+    ) -> Any:
         """Wrapper for making HTTP requests."""
         kwargs: dict[str, Any] = {
-            "timeout": self.API_TIMEOUT,
             "headers": headers,
             "json": json,
             "data": data,
             "params": params,
             "auth": self.auth,
         }
+        _, _, body = await self._send(action, self._url(url), **kwargs)
+        return _decode(body)
+
+    def _url(self, url: str | URL) -> URL:
+        return self._base_url().join(URL(url))
 
-        # Construct url
-        url = self._base_url().join(URL(url))
+    async def _send(
+        self, action: str, url: URL, **kwargs: Any
+    ) -> tuple[int, Mapping[str, str], bytes]:
+        """Send a request, return its status, headers and body.
+
+        Raises for error statuses, a 304 Not Modified is returned.
+        """
         logger.debug(
             "Making %s request to %s with params: %s, headers: %s, json: %s",
             action,
             url,
-            params,
-            headers,
-            json,
+            kwargs.get("params"),
+            kwargs.get("headers"),
+            kwargs.get("json"),
         )
+        if self._session is not None:
+            return await self._request(self._session, action, url, **kwargs)
+        async with self._client_session() as session:
+            return await self._request(session, action, url, **kwargs)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.request(method=action, url=url, **kwargs) as response:
+    async def _request(
+        self, session: aiohttp.ClientSession, action: str, url: URL, **kwargs: Any
+    ) -> tuple[int, Mapping[str, str], bytes]:
+        async with session.request(method=action, url=url, **kwargs) as response:
+            if response.status != http.HTTPStatus.NOT_MODIFIED:
                 response.raise_for_status()
-                return await response.json()
+            return response.status, response.headers, await response.read()
+
+
+def _conditional_headers(
+    cached: CachedResponse | None, headers: Mapping[str, str] | None
+) -> dict[str, str]:
+    """Return `headers` with the validators of a cached response, if any."""
+    headers = dict(headers or {})
+    if cached is not None and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached is not None and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+def _decode(body: bytes) -> Any:
+    return jsonlib.loads(body)
@@ -0,0 +1,62 @@
+"""On-disk cache of HTTP responses, for conditional requests of plugins."""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+
+class CachedResponse(NamedTuple):
+    url: str
+    etag: str | None
+    last_modified: str | None
+    content_hash: str
+    body: bytes
+
+
+class HTTPCache:
+    """Responses keyed by URL, stored in a SQLite database.
+
+    SQLite handles the locking between the processes (e.g. Celery workers)
+    sharing the file.
+    """
+
+    def __init__(self, path: str | Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Return the cached response of a URL, if any."""
+        row = self._connection.execute(
+            "SELECT url, etag, last_modified, content_hash, body "
+            "FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def set_many(self, responses: list[CachedResponse]) -> None:
+        """Store responses, replacing the cached ones of the same URLs."""
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO responses "
+                "(url, etag, last_modified, content_hash, body, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(*response, time.time()) for response in responses],
+            )
+
+    def close(self) -> None:
+        self._connection.close()
@@ -1,4 +1,7 @@
-from src.integrations.api import Plugin
+from typing import Iterable
+
+from src.integrations.api import FetchResult, ItemStream, Plugin
+from src.integrations.cache import CachedResponse
 
 
 class SwapiPlugin(Plugin):
@@ -11,22 +14,50 @@ class SwapiPlugin(Plugin):
         """Fetch starships from the Star Wars API."""
         return await self._get("starships/")
 
+    async def stream_starships_if_changed(self) -> ItemStream | None:
+        """Stream starships, or None if unchanged since they were last streamed."""
+        return await self._stream_if_changed("starships/")
+
     async def starship(self, id: int) -> dict:
         """Fetch a specific starship by ID from the Star Wars API."""
         return await self._get(f"starships/{id}/")
 
+    async def starships_by_ids(self, ids: Iterable[int]) -> list[FetchResult]:
+        """Fetch starships by ID concurrently, with a result per ID in order."""
+        return await self.fetch_many(f"starships/{id}/" for id in ids)
+
     async def characters(self) -> list[dict]:
         """Fetch people from the Star Wars API."""
         return await self._get("people/")
 
+    async def stream_characters_if_changed(self) -> ItemStream | None:
+        """Stream people, or None if unchanged since they were last streamed."""
+        return await self._stream_if_changed("people/")
+
     async def character(self, id: int) -> dict:
         """Fetch a specific character by ID from the Star Wars API."""
         return await self._get(f"people/{id}/")
 
+    async def characters_by_ids(self, ids: Iterable[int]) -> list[FetchResult]:
+        """Fetch characters by ID concurrently, with a result per ID in order."""
+        return await self.fetch_many(f"people/{id}/" for id in ids)
+
     async def films(self) -> list[dict]:
         """Fetch films from the Star Wars API."""
         return await self._get("films/")
 
+    async def stream_films_if_changed(self) -> ItemStream | None:
+        """Stream films, or None if unchanged since they were last streamed."""
+        return await self._stream_if_changed("films/")
+
+    def unstage_films(self) -> CachedResponse | None:
+        """Take the streamed films out of the responses cached on exit."""
+        return self.unstage("films/")
+
     async def film(self, id: int) -> dict:
         """Fetch a specific film by ID from the Star Wars API."""
         return await self._get(f"films/{id}/")
+
+    async def films_by_ids(self, ids: Iterable[int]) -> list[FetchResult]:
+        """Fetch films by ID concurrently, with a result per ID in order."""
+        return await self.fetch_many(f"films/{id}/" for id in ids)
@@ -0,0 +1,188 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.integrations.api import Plugin
+
+
+class LocalPlugin(Plugin):
+    NAME = "local"
+    CONNECTION_LIMIT_PER_HOST = 2
+    HTTP_CACHE_PATH = ""
+
+
+class LocalServer:
+    """Serve a local API to the plugins of the tests."""
+
+    @pytest.fixture
+    async def server(self):
+        self.in_flight = self.max_in_flight = 0
+
+        async def film(request: web.Request) -> web.Response:
+            id = int(request.match_info["id"])
+            if id == 404:
+                raise web.HTTPNotFound()
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return web.json_response({"id": id})
+
+        self.full_responses = 0
+
+        async def films(request: web.Request) -> web.Response:
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304)
+            self.full_responses += 1
+            return web.json_response([{"id": 1}], headers={"ETag": '"v1"'})
+
+        async def people(request: web.Request) -> web.Response:
+            self.full_responses += 1
+            return web.json_response([{"name": "Luke"}])
+
+        self.sent = 0
+        self.resume = asyncio.Event()
+
+        async def starships(request: web.Request) -> web.StreamResponse:
+            if request.headers.get("If-None-Match") == '"s1"':
+                return web.Response(status=304)
+            self.full_responses += 1
+            response = web.StreamResponse(headers={"ETag": '"s1"'})
+            response.content_type = "application/json"
+            await response.prepare(request)
+            await response.write(b'[{"name": "X-wing"},')
+            self.sent = 1
+            # The rest of the body is sent once the tests got the first item.
+            await self.resume.wait()
+            for n in range(2, 1001):
+                await response.write(f'{{"name": "Starship {n}"}},'.encode())
+            await response.write(b'{"name": "Last \xc3\xa9"}]')
+            await response.write_eof()
+            return response
+
+        app = web.Application()
+        app.router.add_get("/starships/", starships)
+        app.router.add_get("/films/{id}/", film)
+        app.router.add_get("/films/", films)
+        app.router.add_get("/people/", people)
+        async with TestServer(app) as server:
+            yield server
+
+
+@pytest.mark.anyio
+class TestPluginSession(LocalServer):
+    """Tests for the shared client session of plugins."""
+
+    async def test_requests_reuse_connections(self, server: TestServer):
+        plugin = LocalPlugin()
+        plugin.BASE_URL = str(server.make_url("/"))
+
+        async with plugin:
+            films = await asyncio.gather(
+                *(plugin._get(f"films/{id}/") for id in range(1, 51))
+            )
+
+        assert [film["id"] for film in films] == list(range(1, 51))
+        metrics = plugin.metrics.as_dict()
+        assert metrics["requests"] == 50
+        assert metrics["connections_created"] <= 2
+        assert metrics["connections_reused"] >= 48
+
+    async def test_request_without_shared_session(self, server: TestServer):
+        plugin = LocalPlugin()
+        plugin.BASE_URL = str(server.make_url("/"))
+
+        assert await plugin._get("films/1/") == {"id": 1}
+        assert plugin.metrics.as_dict()["connections_created"] == 1
+
+    async def test_fetch_many(self, server: TestServer):
+        plugin = LocalPlugin()
+        plugin.BASE_URL = str(server.make_url("/"))
+        urls = [f"films/{id}/" for id in (3, 404, 1, 2, 5, 4)]
+
+        results = await plugin.fetch_many(urls, concurrency=1)
+
+        assert [result.url for result in results] == urls
+        assert [result.ok for result in results] == [1, 0, 1, 1, 1, 1]
+        assert [result.data["id"] for result in results if result.ok] == [3, 1, 2, 5, 4]
+        assert results[1].error.status == 404
+        assert self.max_in_flight == 1
+        assert plugin._session is None
+
+    async def test_stream(self, server: TestServer):
+        plugin = LocalPlugin()
+        plugin.BASE_URL = str(server.make_url("/"))
+        plugin.STREAM_CHUNK_SIZE = 64
+
+        starships = await plugin._stream("starships/")
+        first = await anext(starships)
+        assert first == {"name": "X-wing"}
+        assert self.sent == 1
+        self.resume.set()
+        names = [first["name"]] + [starship["name"] async for starship in starships]
+
+        assert len(names) == 1001
+        assert names[-1] == "Last é"
+        assert plugin.metrics.as_dict()["connections_created"] == 1
+
+    async def test_stream_not_a_json_array(self, server: TestServer):
+        plugin = LocalPlugin()
+        plugin.BASE_URL = str(server.make_url("/"))
+
+        with pytest.raises(ValueError):
+            [item async for item in await plugin._stream("films/1/")]
+
+
+@pytest.mark.anyio
+class TestPluginHTTPCache(LocalServer):
+    """Tests for the on-disk HTTP cache of plugins."""
+
+    @pytest.fixture(autouse=True)
+    def cache_path(self, tmp_path):
+        self.cache_path = str(tmp_path / "http-cache.sqlite3")
+
+    def plugin(self, server: TestServer) -> LocalPlugin:
+        plugin = LocalPlugin()
+        plugin.BASE_URL = str(server.make_url("/"))
+        plugin.HTTP_CACHE_PATH = self.cache_path
+        return plugin
+
+    async def test_not_modified(self, server: TestServer):
+        for _ in range(2):
+            async with self.plugin(server) as plugin:
+                assert await plugin._get("films/") == [{"id": 1}]
+        assert self.full_responses == 1
+
+    async def test_stream_same_content_hash(self, server: TestServer):
+        for changed in (True, False):
+            async with self.plugin(server) as plugin:
+                people = await plugin._stream_if_changed("people/")
+                assert [person async for person in people] == [{"name": "Luke"}]
+                assert people.changed is changed
+        assert self.full_responses == 2
+
+    async def test_failed_context_is_not_cached(self, server: TestServer):
+        with pytest.raises(RuntimeError):
+            async with self.plugin(server) as plugin:
+                assert await plugin._get("films/") == [{"id": 1}]
+                raise RuntimeError
+
+        async with self.plugin(server) as plugin:
+            assert await plugin._get("films/") == [{"id": 1}]
+        assert self.full_responses == 2
+
+    async def test_stream_not_modified(self, server: TestServer):
+        self.resume.set()
+        async with self.plugin(server) as plugin:
+            starships = await plugin._stream_if_changed("starships/")
+            assert len([starship async for starship in starships]) == 1001
+
+            assert starships.changed
+
+        async with self.plugin(server) as plugin:
+            assert await plugin._stream_if_changed("starships/") is None
+            # Streamed responses are cached without body, so are not reused.
+            assert len(await plugin._get("starships/")) == 1001
+        assert self.full_responses == 2
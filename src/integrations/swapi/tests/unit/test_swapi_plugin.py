@@ -2,6 +2,7 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from src.integrations.api import FetchResult
 from src.integrations.swapi.plugin import SwapiPlugin
 
 
@@ -64,3 +65,13 @@ class TestSwapiPlugin:
         result = await self.plugin.film(3)
         mock_get.assert_called_once_with("films/3/")
         assert result == {"title": "Return of the Jedi"}
+
+    @patch("src.integrations.api.Plugin.fetch_many", new_callable=AsyncMock)
+    async def test_films_by_ids(self, mock_fetch_many):
+        """Test fetching films by ID in a batch."""
+        mock_fetch_many.return_value = [
+            FetchResult(url="films/1/", data={"title": "A New Hope"})
+        ]
+        result = await self.plugin.films_by_ids([1])
+        assert list(mock_fetch_many.call_args.args[0]) == ["films/1/"]
+        assert result == mock_fetch_many.return_value
@@ -1,111 +1,201 @@
-import asyncio
+"""Tasks syncing the database with the plugins.
+
+`sync_plugins_with_db` starts a sync run, a pipeline of tasks:
+
+    sync_films      ─┐
+    sync_characters ─┼─> link_synced_entities
+    sync_starships  ─┘
+
+The entity syncs run in parallel and return their stage output (see
+`_stage`), the films stage telling whether the films changed. Linking runs
+once all of them succeeded, from the relationship URLs the films sync stored
+in the database. The films response is
+only cached once its films are fully linked, so films are streamed and linked
+again by the next run if linking failed or skipped missing entities. Every
+stage output and log line carries the ID of the run.
+"""
+
 import logging
+import time
+import uuid
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from celery import chord, group
+from celery.canvas import Signature
 
 from src.celery_app import app
 from src.characters.service import CharacterService
-from src.films.service import FilmService
+from src.films.service import FilmService, LinkReport
+from src.integrations.cache import CachedResponse
 from src.integrations.swapi.plugin import SwapiPlugin
+from src.integrations.worker import run_async, worker
+from src.service import SyncReport
 from src.settings import settings
 from src.starships.service import StarshipService
 
 logger = logging.getLogger(__name__)
 
 
-@app.task
-def sync_films() -> None:
-    """Sync films from a plugin to the database."""
-    # Create a new async engine and session for this task
-    # otherwise sessions may be shared between tasks
-    _engine = create_async_engine(settings.DATABASE_URL, echo=False)
-    _Session = async_sessionmaker(_engine, expire_on_commit=False, class_=AsyncSession)
-
-    async def run():
-        plugin = SwapiPlugin()
-        async with _Session() as session:
-            service = FilmService(session)
-            films = await plugin.films()
-            await service.add_films(films=films)
-
-    return asyncio.run(run())
+def _stage(
+    name: str,
+    run_id: str | None,
+    started: float,
+    report: SyncReport | LinkReport | None = None,
+    **outputs: Any,
+) -> dict[str, Any]:
+    """Return the output of a stage, with its duration since `started`.
+
+    `report` is None when the stage had nothing to sync.
+    """
+    duration = time.monotonic() - started
+    logger.info(f"Sync run {run_id}: {name} stage took {duration:.3f}s")
+    if report is not None:
+        logger.info(f"Sync run {run_id}: synced {name}: {report}")
+    return {
+        "stage": name,
+        "run_id": run_id,
+        "duration": round(duration, 3),
+        "report": report._asdict() if report is not None else None,
+        **outputs,
+    }
 
 
 @app.task
-def sync_characters() -> None:
-    """Sync films from a plugin to the database."""
-    # Create a new async engine and session for this task
-    # otherwise sessions may be shared between tasks
-    _engine = create_async_engine(settings.DATABASE_URL, echo=False)
-    _Session = async_sessionmaker(_engine, expire_on_commit=False, class_=AsyncSession)
+def sync_films(run_id: str | None = None) -> dict[str, Any]:
+    """Sync films from a plugin to the database.
 
-    async def run():
-        plugin = SwapiPlugin()
-        async with _Session() as session:
-            service = CharacterService(session)
-            characters = await plugin.characters()
-            await service.add_characters(characters=characters)
+    The stage output tells, in `changed`, whether the films changed upstream
+    and need linking (False when not modified, or same content). The films
+    response is then left for linking to cache, in `films_response`.
+    """
+    started = time.monotonic()
 
-    return asyncio.run(run())
+    async def run():
+        async with SwapiPlugin() as plugin, worker.session() as session:
+            films = await plugin.stream_films_if_changed()
+            if films is None:
+                logger.info("Film collection unchanged upstream, skipping sync.")
+                return None, False, None
+            report = await FilmService(session).add_films(
+                films=films, prune=settings.SYNC_PRUNE_DELETED
+            )
+            if not films.changed:
+                logger.info("Film collection content unchanged upstream.")
+                return report, False, None
+            response = plugin.unstage_films()
+        return report, True, response
+
+    report, changed, response = run_async(run())
+    return _stage(
+        "films",
+        run_id,
+        started,
+        report,
+        changed=changed,
+        # Streamed responses are cached without body.
+        films_response=response._replace(body=None)._asdict() if response else None,
+    )
 
 
 @app.task
-def sync_starships() -> None:
-    """Sync films from a plugin to the database."""
-    # Create a new async engine and session for this task
-    # otherwise sessions may be shared between tasks
-    _engine = create_async_engine(settings.DATABASE_URL, echo=False)
-    _Session = async_sessionmaker(_engine, expire_on_commit=False, class_=AsyncSession)
+def sync_characters(run_id: str | None = None) -> dict[str, Any]:
+    """Sync characters from a plugin to the database."""
+    started = time.monotonic()
 
     async def run():
-        plugin = SwapiPlugin()
-        async with _Session() as session:
-            service = StarshipService(session)
-            starships = await plugin.starships()
-            await service.add_starships(starships=starships)
+        async with SwapiPlugin() as plugin, worker.session() as session:
+            characters = await plugin.stream_characters_if_changed()
+            if characters is None:
+                logger.info("Character collection unchanged upstream, skipping sync.")
+                return None
+            report = await CharacterService(session).add_characters(
+                characters=characters, prune=settings.SYNC_PRUNE_DELETED
+            )
+        return report
 
-    return asyncio.run(run())
+    return _stage("characters", run_id, started, run_async(run()))
 
 
 @app.task
-def sync_relationships() -> None:
-    """Sync relationships between films, characters and starships."""
-    # Create a new async engine and session for this task
-    # otherwise sessions may be shared between tasks
-    _engine = create_async_engine(settings.DATABASE_URL, echo=False)
-    _Session = async_sessionmaker(_engine, expire_on_commit=False, class_=AsyncSession)
+def sync_starships(run_id: str | None = None) -> dict[str, Any]:
+    """Sync starships from a plugin to the database."""
+    started = time.monotonic()
 
     async def run():
-        async with _Session() as session:
-            film_service = FilmService(session)
-            async for film in film_service.list_all():
-                sync_film_relationships.delay(film_id=film.id)
+        async with SwapiPlugin() as plugin, worker.session() as session:
+            starships = await plugin.stream_starships_if_changed()
+            if starships is None:
+                logger.info("Starship collection unchanged upstream, skipping sync.")
+                return None
+            report = await StarshipService(session).add_starships(
+                starships=starships, prune=settings.SYNC_PRUNE_DELETED
+            )
+        return report
 
-    return asyncio.run(run())
+    return _stage("starships", run_id, started, run_async(run()))
 
 
-@app.task
-def sync_film_relationships(film_id: int) -> None:
-    """Sync relationships for a specific film between films, characters and starships."""
-    # Create a new async engine and session for this task
-    # otherwise sessions may be shared between tasks
-    _engine = create_async_engine(settings.DATABASE_URL, echo=False)
-    _Session = async_sessionmaker(_engine, expire_on_commit=False, class_=AsyncSession)
+async def _link_relationships() -> LinkReport:
+    """Link all films, SYNC_RELATIONSHIP_CHUNK_SIZE at a time."""
+    async with worker.session() as session:
+        report = await FilmService(session).sync_relationships()
+    logger.info(f"Synced relationships of {report.films} films")
+    return report
 
-    async def run():
-        async with _Session() as session:
-            film_service = FilmService(session)
-            await film_service.create_relationships(film_id=film_id)
 
-    return asyncio.run(run())
+@app.task
+def link_synced_entities(
+    stages: list[dict[str, Any]], run_id: str, started_at: float
+) -> dict[str, Any]:
+    """Link the films synced by a run, then log the timings of the run.
+
+    Linking is skipped when the films did not change upstream. Once the films
+    are linked without missing entities, their response is cached, so that
+    the next runs skip them.
+    """
+    started = time.monotonic()
+    outputs = {stage["stage"]: stage for stage in stages}
+    if not outputs["films"]["changed"]:
+        logger.info(f"Sync run {run_id}: films unchanged upstream, skipping linking.")
+        report = None
+    else:
+        report = run_async(_link_relationships())
+        response = outputs["films"]["films_response"]
+        if report.missing:
+            logger.warning(
+                f"Sync run {run_id}: {report.missing} entities are missing, "
+                "films will be linked again by the next run."
+            )
+        elif response is not None:
+            SwapiPlugin.cache_responses([CachedResponse(**response)._replace(body=b"")])
+    stages = [*stages, _stage("relationships", run_id, started, report)]
+
+    summary = {
+        "run_id": run_id,
+        "duration": round(time.time() - started_at, 3),
+        "stages": {stage["stage"]: stage["duration"] for stage in stages},
+        "reports": {stage["stage"]: stage["report"] for stage in stages},
+    }
+    logger.info(f"Sync run {run_id} finished: {summary}")
+    return summary
+
+
+def sync_pipeline(run_id: str, started_at: float) -> Signature:
+    """Return the pipeline of a sync run, see the module docstring."""
+    entity_syncs = group(
+        sync_films.s(run_id=run_id),
+        sync_characters.s(run_id=run_id),
+        sync_starships.s(run_id=run_id),
+    )
+    return chord(
+        entity_syncs, link_synced_entities.s(run_id=run_id, started_at=started_at)
+    )
 
 
 @app.task
-def sync_plugins_with_db() -> None:
-    async def run():
-        sync_films.delay()
-        sync_characters.delay()
-        sync_starships.delay()
-        sync_relationships.delay()
-
-    return asyncio.run(run())
+def sync_plugins_with_db() -> str:
+    """Start a sync run and return its ID."""
+    run_id = uuid.uuid4().hex
+    sync_pipeline(run_id, started_at=time.time()).delay()
+    logger.info(f"Sync run {run_id} started")
+    return run_id
@@ -0,0 +1,178 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.films.service import FilmService, LinkReport
+from src.integrations.cache import CachedResponse
+from src.integrations.swapi.plugin import SwapiPlugin
+from src.integrations.tasks import link_synced_entities, sync_films, sync_pipeline
+from src.service import SyncReport
+
+
+def stage(name: str, report: SyncReport | None, **outputs) -> dict:
+    return {
+        "stage": name,
+        "run_id": "run",
+        "duration": 0.5,
+        "report": report._asdict() if report is not None else None,
+        **outputs,
+    }
+
+
+@pytest.mark.anyio
+class TestSyncPipeline:
+    """Tests for the pipeline of sync runs."""
+
+    async def test_links_after_entity_syncs(self):
+        pipeline = sync_pipeline("run", started_at=0.0)
+
+        assert [task.task for task in pipeline.tasks] == [
+            "src.integrations.tasks.sync_films",
+            "src.integrations.tasks.sync_characters",
+            "src.integrations.tasks.sync_starships",
+        ]
+        assert all(task.kwargs == {"run_id": "run"} for task in pipeline.tasks)
+        assert pipeline.body.task == "src.integrations.tasks.link_synced_entities"
+        assert pipeline.body.kwargs == {"run_id": "run", "started_at": 0.0}
+
+    async def link(
+        self, stages: list[dict], report: LinkReport = LinkReport(films=1)
+    ) -> tuple[dict, AsyncMock, MagicMock]:
+        with (
+            patch("src.integrations.tasks.run_async", asyncio.run),
+            patch(
+                "src.integrations.tasks._link_relationships",
+                new_callable=AsyncMock,
+                return_value=report,
+            ) as link_relationships,
+            patch.object(SwapiPlugin, "cache_responses") as cache_responses,
+        ):
+            summary = await asyncio.to_thread(
+                link_synced_entities, stages, run_id="run", started_at=time.time()
+            )
+        return summary, link_relationships, cache_responses
+
+    async def test_links_synced_films(self):
+        summary, link_relationships, _ = await self.link(
+            [
+                stage(
+                    "films",
+                    SyncReport(updated=1),
+                    changed=True,
+                    films_response=None,
+                ),
+                stage("characters", None),
+                stage("starships", SyncReport(unchanged=3)),
+            ]
+        )
+
+        link_relationships.assert_awaited_once_with()
+        assert summary["run_id"] == "run"
+        assert list(summary["stages"]) == [
+            "films",
+            "characters",
+            "starships",
+            "relationships",
+        ]
+        assert summary["stages"]["films"] == 0.5
+        assert summary["reports"]["characters"] is None
+        assert summary["reports"]["relationships"] == {"films": 1, "missing": 0}
+
+    async def test_skips_linking_when_films_unchanged(self):
+        _, link_relationships, _ = await self.link(
+            [
+                stage("films", None, changed=False),
+                stage("characters", SyncReport(inserted=1)),
+                stage("starships", None),
+            ]
+        )
+
+        link_relationships.assert_not_awaited()
+
+    @pytest.mark.parametrize("missing, cached", [(0, True), (1, False)])
+    async def test_caches_films_once_fully_linked(self, missing: int, cached: bool):
+        response = CachedResponse("films/", '"f1"', None, "hash", b"")
+        _, _, cache_responses = await self.link(
+            [
+                stage(
+                    "films",
+                    SyncReport(updated=1),
+                    changed=True,
+                    films_response=response._replace(body=None)._asdict(),
+                ),
+                stage("characters", None),
+                stage("starships", None),
+            ],
+            report=LinkReport(films=1, missing=missing),
+        )
+
+        if cached:
+            cache_responses.assert_called_once_with([response])
+        else:
+            cache_responses.assert_not_called()
+
+
+@pytest.mark.anyio
+class TestSyncRetry:
+    """Tests for sync runs following a failed one."""
+
+    @pytest.fixture
+    async def server(self, tmp_path):
+        self.full_responses = 0
+
+        async def films(request: web.Request) -> web.Response:
+            if request.headers.get("If-None-Match") == '"f1"':
+                return web.Response(status=304)
+            self.full_responses += 1
+            film = {"url": "films/1/", "characters": ["people/1/"], "starships": []}
+            return web.json_response([film], headers={"ETag": '"f1"'})
+
+        app = web.Application()
+        app.router.add_get("/films/", films)
+        async with TestServer(app) as server:
+            with (
+                patch.object(SwapiPlugin, "BASE_URL", str(server.make_url("/"))),
+                patch.object(
+                    SwapiPlugin, "HTTP_CACHE_PATH", str(tmp_path / "cache.sqlite3")
+                ),
+            ):
+                yield server
+
+    async def test_failed_linking_is_retried(self, server: TestServer):
+        async def add_films(service, films, prune):
+            return SyncReport(updated=len([film async for film in films]))
+
+        # Tasks of a worker process run in the same thread.
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        def run(task, *args):
+            return asyncio.get_running_loop().run_in_executor(executor, task, *args)
+
+        others = [stage("characters", None), stage("starships", None)]
+        link_relationships = AsyncMock(side_effect=[RuntimeError, LinkReport(1)])
+        with (
+            patch("src.integrations.tasks.run_async", asyncio.run),
+            patch("src.integrations.tasks.worker", MagicMock()),
+            patch("src.integrations.tasks._link_relationships", link_relationships),
+            patch.object(FilmService, "add_films", add_films),
+        ):
+            films = await run(sync_films, "run")
+            with pytest.raises(RuntimeError):
+                await run(link_synced_entities, [films, *others], "run", time.time())
+
+            # The films are streamed and linked again by the next run.
+            films = await run(sync_films, "run")
+            assert films["changed"] is True
+            await run(link_synced_entities, [films, *others], "run", time.time())
+
+            films = await run(sync_films, "run")
+            assert films["changed"] is False
+        executor.shutdown()
+
+        assert link_relationships.await_count == 2
+        assert self.full_responses == 2
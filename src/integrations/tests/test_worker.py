@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from src.integrations.worker import WorkerRuntime
+
+
+@pytest.mark.anyio
+class TestWorkerRuntime:
+    """Tests for the event loop and engine of worker processes."""
+
+    @pytest.fixture(autouse=True)
+    def runtime(self, tmp_path):
+        self.runtime = WorkerRuntime(
+            database_url=f"sqlite+aiosqlite:///{tmp_path / 'worker.sqlite3'}",
+            pool_size=1,
+            max_overflow=0,
+        )
+
+    async def query(self) -> tuple[asyncio.AbstractEventLoop, int]:
+        async with self.runtime.session() as session:
+            await session.execute(text("SELECT 1"))
+            connection = await session.connection()
+            dbapi_connection = (await connection.get_raw_connection()).dbapi_connection
+        return asyncio.get_running_loop(), id(dbapi_connection)
+
+    def run_tasks(self, count: int) -> list[tuple[asyncio.AbstractEventLoop, int]]:
+        # Like a worker process, outside of a running event loop.
+        return [self.runtime.run(self.query()) for _ in range(count)]
+
+    async def test_tasks_share_loop_and_connections(self):
+        results = await asyncio.to_thread(self.run_tasks, 3)
+
+        assert len(set(results)) == 1
+        engine = self.runtime.engine
+        assert engine.pool.checkedin() == 1
+        await asyncio.to_thread(self.runtime.stop)
+        assert not self.runtime.started
+        assert engine.pool.checkedin() == 0
+
+    async def test_restarts_after_stop(self):
+        first = await asyncio.to_thread(self.run_tasks, 1)
+        await asyncio.to_thread(self.runtime.stop)
+        second = await asyncio.to_thread(self.run_tasks, 1)
+        await asyncio.to_thread(self.runtime.stop)
+
+        assert first[0][0] is not second[0][0]
+        assert first[0][0].is_closed()
+
+    async def test_session_requires_started_runtime(self):
+        with pytest.raises(RuntimeError):
+            self.runtime.session()
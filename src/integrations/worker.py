@@ -0,0 +1,113 @@
+"""Event loop and database engine shared by the tasks of a worker process.
+
+Tasks are synchronous functions running coroutines. Instead of an event loop
+(`asyncio.run`) and an engine per task, each worker process keeps one of each,
+created on `worker_process_init` and disposed on `worker_process_shutdown`
+(see `src.celery_app`), so the connections of its pool are reused by all its
+tasks and a process holds at most CELERY_DB_POOL_SIZE + CELERY_DB_MAX_OVERFLOW
+connections. Outside of a prefork worker (e.g. `--pool solo`, eager tasks), the
+runtime starts on first use. The loop is not thread safe: the `threads` and
+`gevent`/`eventlet` pools are not supported.
+
+    @app.task
+    def my_task() -> None:
+        async def run():
+            async with worker.session() as session:
+                ...
+
+        return run_async(run())
+"""
+
+import asyncio
+import logging
+from typing import Any, Coroutine, TypeVar
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class WorkerRuntime:
+    """Event loop and database engine of a worker process."""
+
+    def __init__(self, database_url: str, pool_size: int, max_overflow: int):
+        self.database_url = database_url
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._engine: AsyncEngine | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            raise RuntimeError("The worker runtime is not started.")
+        return self._engine
+
+    def start(self) -> None:
+        """Create the event loop and the engine, if not created yet."""
+        if self.started:
+            return
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._engine = create_async_engine(
+            self.database_url,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_pre_ping=True,
+        )
+        self._session_factory = async_sessionmaker(
+            self._engine, expire_on_commit=False, class_=AsyncSession
+        )
+        logger.debug("Worker runtime started.")
+
+    def stop(self) -> None:
+        """Close the connections of the engine and the event loop."""
+        if not self.started:
+            return
+        loop, self._loop = self._loop, None
+        engine, self._engine = self._engine, None
+        self._session_factory = None
+        try:
+            loop.run_until_complete(engine.dispose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+        logger.debug("Worker runtime stopped.")
+
+    def run(self, coro: Coroutine[Any, Any, _T]) -> _T:
+        """Run a coroutine to completion on the event loop of the worker."""
+        self.start()
+        return self._loop.run_until_complete(coro)
+
+    def session(self) -> AsyncSession:
+        """Return a new session bound to the engine of the worker."""
+        if self._session_factory is None:
+            raise RuntimeError("The worker runtime is not started.")
+        return self._session_factory()
+
+
+worker = WorkerRuntime(
+    database_url=settings.DATABASE_URL,
+    pool_size=settings.CELERY_DB_POOL_SIZE,
+    max_overflow=settings.CELERY_DB_MAX_OVERFLOW,
+)
+
+
+def run_async(coro: Coroutine[Any, Any, _T]) -> _T:
+    """Run a coroutine from a task, on the event loop of the worker process."""
+    return worker.run(coro)
@@ -1,9 +1,11 @@
 """The base classes for all models."""
 
+import hashlib
+import json
 from datetime import datetime
-from typing import Any, ClassVar
+from typing import Any, ClassVar, Mapping
 
-from sqlalchemy import Column, DateTime, ForeignKey, Table
+from sqlalchemy import Column, DateTime, ForeignKey, String, Table
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -35,6 +37,27 @@ class Timestamps:
     )
 
 
+class Fingerprinted:
+    """Abstract base class for rows synced from upstream.
+
+    `fingerprint` is the hash of the column values the row was last synced
+    with (see `fingerprint()`), so syncs can skip the rows that did not change.
+    `synced_at` is when a sync last saw the row upstream, so pruning syncs can
+    delete the rows they did not see.
+    """
+
+    __abstract__ = True
+
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    synced_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+def fingerprint(values: Mapping[str, Any]) -> str:
+    """Return the SHA-256 of column values, as mapped by `values_from_dict`."""
+    payload = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
 # Association Tables
 
 film_characters = Table(
@@ -1,15 +1,87 @@
 from __future__ import annotations
 
-from typing import Generic, Sequence, Type, TypeVar
+import enum
+import functools
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncGenerator,
+    ClassVar,
+    Collection,
+    Generic,
+    Iterable,
+    Mapping,
+    Sequence,
+    Type,
+    TypeVar,
+)
 
-from sqlalchemy import func, inspect, select
+import sqlalchemy.exc
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    String,
+    Table,
+    any_,
+    bindparam,
+    delete,
+    func,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
 
 from src.exceptions import ORMNotFoundException
+from src.utils.iterables import chunked
 
 _T = TypeVar("_T")  # ORM model type
 
+READ_ONLY_COLUMNS = frozenset({"id", "created_at", "updated_at"})
+
+
+class LoadProfile(str, enum.Enum):
+    """Built-in relationship loading profiles."""
+
+    NONE = "none"  # Load no relationship, accessing one raises
+    IDS_ONLY = "ids_only"  # Load only the primary keys of related rows
+    FULL = "full"  # Load every relationship
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards (with `/`) so `value` is matched literally."""
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+def violated_constraint(error: sqlalchemy.exc.IntegrityError) -> str | None:
+    """Return the name of the constraint violated by `error`.
+
+    None if the driver does not report it (e.g. SQLite).
+    """
+    orig = error.orig
+    # psycopg reports it in `diag`, asyncpg on the error wrapped by SQLAlchemy.
+    diag = getattr(orig, "diag", None)
+    if name := getattr(diag, "constraint_name", None):
+        return name
+    return getattr(orig.__cause__, "constraint_name", None)
+
+
+@functools.cache
+def _column_names(model: type) -> frozenset[str]:
+    """Return the names of the mapped columns of a model (inspected once)."""
+    return frozenset(inspect(model).column_attrs.keys())
+
+
+@functools.cache
+def _relationships(model: type) -> dict[str, type]:
+    """Map relationship names to their target classes (inspected once)."""
+    mapper = inspect(model)
+    return {name: rel.mapper.class_ for name, rel in mapper.relationships.items()}
+
 
 class Repository(Generic[_T]):
     """Generic repository.
@@ -23,6 +95,14 @@ class Repository(Generic[_T]):
     """
 
     SEARCH_QUERY_ATTR: str  # Attribute to search by in `search()`
+    SEARCH_LIMIT: ClassVar[int] = 50  # Default page size of `search()`
+
+    # Named loading profiles: profile name -> relationships to load, e.g.
+    #     LOAD_PROFILES = {"film_detail": ("characters", "starships")}
+    # Relationships not listed raise when accessed.
+    LOAD_PROFILES: ClassVar[dict[str, tuple[str, ...]]] = {}
+    DEFAULT_LOAD_PROFILE: ClassVar[str] = LoadProfile.FULL
+    UPSERT_BATCH_SIZE: ClassVar[int] = 1000  # Rows per INSERT in `upsert_many()`
 
     _model: Type[_T]
 
@@ -37,41 +117,135 @@ class Repository(Generic[_T]):
         await self.session.refresh(obj)
         return obj
 
-    async def get(self, id: int) -> _T | None:
+    async def upsert_many(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        *,
+        conflict_on: Sequence[str] = ("url",),
+        batch_size: int | None = None,
+    ) -> list[int]:
+        """Insert rows, updating the existing ones that clash on `conflict_on`.
+
+        Runs one `INSERT ... ON CONFLICT (...) DO UPDATE ... RETURNING id` per
+        `batch_size` rows (UPSERT_BATCH_SIZE by default). Every row must have
+        the same keys. Returns the primary keys of the written rows.
+        """
+        ids: list[int] = []
+        for batch in chunked(rows, batch_size or self.UPSERT_BATCH_SIZE):
+            # A statement may not touch the same row twice, last one wins.
+            batch = list({tuple(r[c] for c in conflict_on): r for r in batch}.values())
+            stmt = self._insert().values(batch)
+            updates = {
+                name: stmt.excluded[name]
+                for name in batch[0]
+                if name not in conflict_on and name not in {"id", "created_at"}
+            }
+            if "updated_at" in self._model.__table__.c:
+                updates["updated_at"] = func.now()
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(conflict_on), set_=updates
+            ).returning(self._model.id)
+            ids.extend((await self.session.scalars(stmt)).all())
+        return ids
+
+    async def get(self, id: int, *, profile: str | None = None) -> _T | None:
         """Get a model by primary key."""
         stmt = (
             select(self._model)
-            .options(
-                *(await self._eager_options_for_all())  # lazy load all relationships
-            )
+            .options(*self._loader_options(profile))
             .where(self._model.id == id)
         )
         return await self.session.scalar(stmt)
 
-    async def by_url(self, url: str) -> _T | None:
+    async def by_url(self, url: str, *, profile: str | None = None) -> _T | None:
         """Get a model by URL."""
         result = await self.session.execute(
             select(self._model)
-            .options(
-                *(await self._eager_options_for_all())  # lazy load all relationships
-            )
+            .options(*self._loader_options(profile))
             .where(self._model.url == url)
         )
         return result.scalars().first()
 
-    async def update(self, id: int, attrs: dict) -> _T:
-        """Persist changes to an object."""
-        db_obj = await self.get(id=id)
-        if not db_obj:
-            return ORMNotFoundException(id=id)
+    async def ids_by_urls(self, urls: Collection[str]) -> dict[str, int]:
+        """Map URLs to primary keys with a single query, skipping unknown URLs."""
+        if not urls:
+            return {}
+        stmt = select(self._model.url, self._model.id).where(self._url_in(urls))
+        return dict((await self.session.execute(stmt)).tuples().all())
 
-        for k, v in attrs.items():
-            if k not in {"id", "created_at", "updated_at"} and hasattr(db_obj, k):
-                setattr(db_obj, k, v)
+    async def existing_ids(self, ids: Collection[int]) -> set[int]:
+        """Return the subset of `ids` that exist, with a single query."""
+        if not ids:
+            return set()
+        stmt = select(self._model.id).where(self._model.id.in_(list(ids)))
+        return set((await self.session.scalars(stmt)).all())
 
-        self.session.add(db_obj)
-        await self.session.flush()
-        await self.session.refresh(db_obj)
+    async def fingerprints(self, urls: Collection[str]) -> dict[str, str | None]:
+        """Map the URLs among `urls` that have a row to their fingerprint."""
+        if not urls:
+            return {}
+        stmt = select(self._model.url, self._model.fingerprint).where(
+            self._url_in(urls)
+        )
+        return dict((await self.session.execute(stmt)).tuples().all())
+
+    async def mark_synced(self, urls: Collection[str], synced_at: datetime) -> int:
+        """Stamp the rows with these URLs as synced at `synced_at`.
+
+        `updated_at` is left alone: the rows themselves did not change.
+        Returns how many rows were stamped.
+        """
+        if not urls:
+            return 0
+        values: dict[str, Any] = {"synced_at": synced_at}
+        if "updated_at" in self._model.__table__.c:
+            values["updated_at"] = self._model.updated_at
+        result = await self.session.execute(
+            update(self._model)
+            .where(self._url_in(urls))
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def delete_not_synced_since(self, synced_at: datetime) -> int:
+        """Delete the rows not synced since `synced_at` and return how many."""
+        result = await self.session.execute(
+            delete(self._model)
+            .where(
+                self._model.synced_at.is_(None) | (self._model.synced_at < synced_at)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def update(self, id: int, attrs: dict) -> _T:
+        """Update columns of a row with a single UPDATE ... RETURNING.
+
+        Read-only columns (id, created_at, updated_at) are ignored and unknown
+        names raise ValueError. Relationships of the returned object are not
+        loaded. Raises ORMNotFoundException if there is no row with this ID.
+        """
+        columns = _column_names(self._model)
+        if unknown := attrs.keys() - columns:
+            raise ValueError(
+                f"Unknown attributes for {self._model.__name__}: {sorted(unknown)}"
+            )
+        values = {k: v for k, v in attrs.items() if k not in READ_ONLY_COLUMNS}
+        if not values:
+            db_obj = await self.get(id=id, profile=LoadProfile.NONE)
+        else:
+            stmt = (
+                update(self._model)
+                .where(self._model.id == id)
+                .values(values)
+                .returning(self._model)
+                .options(raiseload("*"))
+                .execution_options(populate_existing=True)
+            )
+            db_obj = await self.session.scalar(stmt)
+        if db_obj is None:
+            raise ORMNotFoundException(id=id)
         return db_obj
 
     async def delete(self, obj: _T) -> None:
@@ -79,47 +253,183 @@ class Repository(Generic[_T]):
         await self.session.delete(obj)
         await self.session.flush()
 
-    async def list(self, *, limit: int, offset: int) -> Sequence[_T]:
-        """Return all rows of the model."""
-        result = await self.session.execute(
-            select(self._model)
-            .options(
-                *(await self._eager_options_for_all())  # lazy load all relationships
-            )
-            .order_by(self._model.id)
-            .limit(limit)
-            .offset(offset)
-        )
+    async def list(
+        self,
+        *,
+        limit: int,
+        offset: int = 0,
+        after: int | None = None,
+        profile: str | None = None,
+    ) -> Sequence[_T]:
+        """Return a page of rows ordered by primary key.
+
+        If `after` is given, the page starts right after that primary key
+        (keyset pagination) and `offset` is ignored, so deep pages cost the
+        same as the first one.
+        """
+        stmt = self._list_stmt(limit=limit, offset=offset, after=after, profile=profile)
+        result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def stream(
+        self, *, batch_size: int, profile: str | None = None
+    ) -> AsyncGenerator[Sequence[_T], None]:
+        """Yield every row in primary key order, `batch_size` rows at a time.
+
+        The table is walked with keyset batches (id > last seen id), so every
+        batch is an index range scan and the whole walk is linear in the table
+        size while memory stays bounded by `batch_size`.
+        """
+        stmt = self._list_stmt(limit=batch_size, profile=profile)
+        last_id = None
+        while True:
+            batch_stmt = (
+                stmt if last_id is None else stmt.where(self._model.id > last_id)
+            )
+            batch = (await self.session.scalars(batch_stmt)).all()
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1].id
+
+    async def list_with_total(
+        self, *, limit: int, offset: int = 0, profile: str | None = None
+    ) -> tuple[Sequence[_T], int | None]:
+        """Return a page of rows and the table total in a single query.
+
+        The total comes from a `count(*) OVER ()` window, so it is None when
+        the page is empty.
+        """
+        stmt = self._list_stmt(limit=limit, offset=offset, profile=profile)
+        stmt = stmt.add_columns(func.count().over().label("total"))
+        rows = (await self.session.execute(stmt)).all()
+        total = rows[0].total if rows else None
+        return [row[0] for row in rows], total
+
     async def count(self) -> int:
         stmt = select(func.count()).select_from(self._model)
         return await self.session.scalar(stmt)
 
-    async def search(self, query: str) -> Sequence[_T]:
-        """Search rows of the model by name. Default limit is 100."""
+    async def estimated_count(self) -> int | None:
+        """Return the planner's row estimate for the table.
+
+        Returns None on databases without statistics and on tables that were
+        never analyzed.
+        """
+        if self._dialect_name == "postgresql":
+            estimate = await self.session.scalar(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = to_regclass(:table_name)"
+                ),
+                {"table_name": self.table_name},
+            )
+            if estimate is not None and estimate >= 0:
+                return estimate
+        return None
+
+    @property
+    def table_name(self) -> str:
+        return self._model.__table__.name
+
+    @property
+    def _dialect_name(self) -> str:
+        return self.session.bind.dialect.name
+
+    def _url_in(self, urls: Collection[str]) -> ColumnElement[bool]:
+        """`url = ANY(:urls)` on PostgreSQL (one array parameter), else IN."""
+        if self._dialect_name == "postgresql":
+            return self._model.url == any_(
+                bindparam("urls", list(urls), type_=postgresql.ARRAY(String))
+            )
+        return self._model.url.in_(list(urls))
+
+    def _insert(self, table: Table | None = None):
+        """Return an INSERT into the model (or `table`) supporting ON CONFLICT."""
+        target = self._model if table is None else table
+        if self._dialect_name == "postgresql":
+            return postgresql.insert(target)
+        if self._dialect_name == "sqlite":
+            return sqlite.insert(target)
+        raise NotImplementedError(f"Upserts are not supported on {self._dialect_name}")
+
+    async def search(
+        self,
+        query: str,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+        profile: str | None = None,
+    ) -> Sequence[_T]:
+        """Search rows whose SEARCH_QUERY_ATTR contains `query`, ignoring case.
+
+        On PostgreSQL the ILIKE is served by the pg_trgm GIN index of the
+        column and results are ranked by trigram similarity to the query.
+        Other databases fall back to a plain ILIKE ordered by primary key.
+        `limit` defaults to SEARCH_LIMIT.
+        """
         attr = getattr(self._model, self.SEARCH_QUERY_ATTR)
         if not attr:
             raise RuntimeError("Query attribute is not set")
         stmt = (
             select(self._model)
-            .options(
-                *(await self._eager_options_for_all())  # lazy load all relationships
-            )
-            .where(attr.ilike(f"%{query}%"))
-            .order_by(self._model.id)
-            .limit(50)
+            .options(*self._loader_options(profile))
+            .where(attr.ilike(f"%{_escape_like(query)}%", escape="/"))
+            .limit(limit or self.SEARCH_LIMIT)
+            .offset(offset)
         )
+        if self._dialect_name == "postgresql":
+            stmt = stmt.order_by(func.similarity(attr, query).desc(), self._model.id)
+        else:
+            stmt = stmt.order_by(self._model.id)
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
-    async def _eager_options_for_all(self):
-        """Return a list of selectinload options for all relationships.
+    def _list_stmt(
+        self,
+        *,
+        limit: int,
+        offset: int = 0,
+        after: int | None = None,
+        profile: str | None = None,
+    ) -> Select:
+        stmt = (
+            select(self._model)
+            .options(*self._loader_options(profile))
+            .order_by(self._model.id)
+            .limit(limit)
+        )
+        if after is not None:
+            return stmt.where(self._model.id > after)
+        return stmt.offset(offset)
+
+    def _loader_options(self, profile: str | None) -> tuple[ORMOption, ...]:
+        """Return the loader options of a profile (DEFAULT_LOAD_PROFILE if None).
 
-        This is used to avoid the N+1 problem when loading relationships.
-        Subclasses can override this method to customize which relationships
-        to eagerly load.
+        Related rows are loaded with `selectinload`, one extra SELECT per
+        loaded relationship, which avoids the N+1 problem.
         """
-        mapper = inspect(self._model)
-        relationship_names = list(mapper.relationships.keys())
-        return [selectinload(getattr(self._model, name)) for name in relationship_names]
+        return self._build_loader_options(profile or self.DEFAULT_LOAD_PROFILE)
+
+    @classmethod
+    @functools.cache
+    def _build_loader_options(cls, profile: str) -> tuple[ORMOption, ...]:
+        relationships = _relationships(cls._model)
+        if profile == LoadProfile.NONE:
+            return (raiseload("*"),)
+        if profile == LoadProfile.FULL:
+            return tuple(
+                selectinload(getattr(cls._model, name)) for name in relationships
+            )
+        if profile == LoadProfile.IDS_ONLY:
+            return tuple(
+                selectinload(getattr(cls._model, name)).load_only(target.id)
+                for name, target in relationships.items()
+            )
+        if profile not in cls.LOAD_PROFILES:
+            raise ValueError(f"Unknown loading profile {profile!r} for {cls.__name__}")
+        return (
+            *(selectinload(getattr(cls._model, n)) for n in cls.LOAD_PROFILES[profile]),
+            raiseload("*"),
+        )
@@ -1,18 +1,47 @@
 from __future__ import annotations
 
+from datetime import datetime
 from math import ceil
-from typing import AsyncGenerator, Generic, Sequence, TypeVar
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Callable,
+    Generic,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    TypeVar,
+)
 
 import sqlalchemy
 import sqlalchemy.exc
 
 from src.exceptions import ORMDuplicateException, ORMNotFoundException
+from src.models import fingerprint
 from src.repository import Repository
+from src.utils.iterables import achunked
+from src.utils.pagination import (
+    CountStrategy,
+    count_cache,
+    decode_cursor,
+    encode_cursor,
+)
 from src.utils.schemas import Page
 
 _T = TypeVar("_T")  # ORM model type
 
 
+class SyncReport(NamedTuple):
+    """Rows written (or not) by a sync run."""
+
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+
 class ORMBaseService(Generic[_T]):
     """Base service for ORM models."""
 
@@ -35,16 +64,16 @@ class CreateORMService(ORMBaseService, Generic[_T]):
 class GetORMService(ORMBaseService, Generic[_T]):
     """Get a single ORM model by ID."""
 
-    async def get(self, id: int) -> _T:
+    async def get(self, id: int, *, profile: str | None = None) -> _T:
         """Retrieve an orm by ID."""
-        obj = await self._repository.get(id=id)
+        obj = await self._repository.get(id=id, profile=profile)
         if not obj:
             raise ORMNotFoundException(id=id)
         return obj
 
-    async def by_url(self, url: str) -> _T:
+    async def by_url(self, url: str, *, profile: str | None = None) -> _T:
         """Retrieve an orm by URL."""
-        obj = await self._repository.by_url(url=url)
+        obj = await self._repository.by_url(url=url, profile=profile)
         if not obj:
             raise ORMNotFoundException(id=url)
         return obj
@@ -54,51 +83,193 @@ class ListPaginationORMService(ORMBaseService, Generic[_T]):
     """List all ORM models with pagination."""
 
     BATCH_SIZE = 50
+    FETCH_SIZE = 1000  # Rows per query when walking the whole table
+    COUNT_STRATEGY: CountStrategy = CountStrategy.EXACT
+
+    async def list(
+        self,
+        *,
+        page: int = 1,
+        page_size: int = BATCH_SIZE,
+        after: str | None = None,
+        count_strategy: CountStrategy | None = None,
+        profile: str | None = None,
+    ) -> Page:
+        """List all orm.
+
+        Pages by `page`/`page_size` (OFFSET) unless an `after` cursor is given,
+        in which case the page starts right after the cursor (keyset).
+        Either way `next_cursor` points at the following page, if any.
 
-    async def list(self, *, page: int = 1, page_size: int = BATCH_SIZE) -> Page:
-        """List all orm."""
-        page = max(1, page)
+        `count_strategy` overrides the service's COUNT_STRATEGY for this call
+        and `profile` picks the repository loading profile.
+        """
+        count_strategy = count_strategy or self.COUNT_STRATEGY
         page_size = max(1, min(page_size, 1000))
-        offset = (page - 1) * page_size
-        items = await self._repository.list(limit=page_size, offset=offset)
-        total = await self._repository.count()
+        total = None
+        # Fetch one extra row to know whether there is a next page.
+        if after is not None:
+            page = None
+            rows = await self._repository.list(
+                limit=page_size + 1, after=decode_cursor(after), profile=profile
+            )
+        elif count_strategy is CountStrategy.WINDOW:
+            page = max(1, page)
+            offset = (page - 1) * page_size
+            rows, total = await self._repository.list_with_total(
+                limit=page_size + 1, offset=offset, profile=profile
+            )
+        else:
+            page = max(1, page)
+            offset = (page - 1) * page_size
+            rows = await self._repository.list(
+                limit=page_size + 1, offset=offset, profile=profile
+            )
+
+        items = rows[:page_size]
+        next_cursor = encode_cursor(items[-1].id) if len(rows) > page_size else None
+        if total is not None:
+            total_exact = True
+        else:
+            total, total_exact = await self._total(count_strategy)
 
         return Page(
             items=items,
             total=total,
             page=page,
             page_size=page_size,
-            pages=ceil(total / page_size) if total else 1,
+            pages=(ceil(total / page_size) or 1) if total is not None else None,
+            total_exact=total_exact,
+            next_cursor=next_cursor,
         )
 
-    async def list_all(self) -> AsyncGenerator[Sequence[_T]]:
-        """List all orm without pagination."""
-        offset = 0
-        while True:
-            batch = await self._repository.list(limit=self.BATCH_SIZE, offset=offset)
-            if not batch:
-                break
+    async def _total(self, count_strategy: CountStrategy) -> tuple[int | None, bool]:
+        """Return the table total and whether it is exact.
+
+        The window strategy lands here only when it could not be applied
+        (cursor pages and empty pages) and falls back to an exact count, as
+        does the estimate strategy when there is no estimate.
+        """
+        if count_strategy is CountStrategy.NONE:
+            return None, False
+        if count_strategy is CountStrategy.ESTIMATE:
+            estimate = await self._repository.estimated_count()
+            if estimate is not None:
+                return estimate, False
+        if count_strategy is CountStrategy.CACHED:
+            table_name = self._repository.table_name
+            total = await count_cache.get(table_name)
+            if total is not None:
+                return total, False
+            total = await self._repository.count()
+            await count_cache.set(table_name, total)
+            return total, True
+        return await self._repository.count(), True
+
+    async def list_all(
+        self, *, fetch_size: int | None = None, profile: str | None = None
+    ) -> AsyncGenerator[_T, None]:
+        """List all orm without pagination.
+
+        Rows are fetched `fetch_size` (default FETCH_SIZE) at a time, so this
+        is safe for full-table walks of any size.
+        """
+        batch_size = fetch_size or self.FETCH_SIZE
+        async for batch in self._repository.stream(
+            batch_size=batch_size, profile=profile
+        ):
             for item in batch:
                 yield item
-            offset += self.BATCH_SIZE
 
 
 class UpdateORMService(ORMBaseService, Generic[_T]):
     """Update an existing ORM model."""
 
     async def update(self, id: int, attrs: dict) -> _T:
-        """Update an existing orm."""
-        existing_obj = await self._repository.get(id=id)
-        if not existing_obj:
-            raise ORMNotFoundException(id=id)
+        """Update an existing orm.
 
+        Raises ORMNotFoundException if there is no orm with this ID.
+        """
         return await self._repository.update(id=id, attrs=attrs)
 
 
 class SearchORMService(ORMBaseService, Generic[_T]):
     """Search ORM models by a specific attribute."""
 
-    async def search(self, query: str) -> Sequence[_T]:
+    async def search(
+        self,
+        query: str,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+        profile: str | None = None,
+    ) -> Sequence[_T]:
         """Search orm by name."""
-        items = await self._repository.search(query=query)
+        items = await self._repository.search(
+            query=query, limit=limit, offset=offset, profile=profile
+        )
         return items
+
+
+class SyncORMService(ORMBaseService, Generic[_T]):
+    """Sync ORM models with upstream records, writing only what changed."""
+
+    SYNC_BATCH_SIZE = 500  # Records written per transaction by `sync()`
+
+    async def sync(
+        self,
+        records: Iterable[Mapping[str, Any]] | AsyncIterable[Mapping[str, Any]],
+        to_values: Callable[[Mapping[str, Any]], Mapping[str, Any]],
+        *,
+        prune: bool = False,
+    ) -> SyncReport:
+        """Write the records, mapped to column values by `to_values`, that changed.
+
+        Records are consumed SYNC_BATCH_SIZE at a time and every batch is
+        written in its own transaction as soon as it is complete, so writes
+        overlap with a streamed download. The fingerprint of each row is
+        compared with the stored ones, read per batch, and only new and
+        changed rows are upserted: a sync of an unchanged collection writes
+        nothing. With `prune`, `records` is the whole upstream collection:
+        every row seen is stamped with the start of the run (unchanged rows
+        with one UPDATE per batch) and, once it is consumed, the rows without
+        that stamp are deleted (never when it is empty, which is more likely
+        an upstream failure). The cached total of the table is dropped when
+        rows were inserted or deleted.
+        """
+        session = self._repository.session
+        synced_at = datetime.now()
+        inserted = updated = unchanged = 0
+        async for batch in achunked(records, self.SYNC_BATCH_SIZE):
+            rows = {}
+            for record in batch:
+                row = dict(to_values(record))
+                row["fingerprint"] = fingerprint(row)
+                row["synced_at"] = synced_at
+                rows[row["url"]] = row
+            async with session.begin():
+                stored = await self._repository.fingerprints(rows.keys())
+                changed = [
+                    row
+                    for url, row in rows.items()
+                    if stored.get(url) != row["fingerprint"]
+                ]
+                if changed:
+                    await self._repository.upsert_many(changed)
+                if prune:
+                    await self._repository.mark_synced(
+                        rows.keys() - {row["url"] for row in changed}, synced_at
+                    )
+            updated += sum(row["url"] in stored for row in changed)
+            inserted += sum(row["url"] not in stored for row in changed)
+            unchanged += len(rows) - len(changed)
+
+        deleted = 0
+        if prune and inserted + updated + unchanged:
+            async with session.begin():
+                deleted = await self._repository.delete_not_synced_since(synced_at)
+        if inserted or deleted:
+            await count_cache.invalidate(self._repository.table_name)
+        return SyncReport(
+            inserted=inserted, updated=updated, deleted=deleted, unchanged=unchanged
+        )
@@ -79,6 +79,9 @@ class AuthenticationConfig(BaseModel):
     JWT_ALGORITHM: str = env.str("JWT_ALGORITHM")
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: str = env.int("JWT_ACCESS_TOKEN_EXPIRE_MINUTES")
     JWT_TOKEN_URL: str = env.str("JWT_TOKEN_URL", "/v1/user/token")
+    # Verified token claims kept in memory per worker.
+    JWT_CLAIMS_CACHE_SIZE: int = env.int("JWT_CLAIMS_CACHE_SIZE", 10_000)
+    JWT_CLAIMS_CACHE_TTL: int = env.int("JWT_CLAIMS_CACHE_TTL", 60)
 
 
 class Settings(BaseSettings):
@@ -91,10 +94,59 @@ class Settings(BaseSettings):
     ENABLE_SWAGGER: bool = env.bool("ENABLE_SWAGGER", False)
     CORS_ORIGINS: List = env.list("CORS_ORIGINS")
     DATABASE_URL: str = env.str("DATABASE_URL")
+    REDIS_URL: str = env.str("REDIS_URL")
     TEST_DATABASE_URL: str = DATABASE_URL.replace("star_wars_characters", "test")
+    # Pagination
+    # ------------------------------------------------------------------------------
+    # Seconds a `cached` count is reused, unless a write drops it first.
+    PAGINATION_COUNT_CACHE_TTL: int = env.int("PAGINATION_COUNT_CACHE_TTL", 60)
+    # Votes
+    # ------------------------------------------------------------------------------
+    VOTE_BATCH_MAX_SIZE: int = env.int("VOTE_BATCH_MAX_SIZE", 500)
+    VOTE_BUFFER_ENABLED: bool = env.bool("VOTE_BUFFER_ENABLED", False)
+    VOTE_BUFFER_MAX_SIZE: int = env.int("VOTE_BUFFER_MAX_SIZE", 5000)
+    VOTE_BUFFER_FLUSH_INTERVAL: float = env.float("VOTE_BUFFER_FLUSH_INTERVAL", 1.0)
+    # Votes buffered beyond this are rejected with a 503.
+    VOTE_BUFFER_MAX_PENDING: int = env.int("VOTE_BUFFER_MAX_PENDING", 20000)
+    # Failed flushes in a row before the votes that cannot be written are dropped.
+    VOTE_BUFFER_MAX_RETRIES: int = env.int("VOTE_BUFFER_MAX_RETRIES", 3)
+    FILM_LEADERBOARD_MAX_STALENESS: float = env.float(
+        "FILM_LEADERBOARD_MAX_STALENESS", 30.0
+    )
+    FILM_LEADERBOARD_PRIOR_WEIGHT: int = env.int("FILM_LEADERBOARD_PRIOR_WEIGHT", 10)
+    # Passwords
+    # ------------------------------------------------------------------------------
+    # Threads hashing passwords and calls allowed to wait for one, more get a 503.
+    PASSWORD_HASH_WORKERS: int = env.int("PASSWORD_HASH_WORKERS", 4)
+    PASSWORD_HASH_QUEUE_SIZE: int = env.int("PASSWORD_HASH_QUEUE_SIZE", 64)
+    # Scheme of new hashes, "bcrypt" or "argon2" (requires argon2-cffi). Hashes of
+    # the other scheme or other parameters are replaced on login.
+    PASSWORD_SCHEME: str = env.str("PASSWORD_SCHEME", "bcrypt")
+    PASSWORD_BCRYPT_ROUNDS: int = env.int("PASSWORD_BCRYPT_ROUNDS", 12)
+    PASSWORD_ARGON2_TIME_COST: int = env.int("PASSWORD_ARGON2_TIME_COST", 3)
+    PASSWORD_ARGON2_MEMORY_COST: int = env.int("PASSWORD_ARGON2_MEMORY_COST", 65536)
+    PASSWORD_ARGON2_PARALLELISM: int = env.int("PASSWORD_ARGON2_PARALLELISM", 4)
+    # Integrations
+    # ------------------------------------------------------------------------------
+    PLUGIN_CONNECTION_LIMIT: int = env.int("PLUGIN_CONNECTION_LIMIT", 100)
+    PLUGIN_CONNECTION_LIMIT_PER_HOST: int = env.int(
+        "PLUGIN_CONNECTION_LIMIT_PER_HOST", 8
+    )
+    PLUGIN_DNS_CACHE_TTL: int = env.int("PLUGIN_DNS_CACHE_TTL", 300)
+    PLUGIN_KEEPALIVE_TIMEOUT: float = env.float("PLUGIN_KEEPALIVE_TIMEOUT", 30.0)
+    PLUGIN_MAX_CONCURRENCY: int = env.int("PLUGIN_MAX_CONCURRENCY", 8)
+    # SQLite file caching plugin responses for conditional requests, empty disables.
+    PLUGIN_HTTP_CACHE_PATH: str = env.str("PLUGIN_HTTP_CACHE_PATH", "")
+    # Films linked to their characters and starships per transaction.
+    SYNC_RELATIONSHIP_CHUNK_SIZE: int = env.int("SYNC_RELATIONSHIP_CHUNK_SIZE", 20)
+    # Delete the entities missing upstream. Deleted films take their votes along.
+    SYNC_PRUNE_DELETED: bool = env.bool("SYNC_PRUNE_DELETED", False)
     # Celery
     # ------------------------------------------------------------------------------
     CELERY_CONFIG: CeleryConfig = CeleryConfig()
+    # Database connections kept, and opened on top of them, by each worker process.
+    CELERY_DB_POOL_SIZE: int = env.int("CELERY_DB_POOL_SIZE", 2)
+    CELERY_DB_MAX_OVERFLOW: int = env.int("CELERY_DB_MAX_OVERFLOW", 3)
     DEBUG: bool = False
     LOGGING_CONFIG: dict = get_logging_config(
         env.str("LOGGING_LEVEL", "INFO"), env.str("LOGGING_FORMAT", "json")
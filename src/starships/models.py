@@ -2,19 +2,28 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, Mapping
 
-from sqlalchemy import Integer, String
+from sqlalchemy import Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.models import Base, Timestamps, starship_films
+from src.models import Base, Fingerprinted, Timestamps, starship_films
 
 if TYPE_CHECKING:
     from src.films.models import Film  # noqa: F401
 
 
-class Starship(Base, Timestamps):
+class Starship(Base, Timestamps, Fingerprinted):
     """Starship ORM model."""
 
     __tablename__ = "starships"
+    __table_args__ = (
+        # Serves the substring search (ILIKE) in `StarshipRepository.search`.
+        Index(
+            "ix_starships_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String, index=True)
@@ -38,6 +47,11 @@ class Starship(Base, Timestamps):
     @classmethod
     def from_dict(cls, data: Mapping[str, Any]) -> "Starship":
         """Create a Starship instance from a dictionary."""
+        return cls(**cls.values_from_dict(data))
+
+    @classmethod
+    def values_from_dict(cls, data: Mapping[str, Any]) -> dict:
+        """Map an upstream dictionary to column values."""
 
         def norm_text_num(v: Any) -> str | None:
             if v is None:
@@ -47,7 +61,7 @@ class Starship(Base, Timestamps):
                 return None
             return s.replace(",", "")
 
-        return cls(
+        return dict(
             name=data["name"],
             model=data.get("model"),
             manufacturer=data.get("manufacturer"),
@@ -5,8 +5,10 @@ import logging
 from fastapi import APIRouter, HTTPException, Path, Query
 
 from src.depends import StarshipServiceDI
-from src.exceptions import ORMNotFoundException
+from src.exceptions import InvalidCursorException, ORMNotFoundException
+from src.repository import LoadProfile
 from src.starships.schemas import StarshipOut
+from src.utils.pagination import AFTER_CURSOR_DESCRIPTION, CountStrategy
 from src.utils.schemas import Page
 
 logger = logging.getLogger(__name__)
@@ -23,9 +25,13 @@ starships_router = APIRouter(
 async def search_starships(
     StarshipServiceDI: StarshipServiceDI,
     query: str = Query(min_length=1),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
 ) -> list[StarshipOut]:
     """Search starships by name."""
-    characters = await StarshipServiceDI.search(query=query)
+    characters = await StarshipServiceDI.search(
+        query=query, limit=limit, offset=offset, profile=LoadProfile.NONE
+    )
     return characters
 
 
@@ -36,9 +42,21 @@ async def list_starships(
     StarshipServiceDI: StarshipServiceDI,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=1000),
+    after: str | None = Query(None, description=AFTER_CURSOR_DESCRIPTION),
+    include_total: bool = Query(True),
+    count_strategy: CountStrategy | None = Query(None),
 ) -> Page[StarshipOut]:
     """Fetch and store all starships in DB."""
-    characters = await StarshipServiceDI.list(page=page, page_size=page_size)
+    try:
+        characters = await StarshipServiceDI.list(
+            page=page,
+            page_size=page_size,
+            after=after,
+            count_strategy=count_strategy if include_total else CountStrategy.NONE,
+            profile=LoadProfile.NONE,
+        )
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
     return characters
 
 
@@ -48,7 +66,7 @@ async def retrieve_starship(
 ) -> StarshipOut:
     """Fetch and store all starships in DB."""
     try:
-        character = await StarshipServiceDI.get(id=id)
+        character = await StarshipServiceDI.get(id=id, profile=LoadProfile.NONE)
     except ORMNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail) from e
     return StarshipOut.model_validate(character)
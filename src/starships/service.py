@@ -1,13 +1,15 @@
 import logging
+from typing import AsyncIterable, Iterable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.exceptions import ORMNotFoundException
 from src.service import (
     CreateORMService,
     GetORMService,
     ListPaginationORMService,
     SearchORMService,
+    SyncORMService,
+    SyncReport,
 )
 from src.starships.models import Starship
 from src.starships.repository import StarshipRepository
@@ -20,6 +22,7 @@ class StarshipService(
     GetORMService[Starship],
     ListPaginationORMService[Starship],
     SearchORMService[Starship],
+    SyncORMService[Starship],
 ):
     """Starship service."""
 
@@ -28,13 +31,17 @@ class StarshipService(
         self._repository = StarshipRepository(session)
         super().__init__(repository=self._repository)
 
-    async def add_starships(self, starships: list[dict]) -> None:
-        """Add multiple starships in DB."""
-        async with self.session.begin():
-            for starship_data in starships:
-                starship = Starship.from_dict(data=starship_data)
-                logger.debug(f"Syncing starship: {starship.name}")
-                try:
-                    await self.by_url(url=starship.url)
-                except ORMNotFoundException:
-                    await self.create(obj=starship)
+    async def add_starships(
+        self,
+        starships: Iterable[dict] | AsyncIterable[dict],
+        *,
+        prune: bool = False,
+    ) -> SyncReport:
+        """Add or update starships in DB in batches, skipping the unchanged ones.
+
+        With `prune`, `starships` is the whole upstream collection and the
+        starships missing from it are deleted.
+        """
+        report = await self.sync(starships, Starship.values_from_dict, prune=prune)
+        logger.debug(f"Synced starships: {report}")
+        return report
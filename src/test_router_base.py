@@ -56,6 +56,40 @@ class RouterTestList(RouterTestBase):
         assert isinstance(data["items"], list)
         assert len(data["items"]) >= 10
 
+    async def test_list_entities_cursor(self, client: AsyncClient) -> None:
+        """Test walking entities with the `next_cursor` of the previous page."""
+        response = await client.get(self.path, params={"page_size": 5})
+        assert response.status_code == http.HTTPStatus.OK
+        first_page = response.json()
+        assert first_page["next_cursor"]
+
+        response = await client.get(
+            self.path, params={"page_size": 5, "after": first_page["next_cursor"]}
+        )
+        assert response.status_code == http.HTTPStatus.OK
+        second_page = response.json()
+        assert second_page["page"] is None
+        assert len(second_page["items"]) == 5
+
+        first_ids = [item["id"] for item in first_page["items"]]
+        second_ids = [item["id"] for item in second_page["items"]]
+        assert min(second_ids) > max(first_ids)
+
+    async def test_list_entities_without_total(self, client: AsyncClient) -> None:
+        """Test listing entities without counting the total."""
+        response = await client.get(self.path, params={"include_total": False})
+        assert response.status_code == http.HTTPStatus.OK
+
+        data = response.json()
+        assert data["total"] is None
+        assert data["total_exact"] is False
+        assert len(data["items"]) >= 10
+
+    async def test_list_entities_invalid_cursor(self, client: AsyncClient) -> None:
+        """Test listing entities with a malformed cursor."""
+        response = await client.get(self.path, params={"after": "not-a-cursor"})
+        assert response.status_code == http.HTTPStatus.BAD_REQUEST
+
 
 class RouterTestRetrieve(RouterTestBase):
     """Integration tests for retrieving an entity by ID in the router."""
@@ -148,6 +182,30 @@ class RouterTestSearch(RouterTestBase):
         assert isinstance(data, list)
         assert any(partial_name in ent[self.SEARCH_QUERY_ATTR] for ent in data)
 
+    async def test_search_entities_limit_offset(self, client: AsyncClient) -> None:
+        """Test paging through search results with limit and offset."""
+        partial_name = self._search_attr[:1]
+        response = await client.get(
+            f"{self.path}search/", params={"query": partial_name, "limit": 100}
+        )
+        assert response.status_code == http.HTTPStatus.OK
+        all_ids = [ent["id"] for ent in response.json()]
+
+        response = await client.get(
+            f"{self.path}search/",
+            params={"query": partial_name, "limit": 1, "offset": 1},
+        )
+        assert response.status_code == http.HTTPStatus.OK
+        assert [ent["id"] for ent in response.json()] == all_ids[1:2]
+
+    async def test_search_entities_wildcards_are_literal(
+        self, client: AsyncClient
+    ) -> None:
+        """Test LIKE wildcards in the query are not treated as patterns."""
+        response = await client.get(f"{self.path}search/", params={"query": "%_%"})
+        assert response.status_code == http.HTTPStatus.OK
+        assert response.json() == []
+
     async def test_search_entities_invalid_query(self, client: AsyncClient) -> None:
         """Test searching for entities with an invalid query parameter."""
         response = await client.get(f"{self.path}search/", params={"query": ""})
@@ -0,0 +1,128 @@
+"""Benchmark connection pool occupancy under concurrent registrations.
+
+Registers `--users` users, `--concurrency` at a time, against DATABASE_URL
+while sampling how many pooled connections are checked out and probing the
+latency of a trivial read, as a read endpoint would see it. The `inline` mode
+replays the former flow, hashing on the event loop inside the transaction,
+for comparison with the `service` mode (UserService.create).
+
+Usage: python src/users/benchmark.py [--mode service|inline] [--users 200]
+The users created are deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Insert the path to the root of your application at the beginning of sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import delete, text  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.settings import settings  # noqa: E402
+from src.users.models import User  # noqa: E402
+from src.users.service import UserService  # noqa: E402
+from src.utils.password import BCryptPasswordService  # noqa: E402
+
+
+async def register_service(session: AsyncSession, email: str) -> None:
+    await UserService(session).create(
+        User(email=email, password="Benchmark1!", full_name="Benchmark")
+    )
+
+
+async def register_inline(session: AsyncSession, email: str) -> None:
+    async with session.begin():
+        await session.execute(text("SELECT 1"))
+        password = BCryptPasswordService().hash("Benchmark1!")
+        session.add(User(email=email, password=password, full_name="Benchmark"))
+
+
+REGISTER = {"service": register_service, "inline": register_inline}
+
+
+async def sample_pool(engine: AsyncEngine, samples: list[int], stop: asyncio.Event):
+    while not stop.is_set():
+        samples.append(engine.sync_engine.pool.checkedout())
+        await asyncio.sleep(0.001)
+
+
+async def probe_reads(
+    Session: async_sessionmaker, latencies: list[float], stop: asyncio.Event
+):
+    while not stop.is_set():
+        start = time.perf_counter()
+        async with Session() as session:
+            await session.execute(text("SELECT 1"))
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+def percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else 0.0
+
+
+async def main(mode: str, users: int, concurrency: int, pool_size: int) -> None:
+    engine = create_async_engine(
+        settings.DATABASE_URL, pool_size=pool_size, max_overflow=0
+    )
+    Session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    domain = f"{uuid.uuid4().hex[:8]}.benchmark.invalid"
+    register = REGISTER[mode]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def register_one(n: int) -> None:
+        async with semaphore, Session() as session:
+            await register(session, f"user-{n}@{domain}")
+
+    samples: list[int] = []
+    latencies: list[float] = []
+    stop = asyncio.Event()
+    background = [
+        asyncio.create_task(sample_pool(engine, samples, stop)),
+        asyncio.create_task(probe_reads(Session, latencies, stop)),
+    ]
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(register_one(n) for n in range(users)))
+        elapsed = time.perf_counter() - start
+    finally:
+        stop.set()
+        await asyncio.gather(*background)
+        async with Session.begin() as session:
+            await session.execute(delete(User).where(User.email.like(f"%@{domain}")))
+        await engine.dispose()
+
+    print(f"mode={mode} users={users} concurrency={concurrency} pool={pool_size}")
+    print(f"throughput:       {users / elapsed:.1f} registrations/s")
+    if samples:
+        print(
+            f"pool checked out: max {max(samples)}, "
+            f"mean {statistics.mean(samples):.2f}"
+        )
+    if latencies:
+        print(
+            f"read latency:     p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+            f"p99 {percentile(latencies, 99) * 1000:.1f} ms, "
+            f"max {max(latencies) * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=REGISTER, default="service")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.mode, args.users, args.concurrency, args.pool_size))
@@ -0,0 +1,52 @@
+"""Maintenance commands of the users app.
+
+Usage: python src/users/commands.py calibrate-password [--target-ms 250]
+"""
+
+import argparse
+import logging.config
+import sys
+from pathlib import Path
+
+# Insert the path to the root of your application at the beginning of sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.settings import settings  # noqa: E402
+from src.utils.password import PasslibPasswordService, calibrate_rounds  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Rounds tried per scheme, bcrypt rounds are a log2 cost.
+CALIBRATION_ROUNDS = {"bcrypt": range(10, 17), "argon2": range(1, 11)}
+
+
+def calibrate_password(args: argparse.Namespace) -> None:
+    """Print the cost factor meeting the target verify latency on this host."""
+    scheme = args.scheme or settings.PASSWORD_SCHEME
+    rounds, seconds = calibrate_rounds(
+        scheme, args.target_ms / 1000, CALIBRATION_ROUNDS[scheme]
+    )
+    setting = {
+        "bcrypt": "PASSWORD_BCRYPT_ROUNDS",
+        "argon2": "PASSWORD_ARGON2_TIME_COST",
+    }[scheme]
+    if seconds * 1000 > args.target_ms:
+        logger.warning(f"Even the lowest cost takes {seconds * 1000:.1f} ms.")
+    print(f"{setting}={rounds}  # {seconds * 1000:.1f} ms per verify")
+
+
+COMMANDS = {"calibrate-password": calibrate_password}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--scheme", choices=PasslibPasswordService.SCHEMES)
+    args = parser.parse_args()
+    logging.config.dictConfig(settings.LOGGING_CONFIG)
+    COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import logging
+from typing import Any, Mapping
 
 from sqlalchemy import select
 
@@ -17,3 +18,17 @@ class UserRepository(Repository[User]):
         """Get a user by their email address."""
         stmt = select(User).where(User.email == email)
         return (await self.session.execute(stmt)).scalars().first()
+
+    async def create_if_absent(self, values: Mapping[str, Any]) -> User | None:
+        """Insert a user unless the email is taken (does not commit).
+
+        Runs a single `INSERT ... ON CONFLICT (email) DO NOTHING RETURNING`.
+        Returns the new user, or None if a user with this email exists.
+        """
+        stmt = (
+            self._insert()
+            .values(dict(values))
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User)
+        )
+        return await self.session.scalar(stmt)
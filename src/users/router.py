@@ -4,6 +4,7 @@ import logging
 from fastapi import APIRouter, HTTPException
 
 from src.depends import UserServiceDI
+from src.exceptions import PasswordServiceBusyException
 from src.users.constants import (
     CREATE_USERS_API_DESCRIPTION,
     USERS_AUTHENTICATION_API_DESCRIPTION,
@@ -11,13 +12,15 @@ from src.users.constants import (
 from src.users.exceptions import UserAlreadyExistsError
 from src.users.models import User
 from src.users.schemas import UserAuth, UserCreate, UserResponse, UserWithCredentials
-from src.utils.password import BCryptPasswordService
 
 logger = logging.getLogger(__name__)
 
 APP_NAME = "users"
 users_router = APIRouter(prefix=f"/{APP_NAME}", tags=[APP_NAME])
 
+# Sent with 503s when the password service is saturated.
+RETRY_AFTER = {"Retry-After": "1"}
+
 
 @users_router.post("/auth", description=USERS_AUTHENTICATION_API_DESCRIPTION)
 async def authenticate(
@@ -30,11 +33,14 @@ async def authenticate(
             detail="Invalid credentials",
         )
 
-    user = await UserServiceDI.authenticate(
-        email=user_auth.email,
-        password=user_auth.password,
-        password_service=BCryptPasswordService(),
-    )
+    try:
+        user = await UserServiceDI.authenticate(
+            email=user_auth.email, password=user_auth.password
+        )
+    except PasswordServiceBusyException as e:
+        raise HTTPException(
+            status_code=e.status_code, detail=e.detail, headers=RETRY_AFTER
+        ) from e
     jwt_token = await UserServiceDI.token(user=user)
     return UserWithCredentials(
         id=user.id, full_name=user.full_name, email=user.email, token=jwt_token
@@ -58,8 +64,12 @@ async def create(
             status_code=http.HTTPStatus.BAD_REQUEST,
             detail=e.message,
         ) from e
+    except PasswordServiceBusyException as e:
+        raise HTTPException(
+            status_code=e.status_code, detail=e.detail, headers=RETRY_AFTER
+        ) from e
 
     jwt_token = await UserServiceDI.token(user=u)
     return UserWithCredentials(
-        id=user.id, full_name=user.full_name, email=user.email, token=jwt_token
+        id=u.id, full_name=u.full_name, email=u.email, token=jwt_token
     )
@@ -1,6 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.exceptions import ORMDuplicateException
 from src.service import CreateORMService, GetORMService
 from src.users.exceptions import (
     UserAlreadyExistsError,
@@ -8,55 +7,70 @@ from src.users.exceptions import (
 )
 from src.users.models import User
 from src.users.repository import UserRepository
-from src.utils.password import (
-    BCryptPasswordService,
-    PasswordService,
-)
+from src.utils.password import AsyncPasswordService, password_service
 
 
 class UserService(GetORMService[User], CreateORMService[User]):
     """Service class for user-related operations."""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        password_service: AsyncPasswordService = password_service,
+    ):
         self.session = session
         self._repository = UserRepository(session=session)
+        self._password_service = password_service
 
     async def create(self, obj: User) -> User:
-        """Create a new user with hashed password."""
+        """Create a new user with hashed password.
+
+        The password is hashed before a connection is checked out, then the
+        user is inserted with a single statement. Raises UserAlreadyExistsError
+        if the email is taken and PasswordServiceBusyException if too many
+        passwords are being hashed.
+        """
         if not obj.password:
             raise ValueError("Password must be provided")
 
+        hashed_password = await self._password_service.hash(plain_password=obj.password)
         async with self.session.begin():
-            password_service = BCryptPasswordService()
-            hashed_password = password_service.hash(plain_password=obj.password)
-            obj.password = hashed_password
-
-            try:
-                create = await super().create(obj=obj)
-            except ORMDuplicateException as e:
-                raise UserAlreadyExistsError(email=obj.email) from e
-
-            return create
+            user = await self._repository.create_if_absent(
+                {
+                    "email": obj.email,
+                    "password": hashed_password,
+                    "full_name": obj.full_name,
+                    "is_active": bool(obj.is_active),
+                }
+            )
+        if user is None:
+            raise UserAlreadyExistsError(email=obj.email)
+        return user
 
-    async def authenticate(
-        self,
-        email: str,
-        password: str,
-        password_service: PasswordService = BCryptPasswordService(),
-    ) -> User:
+    async def authenticate(self, email: str, password: str) -> User:
         """Authenticate a user by checking their email and password.
 
         If user is not found or password does not match, raises UserBadCredentials.
+        Raises PasswordServiceBusyException if too many passwords are being
+        verified. A password hash with outdated parameters is replaced.
         """
-        user = await self._repository.by_email(email=email)
+        # No connection is held while verifying the password.
+        async with self.session.begin():
+            user = await self._repository.by_email(email=email)
         if user is None:
             raise UserBadCredentials()
 
-        if not password_service.verify(
+        verified, new_hash = await self._password_service.verify_and_update(
             plain_password=password, hashed_password=user.password
-        ):
+        )
+        if not verified:
             raise UserBadCredentials()
 
+        if new_hash is not None:
+            async with self.session.begin():
+                user = await self._repository.update(
+                    id=user.id, attrs={"password": new_hash}
+                )
         return user
 
     async def token(self, user: User) -> str:
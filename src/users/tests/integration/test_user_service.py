@@ -0,0 +1,85 @@
+import logging
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.users.exceptions import UserAlreadyExistsError, UserBadCredentials
+from src.users.models import User
+from src.users.service import UserService
+from src.utils.password import AsyncPasswordService, BCryptPasswordService
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.anyio
+class TestUserService:
+    """Integration tests for the user service."""
+
+    @pytest.fixture(autouse=True)
+    async def setup(self, session: AsyncSession) -> None:
+        self.service = UserService(session=session)
+
+    async def test_create(self) -> None:
+        """Test creating a user stores a hashed password."""
+        user = await self.service.create(
+            User(email="new@example.invalid", password="Secret1!", full_name="New")
+        )
+        assert user.id is not None
+        assert user.email == "new@example.invalid"
+        assert user.password != "Secret1!"
+        assert user.is_active is False
+
+        authenticated = await self.service.authenticate(
+            email="new@example.invalid", password="Secret1!"
+        )
+        assert authenticated.id == user.id
+
+    async def test_create_duplicate_email(self) -> None:
+        """Test creating a user with a taken email raises."""
+        await self.service.create(
+            User(email="taken@example.invalid", password="Secret1!", full_name="A")
+        )
+        with pytest.raises(UserAlreadyExistsError):
+            await self.service.create(
+                User(email="taken@example.invalid", password="Other1!", full_name="B")
+            )
+
+    async def test_authenticate_wrong_password(self) -> None:
+        """Test authenticating with a wrong password raises."""
+        await self.service.create(
+            User(email="wrong@example.invalid", password="Secret1!", full_name="W")
+        )
+        with pytest.raises(UserBadCredentials):
+            await self.service.authenticate(
+                email="wrong@example.invalid", password="Wrong1!"
+            )
+
+    async def test_authenticate_rehashes_outdated_password(
+        self, session: AsyncSession
+    ) -> None:
+        """Test a password hashed with other rounds is replaced on login."""
+        services = [
+            AsyncPasswordService(
+                BCryptPasswordService(rounds=rounds), max_workers=1, max_queue=1
+            )
+            for rounds in (4, 5)
+        ]
+        try:
+            old, new = (
+                UserService(session=session, password_service=service)
+                for service in services
+            )
+            await old.create(
+                User(email="old@example.invalid", password="Secret1!", full_name="O")
+            )
+
+            user = await new.authenticate(
+                email="old@example.invalid", password="Secret1!"
+            )
+            assert user.password.startswith("$2b$05$")
+            assert await new.authenticate(
+                email="old@example.invalid", password="Secret1!"
+            )
+        finally:
+            for service in services:
+                service.shutdown()
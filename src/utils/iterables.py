@@ -0,0 +1,31 @@
+"""Helpers for working with (async) iterables."""
+
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, TypeVar
+
+_T = TypeVar("_T")
+
+
+def chunked(iterable: Iterable[_T], size: int) -> Iterator[list[_T]]:
+    """Split an iterable into lists of at most `size` items."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+async def achunked(
+    iterable: Iterable[_T] | AsyncIterable[_T], size: int
+) -> AsyncIterator[list[_T]]:
+    """Split an iterable or an async iterable into lists of at most `size` items."""
+    if not isinstance(iterable, AsyncIterable):
+        for chunk in chunked(iterable, size):
+            yield chunk
+        return
+    chunk = []
+    async for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,84 @@
+"""Incremental decoding of JSON arrays."""
+
+import codecs
+import json
+from json.decoder import WHITESPACE
+from typing import Any
+
+_NUMBER_START = frozenset("-0123456789")
+_NUMBER_END = frozenset(",] \t\n\r")
+
+
+class JSONArrayDecoder:
+    """Decode the items of a top-level JSON array from chunks of its bytes.
+
+        decoder = JSONArrayDecoder()
+        for chunk in chunks:
+            for item in decoder.feed(chunk):
+                ...
+        decoder.close()
+
+    Only the item being downloaded is buffered, so memory depends on the size
+    of the largest item rather than of the array. An incomplete item is decoded
+    again with every chunk, items longer than `max_item_size` characters raise
+    ValueError.
+    """
+
+    def __init__(self, max_item_size: int = 1024 * 1024) -> None:
+        self.max_item_size = max_item_size
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        # Next token: "[", an item or "]", a "," or "]", an item, nothing.
+        self._expect = "start"
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Return the items completed by `chunk`."""
+        self._buffer += self._text.decode(chunk)
+        return self._decode()
+
+    def close(self) -> None:
+        """Check the array is complete, raise ValueError otherwise."""
+        self._buffer += self._text.decode(b"", final=True)
+        self._decode()
+        if self._expect != "end":
+            raise ValueError(f"Incomplete JSON array near {self._buffer[:50]!r}")
+
+    def _decode(self) -> list[Any]:
+        items = []
+        buffer, pos = self._buffer, 0
+        while (pos := WHITESPACE.match(buffer, pos).end()) < len(buffer):
+            char = buffer[pos]
+            if self._expect == "start":
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                pos += 1
+                self._expect = "first"
+            elif self._expect in ("first", "separator") and char == "]":
+                pos += 1
+                self._expect = "end"
+            elif self._expect == "separator":
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']', got {char!r}")
+                pos += 1
+                self._expect = "item"
+            elif self._expect == "end":
+                raise ValueError(f"Extra data after the JSON array: {char!r}")
+            else:
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # Incomplete item, wait for the next chunk.
+                if char in _NUMBER_START and (
+                    end == len(buffer) or buffer[end] not in _NUMBER_END
+                ):
+                    break  # The number could go on in the next chunk.
+                items.append(item)
+                pos = end
+                self._expect = "separator"
+        self._buffer = buffer[pos:]
+        if len(self._buffer) > self.max_item_size:
+            raise ValueError(
+                f"JSON array item longer than {self.max_item_size} characters"
+            )
+        return items
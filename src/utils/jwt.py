@@ -1,5 +1,6 @@
-import datetime
+import hashlib
 import http
+import time
 
 import jwt
 from fastapi import HTTPException, Request
@@ -9,16 +10,16 @@ from fastapi.security import (
     OAuth2PasswordBearer,
 )
 
-from src.settings import Settings
+from src.settings import Settings, settings
+from src.utils.cache import TTLCache
 
-settings = Settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=settings.AUTH_CONFIG.JWT_TOKEN_URL)
 
 
 class JwtAuthenticationService:
     """Service to encode and decode JWT tokens."""
 
-    def __init__(self, settings: Settings = Settings()):
+    def __init__(self, settings: Settings = settings):
         self.secret_key = settings.AUTH_CONFIG.JWT_SECRET_KEY
         self.algorithm = settings.AUTH_CONFIG.JWT_ALGORITHM
         self.access_token_expire_minutes = (
@@ -27,10 +28,11 @@ class JwtAuthenticationService:
 
     def encode(self, user_id: int) -> str:
         """Encode a payload into a JWT token."""
-        expire = datetime.datetime.now() + datetime.timedelta(
-            minutes=self.access_token_expire_minutes
-        )
-        payload = {"sub": str(user_id), "expire": expire.strftime("%Y-%m-%d %H:%M:%S")}
+        payload = {
+            "sub": str(user_id),
+            # Standard claim, enforced by `verify`.
+            "exp": int(time.time()) + self.access_token_expire_minutes * 60,
+        }
         return jwt.encode(payload, key=self.secret_key, algorithm=self.algorithm)
 
     def verify(self, token: HTTPAuthorizationCredentials) -> dict:
@@ -40,13 +42,25 @@ class JwtAuthenticationService:
 
 
 class JwtHTTPBearer(HTTPBearer):
+    """Bearer dependency returning the verified claims of the token.
+
+    Verified claims are cached by token hash until the token expires (`exp`),
+    so a client reusing its token is only verified once. Tokens without `exp`
+    are cached for `settings.AUTH_CONFIG.JWT_CLAIMS_CACHE_TTL` seconds.
+    """
+
     def __init__(
-        self, auth_service: JwtAuthenticationService = JwtAuthenticationService()
+        self,
+        auth_service: JwtAuthenticationService = JwtAuthenticationService(),
+        cache_size: int = settings.AUTH_CONFIG.JWT_CLAIMS_CACHE_SIZE,
     ):
         self.auth_service = auth_service
+        self.claims_cache: TTLCache[bytes, dict] = TTLCache(
+            maxsize=cache_size, ttl=settings.AUTH_CONFIG.JWT_CLAIMS_CACHE_TTL
+        )
         super().__init__(auto_error=True)
 
-    async def __call__(self, request: Request):
+    async def __call__(self, request: Request) -> dict:
         credentials: HTTPAuthorizationCredentials = await super().__call__(request)
         if credentials:
             if not credentials.scheme == "Bearer":
@@ -54,14 +68,33 @@ class JwtHTTPBearer(HTTPBearer):
                     status_code=http.HTTPStatus.FORBIDDEN,
                     detail="Invalid authentication scheme.",
                 )
-            if not self.auth_service.verify(credentials.credentials):
-                raise HTTPException(
-                    status_code=http.HTTPStatus.FORBIDDEN,
-                    detail="Invalid token or expired token.",
-                )
-            return credentials.credentials
+            return self.claims(credentials.credentials)
         else:
             raise HTTPException(
                 status_code=http.HTTPStatus.FORBIDDEN,
                 detail="Invalid authorization code.",
             )
+
+    def claims(self, token: str) -> dict:
+        """Return the verified claims of a token, raise 401 if it is invalid."""
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self.claims_cache.get(key)
+        if claims is not None:
+            return claims
+
+        try:
+            claims = self.auth_service.verify(token)
+        except jwt.InvalidTokenError:
+            raise HTTPException(
+                status_code=http.HTTPStatus.UNAUTHORIZED,
+                detail="Invalid or expired token.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if not claims:
+            raise HTTPException(
+                status_code=http.HTTPStatus.FORBIDDEN,
+                detail="Invalid token or expired token.",
+            )
+        ttl = claims["exp"] - time.time() if "exp" in claims else None
+        self.claims_cache.set(key, claims, ttl=ttl)
+        return claims
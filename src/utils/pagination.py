@@ -0,0 +1,117 @@
+"""Helpers for keyset (cursor) pagination."""
+
+import asyncio
+import base64
+import binascii
+import enum
+import json
+import logging
+import weakref
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.exceptions import InvalidCursorException
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+AFTER_CURSOR_DESCRIPTION = (
+    "Opaque cursor returned as `next_cursor` by the previous page. "
+    "When set, `page` is ignored."
+)
+
+
+class CountStrategy(str, enum.Enum):
+    """How a paginated listing computes its `total`."""
+
+    EXACT = "exact"  # SELECT count(*)
+    WINDOW = "window"  # count(*) OVER () on the page query itself
+    ESTIMATE = "estimate"  # The planner's row estimate
+    CACHED = "cached"  # An exact count cached in Redis for a TTL
+    NONE = "none"  # No total at all
+
+
+class CountCache:
+    """Table totals of the `cached` count strategy, shared through Redis.
+
+    Totals are kept for `ttl` seconds and the writes that change the row
+    count of a table drop its total with `invalidate`, whichever process
+    they run in (the API, the sync tasks of Celery workers). Redis errors are
+    logged and treated as misses: totals are then counted every time, and may
+    lag the writes whose invalidation failed by up to the TTL.
+    """
+
+    KEY_PREFIX = "count:"
+    TIMEOUT = 1.0  # Seconds to connect or answer before giving up
+
+    def __init__(self, url: str, ttl: int):
+        self.url = url
+        self.ttl = ttl
+        # Connections are bound to the event loop that opened them.
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Redis] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def get(self, table_name: str) -> int | None:
+        """Return the cached total of a table, None if missing."""
+        try:
+            total = await self._client().get(self.KEY_PREFIX + table_name)
+        except RedisError as e:
+            logger.warning(f"Could not read the cached count of {table_name}: {e}")
+            return None
+        return int(total) if total is not None else None
+
+    async def set(self, table_name: str, total: int) -> None:
+        """Cache the total of a table for `ttl` seconds."""
+        try:
+            await self._client().set(self.KEY_PREFIX + table_name, total, ex=self.ttl)
+        except RedisError as e:
+            logger.warning(f"Could not cache the count of {table_name}: {e}")
+
+    async def invalidate(self, *table_names: str) -> None:
+        """Drop the cached totals of tables, e.g. after rows were added or deleted."""
+        try:
+            await self._client().delete(*(self.KEY_PREFIX + t for t in table_names))
+        except RedisError as e:
+            logger.warning(f"Could not invalidate the counts of {table_names}: {e}")
+
+    def _client(self) -> Redis:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = Redis.from_url(
+                self.url,
+                socket_timeout=self.TIMEOUT,
+                socket_connect_timeout=self.TIMEOUT,
+            )
+        return client
+
+
+count_cache = CountCache(
+    url=settings.REDIS_URL, ttl=settings.PAGINATION_COUNT_CACHE_TTL
+)
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen primary key into an opaque cursor."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode an opaque cursor back to the last seen primary key.
+
+    Raises InvalidCursorException if the cursor was not produced by
+    `encode_cursor`.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = payload["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorException(cursor=cursor) from e
+
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise InvalidCursorException(cursor=cursor)
+    return last_id
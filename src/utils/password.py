@@ -1,7 +1,20 @@
 import abc
+import asyncio
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
 
 from passlib.context import CryptContext
 
+from src.exceptions import PasswordServiceBusyException
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
 
 class PasswordService(abc.ABC):
     """The generic password service interface."""
@@ -14,15 +27,40 @@ class PasswordService(abc.ABC):
     def verify(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against a hashed password."""
 
+    def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """Verify a password and return a new hash if the stored one is outdated."""
+        return self.verify(plain_password, hashed_password), None
 
-class BCryptPasswordService(PasswordService):
-    """A password service that uses the bcrypt hashing algorithm."""
 
-    def __init__(self) -> None:
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+class PasslibPasswordService(PasswordService):
+    """A password service hashing with a passlib scheme, e.g. bcrypt or argon2.
+
+    Hashes of the other supported schemes still verify. They, and hashes
+    whose rounds differ from `rounds`, are reported as outdated by
+    `verify_and_update`.
+    """
+
+    SCHEMES = ("bcrypt", "argon2")
+
+    def __init__(self, scheme: str, **options: int) -> None:
+        if scheme not in self.SCHEMES:
+            raise ValueError(f"Unsupported password scheme: {scheme}")
+        context_options = {
+            f"{scheme}__{name}": value for name, value in options.items()
+        }
+        if "rounds" in options:
+            context_options[f"{scheme}__min_rounds"] = options["rounds"]
+            context_options[f"{scheme}__max_rounds"] = options["rounds"]
+        self.pwd_context = CryptContext(
+            schemes=[scheme, *(other for other in self.SCHEMES if other != scheme)],
+            deprecated="auto",
+            **context_options,
+        )
 
     def hash(self, plain_password: str) -> str:
-        """Given a plain password, return the hashed version using bcrypt."""
+        """Given a plain password, return the hashed version."""
         hashed_password = self.pwd_context.hash(plain_password)
         # Mypy complains that the return type is Any.
         if not isinstance(hashed_password, str):
@@ -30,9 +68,131 @@ class BCryptPasswordService(PasswordService):
         return hashed_password
 
     def verify(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify a plain password against a hashed password using bcrypt."""
+        """Verify a plain password against a hashed password."""
         verified_password = self.pwd_context.verify(plain_password, hashed_password)
         # Mypy complains that the return type is Any.
         if not isinstance(hashed_password, str):
             raise ValueError("Hashed password is not a string.")
         return verified_password
+
+    def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """Verify a password and return a new hash if the stored one is outdated."""
+        return self.pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class BCryptPasswordService(PasslibPasswordService):
+    """A password service that uses the bcrypt hashing algorithm."""
+
+    def __init__(self, rounds: int | None = None) -> None:
+        super().__init__("bcrypt", **({"rounds": rounds} if rounds else {}))
+
+
+def _scheme_options(scheme: str) -> dict[str, int]:
+    """Return the hashing parameters of a scheme configured in the settings."""
+    if scheme == "argon2":
+        return {
+            "rounds": settings.PASSWORD_ARGON2_TIME_COST,
+            "memory_cost": settings.PASSWORD_ARGON2_MEMORY_COST,
+            "parallelism": settings.PASSWORD_ARGON2_PARALLELISM,
+        }
+    return {"rounds": settings.PASSWORD_BCRYPT_ROUNDS}
+
+
+def password_service_from_settings(scheme: str | None = None) -> PasslibPasswordService:
+    """Build the password service configured in the settings."""
+    scheme = scheme or settings.PASSWORD_SCHEME
+    return PasslibPasswordService(scheme, **_scheme_options(scheme))
+
+
+def calibrate_rounds(
+    scheme: str, target_seconds: float, rounds: Iterable[int], samples: int = 3
+) -> tuple[int, float]:
+    """Pick the highest rounds (cost factor) whose verify time meets the target.
+
+    The other parameters of the scheme come from the settings. Returns the
+    rounds and their median verify time, or the lowest rounds if none meets
+    the target.
+    """
+    chosen: tuple[int, float] | None = None
+    for cost in sorted(rounds):
+        service = PasslibPasswordService(
+            scheme, **_scheme_options(scheme) | {"rounds": cost}
+        )
+        hashed_password = service.hash("calibration")
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            service.verify("calibration", hashed_password)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        logger.info(f"{scheme} rounds={cost}: {median * 1000:.1f} ms")
+        if median > target_seconds:
+            chosen = chosen or (cost, median)
+            break
+        chosen = (cost, median)
+    if chosen is None:
+        raise ValueError("No rounds to calibrate.")
+    return chosen
+
+
+class AsyncPasswordService:
+    """Run a password service in a bounded thread pool, off the event loop.
+
+    Hashing is CPU bound and would block every other request of the worker.
+    bcrypt releases the GIL, so `max_workers` hashes run in parallel. At most
+    `max_queue` more calls wait for a thread, further calls raise
+    PasswordServiceBusyException instead of queueing without bound.
+    """
+
+    def __init__(
+        self, password_service: PasswordService, max_workers: int, max_queue: int
+    ):
+        self._password_service = password_service
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password"
+        )
+        self._max_pending = max_workers + max_queue
+        # Only touched from the event loop thread.
+        self._pending = 0
+
+    async def hash(self, plain_password: str) -> str:
+        """Hash a password and return the hashed version."""
+        return await self._run(self._password_service.hash, plain_password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a hashed password."""
+        return await self._run(
+            self._password_service.verify, plain_password, hashed_password
+        )
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """Verify a password and return a new hash if the stored one is outdated."""
+        return await self._run(
+            self._password_service.verify_and_update, plain_password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        """Stop the thread pool, running calls are not waited for."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, func: Callable[..., _T], *args) -> _T:
+        if self._pending >= self._max_pending:
+            raise PasswordServiceBusyException()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+
+# Shared by the whole process, so that the passlib context is built once.
+password_service = AsyncPasswordService(
+    password_service_from_settings(),
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
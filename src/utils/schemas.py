@@ -7,7 +7,9 @@ T = TypeVar("T")
 
 class Page(BaseModel, Generic[T]):
     items: list[T]
-    total: int = Field(ge=0)
-    page: int = Field(ge=1)
+    total: int | None = Field(default=None, ge=0)  # None when not counted
+    page: int | None = Field(default=None, ge=1)  # None when paging by cursor
     page_size: int = Field(ge=1, le=1000)
-    pages: int
+    pages: int | None = None
+    total_exact: bool = True  # False for estimated, cached or missing totals
+    next_cursor: str | None = None  # Pass as `after` to fetch the next page
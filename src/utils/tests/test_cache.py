@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.cache import TTLCache
+
+
+@pytest.mark.anyio
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    async def test_get_returns_cached_value(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+
+    async def test_entries_expire(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch("src.utils.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("src.utils.cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    async def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    async def test_pop_and_clear(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.pop("a")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
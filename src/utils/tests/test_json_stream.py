@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from src.utils.json_stream import JSONArrayDecoder
+
+ITEMS = [{"name": "Żółw ✓", "height": 172}, -12.5e3, "a, ]", None, True, [1, [2]], {}]
+
+
+def decode(document: bytes, chunk_size: int) -> list:
+    decoder = JSONArrayDecoder()
+    items = []
+    for start in range(0, len(document), chunk_size):
+        items.extend(decoder.feed(document[start : start + chunk_size]))
+    decoder.close()
+    return items
+
+
+@pytest.mark.anyio
+class TestJSONArrayDecoder:
+    """Tests for JSONArrayDecoder."""
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    async def test_any_chunk_boundary(self, indent: int | None):
+        document = json.dumps(ITEMS, ensure_ascii=False, indent=indent).encode()
+        for chunk_size in range(1, len(document) + 1):
+            assert decode(document, chunk_size) == ITEMS
+
+    async def test_items_are_decoded_as_soon_as_complete(self):
+        decoder = JSONArrayDecoder()
+        assert decoder.feed(b'[{"id": 1}, {"id"') == [{"id": 1}]
+        assert decoder.feed(b": 2}, 3") == [{"id": 2}]
+        assert decoder.feed(b"4]") == [34]
+        decoder.close()
+
+    async def test_empty_array(self):
+        assert decode(b" [ ]\n", 1) == []
+
+    @pytest.mark.parametrize(
+        "document",
+        [b'{"id": 1}', b"[1, 2", b"[1 2]", b"[1,]", b"[1] []", b'[{"id": 1}x]', b""],
+    )
+    async def test_invalid_document(self, document: bytes):
+        with pytest.raises(ValueError):
+            decode(document, 4)
+
+    async def test_item_too_large(self):
+        decoder = JSONArrayDecoder(max_item_size=16)
+        assert decoder.feed(b'[{"name": "short"}, {"name": "lo') == [{"name": "short"}]
+        with pytest.raises(ValueError):
+            decoder.feed(b"nger than sixteen")
@@ -37,6 +37,7 @@ class TestJwtAuthenticationService:
         token = self.jwt_service.encode(user_id)
         credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
         payload = self.jwt_service.verify(credentials.credentials)
+        assert payload.keys() == {"sub", "exp"}
         assert payload["sub"] == str(user_id)
 
     def test_verify_invalid_jwt(self):
@@ -64,7 +65,44 @@ class TestJwtHTTPBearer:
 
         with patch("fastapi.security.HTTPBearer.__call__", return_value=credentials):
             result = await self.jwt_bearer.__call__(MagicMock())
-            assert result == token
+            assert result["sub"] == str(user_id)
+
+    async def test_jwt_http_bearer_caches_claims(self):
+        token = self.jwt_service.encode(123)
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        with (
+            patch("fastapi.security.HTTPBearer.__call__", return_value=credentials),
+            patch.object(
+                self.jwt_service, "verify", wraps=self.jwt_service.verify
+            ) as verify,
+        ):
+            first = await self.jwt_bearer.__call__(MagicMock())
+            second = await self.jwt_bearer.__call__(MagicMock())
+
+        assert first == second
+        verify.assert_called_once_with(token)
+
+    async def test_jwt_http_bearer_invalid_token(self):
+        credentials = HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials="invalid.token.value"
+        )
+
+        with patch("fastapi.security.HTTPBearer.__call__", return_value=credentials):
+            with pytest.raises(HTTPException) as exc_info:
+                await self.jwt_bearer.__call__(MagicMock())
+            assert exc_info.value.status_code == 401
+
+    async def test_jwt_http_bearer_expired_token(self):
+        with patch("src.utils.jwt.time.time", return_value=0):
+            token = self.jwt_service.encode(123)
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        with patch("fastapi.security.HTTPBearer.__call__", return_value=credentials):
+            with pytest.raises(HTTPException) as exc_info:
+                await self.jwt_bearer.__call__(MagicMock())
+            assert exc_info.value.status_code == 401
+        assert len(self.jwt_bearer.claims_cache) == 0
 
     async def test_jwt_http_bearer_invalid_scheme(self):
         credentials = HTTPAuthorizationCredentials(
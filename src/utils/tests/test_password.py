@@ -1,6 +1,30 @@
+import asyncio
+import threading
+
 import pytest
 
-from src.utils.password import BCryptPasswordService
+from src.exceptions import PasswordServiceBusyException
+from src.utils.password import (
+    AsyncPasswordService,
+    BCryptPasswordService,
+    PasslibPasswordService,
+    PasswordService,
+    calibrate_rounds,
+)
+
+
+class BlockingPasswordService(PasswordService):
+    """Password service whose calls block until released."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def hash(self, plain_password: str) -> str:
+        self.release.wait(timeout=5)
+        return plain_password[::-1]
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self.hash(plain_password) == hashed_password
 
 
 @pytest.mark.anyio
@@ -37,3 +61,54 @@ class TestBCryptPasswordService:
             self.service.verify(
                 "StrongPass1!", 12345
             )  # Passing a non-string hashed password
+
+    async def test_verify_and_update_rehashes_outdated_rounds(self):
+        hashed_password = BCryptPasswordService(rounds=4).hash("StrongPass1!")
+        service = BCryptPasswordService(rounds=5)
+
+        verified, new_hash = service.verify_and_update("StrongPass1!", hashed_password)
+
+        assert verified is True
+        assert new_hash.startswith("$2b$05$")
+        assert service.verify_and_update("StrongPass1!", new_hash) == (True, None)
+        assert service.verify_and_update("Wrong", hashed_password) == (False, None)
+
+    async def test_unsupported_scheme_raises(self):
+        with pytest.raises(ValueError):
+            PasslibPasswordService("md5_crypt")
+
+    async def test_calibrate_rounds(self):
+        assert calibrate_rounds("bcrypt", 60, range(4, 6), samples=1)[0] == 5
+        assert calibrate_rounds("bcrypt", 0, range(4, 6), samples=1)[0] == 4
+
+
+@pytest.mark.anyio
+class TestAsyncPasswordService:
+    async def test_hash_and_verify(self):
+        service = AsyncPasswordService(
+            BCryptPasswordService(), max_workers=2, max_queue=2
+        )
+        try:
+            hashed_password = await service.hash("StrongPass1!")
+
+            assert await service.verify("StrongPass1!", hashed_password) is True
+            assert await service.verify("WrongPassword", hashed_password) is False
+        finally:
+            service.shutdown()
+
+    async def test_raises_when_saturated(self):
+        blocking = BlockingPasswordService()
+        service = AsyncPasswordService(blocking, max_workers=1, max_queue=1)
+        try:
+            running = [asyncio.create_task(service.hash("a")) for _ in range(2)]
+            await asyncio.sleep(0)
+
+            with pytest.raises(PasswordServiceBusyException):
+                await service.verify("a", "a")
+
+            blocking.release.set()
+            assert await asyncio.gather(*running) == ["a", "a"]
+            assert await service.verify("ab", "ba") is True
+        finally:
+            blocking.release.set()
+            service.shutdown()
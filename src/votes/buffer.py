@@ -0,0 +1,215 @@
+"""Write-behind buffer for votes.
+
+Votes are coalesced in memory per (user_id, film_id), last write wins, and
+written to the `votes` table in multi-row upserts when the buffer reaches
+`max_size` votes or every `flush_interval` seconds, whichever comes first.
+Votes that are still buffered when the process dies are lost, so the flush
+interval bounds how many seconds of votes a crash can lose.
+
+A failed flush puts its votes back in the buffer. After `max_retries`
+consecutive failures, flushes write the votes in halves until the ones that
+cannot be written (e.g. of a deleted user) are isolated, and drop them. The
+buffer holds at most `max_pending` votes, new votes are rejected beyond that.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+import sqlalchemy.exc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.exceptions import VoteBufferFullException
+from src.settings import settings
+from src.utils.session import async_session
+from src.votes.service import VoteService
+
+logger = logging.getLogger(__name__)
+
+# Errors caused by the votes written rather than by the database.
+_BAD_VOTE_ERRORS = (sqlalchemy.exc.IntegrityError, sqlalchemy.exc.DataError)
+
+
+class VoteBuffer:
+    """Coalesce votes in memory and flush them to the database in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_size: int,
+        flush_interval: float,
+        max_pending: int,
+        max_retries: int,
+    ):
+        self._session_factory = session_factory
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self._pending: dict[tuple[int, int], dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._consecutive_failures = 0
+        self._flushed_votes = 0
+        self._dropped_votes = 0
+        self._rejected_votes = 0
+        self._last_flush_duration = 0.0
+        self._max_flush_duration = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def add(
+        self, user_id: int, film_id: int, score: int, feedback: str | None = None
+    ) -> None:
+        """Buffer a vote, replacing any buffered vote of the user for the film.
+
+        Raises VoteBufferFullException if `max_pending` votes are buffered.
+        """
+        key = (user_id, film_id)
+        if key not in self._pending and len(self._pending) >= self.max_pending:
+            self._rejected_votes += 1
+            raise VoteBufferFullException()
+        self._pending[key] = {
+            "user_id": user_id,
+            "film_id": film_id,
+            "value": score,
+            "feedback": feedback,
+        }
+        if len(self._pending) >= self.max_size:
+            self._full.set()
+
+    async def flush(self) -> int:
+        """Write all buffered votes and return how many were written.
+
+        On failure or cancellation the votes not written yet are put back in
+        the buffer, unless a newer vote of the same user for the same film has
+        arrived in the meantime. After `max_retries` consecutive failures, the votes that
+        cannot be written are isolated and dropped.
+        """
+        async with self._lock:
+            self._full.clear()
+            if not self._pending:
+                return 0
+            votes, self._pending = self._pending, {}
+            start = time.perf_counter()
+            try:
+                if self._consecutive_failures < self.max_retries:
+                    written = await self._write(list(votes.values()))
+                else:
+                    written = await self._write_isolating(votes)
+            except asyncio.CancelledError:
+                self._pending = votes | self._pending
+                raise
+            except Exception:
+                self._failed_flushes += 1
+                self._consecutive_failures += 1
+                logger.exception(f"Failed to flush {len(votes)} votes.")
+                self._pending = votes | self._pending
+                raise
+            finally:
+                self._last_flush_duration = time.perf_counter() - start
+                self._max_flush_duration = max(
+                    self._max_flush_duration, self._last_flush_duration
+                )
+            self._flushes += 1
+            self._consecutive_failures = 0
+            self._flushed_votes += written
+            return written
+
+    async def _write(self, votes: list[dict[str, Any]]) -> int:
+        async with self._session_factory() as session:
+            return await VoteService(session).upsert_votes(votes)
+
+    async def _write_isolating(self, votes: dict[tuple[int, int], dict]) -> int:
+        """Write `votes` in halves until the failing ones are isolated.
+
+        Votes are removed from `votes` once written or dropped, so on other
+        errors it holds the votes left to write.
+        """
+        written = 0
+        batches = [list(votes)]
+        while batches:
+            keys = batches.pop()
+            try:
+                written += await self._write([votes[key] for key in keys])
+            except _BAD_VOTE_ERRORS as e:
+                if len(keys) > 1:
+                    middle = len(keys) // 2
+                    batches += [keys[middle:], keys[:middle]]
+                    continue
+                self._dropped_votes += 1
+                logger.error(f"Dropped vote {votes[keys[0]]}: {e}")
+            for key in keys:
+                del votes[key]
+        return written
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background flushes and drain the buffer.
+
+        A flush in progress is waited for.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.error(f"Lost {len(self._pending)} buffered votes.")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            flush = asyncio.ensure_future(self.flush())
+            try:
+                await asyncio.shield(flush)
+            except asyncio.CancelledError:
+                # Stopping: let the current flush finish, `stop` drains the rest.
+                await asyncio.gather(flush, return_exceptions=True)
+                raise
+            except Exception:
+                # Already logged, the votes are retried on the next flush.
+                pass
+
+    def metrics(self) -> dict[str, Any]:
+        """Return the queue depth and flush statistics of the buffer."""
+        return {
+            "running": self.running,
+            "queue_depth": len(self._pending),
+            "max_size": self.max_size,
+            "max_pending": self.max_pending,
+            "flush_interval": self.flush_interval,
+            "flushes": self._flushes,
+            "failed_flushes": self._failed_flushes,
+            "flushed_votes": self._flushed_votes,
+            "dropped_votes": self._dropped_votes,
+            "rejected_votes": self._rejected_votes,
+            "last_flush_duration": self._last_flush_duration,
+            "max_flush_duration": self._max_flush_duration,
+        }
+
+
+vote_buffer = VoteBuffer(
+    session_factory=async_session,
+    max_size=settings.VOTE_BUFFER_MAX_SIZE,
+    flush_interval=settings.VOTE_BUFFER_FLUSH_INTERVAL,
+    max_pending=settings.VOTE_BUFFER_MAX_PENDING,
+    max_retries=settings.VOTE_BUFFER_MAX_RETRIES,
+)
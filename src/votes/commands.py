@@ -0,0 +1,43 @@
+"""Maintenance commands of the votes app.
+
+Usage: python src/votes/commands.py rebuild-stats
+"""
+
+import argparse
+import asyncio
+import logging.config
+import sys
+from pathlib import Path
+
+# Insert the path to the root of your application at the beginning of sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.settings import settings  # noqa: E402
+from src.utils.session import async_session, engine  # noqa: E402
+from src.votes.service import VoteService  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_stats() -> None:
+    """Recompute the `film_vote_stats` table from the `votes` table."""
+    try:
+        async with async_session() as session:
+            await VoteService(session).rebuild_stats()
+    finally:
+        await engine.dispose()
+
+
+COMMANDS = {"rebuild-stats": rebuild_stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=COMMANDS)
+    args = parser.parse_args()
+    logging.config.dictConfig(settings.LOGGING_CONFIG)
+    asyncio.run(COMMANDS[args.command]())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""In-memory ranking of the top rated films.
+
+Films are ranked by their Bayesian average rating, i.e. their votes plus
+`prior_weight` votes of the average score of all films, so that films with a
+handful of votes do not outrank films with many. The ranking is computed from
+a snapshot of `film_vote_stats`, kept up to date by the votes written in this
+process and reloaded once older than `max_staleness` seconds to pick up the
+votes written by other processes.
+
+Deltas committed while a snapshot is being read may or may not be part of it,
+the snapshot is still kept: under steady voting every read overlaps a write,
+and the error is bounded by `max_staleness`. Readers reload under
+`reload_lock`, so that concurrent stale reads share a single reload.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Iterable, Mapping, NamedTuple
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RankedFilm(NamedTuple):
+    film_id: int
+    title: str
+    vote_count: int
+    average: float
+    score: float
+
+
+class FilmLeaderboard:
+    """Rank films by Bayesian average rating from a vote statistics snapshot."""
+
+    def __init__(self, max_staleness: float, prior_weight: int):
+        self.max_staleness = max_staleness
+        self.prior_weight = prior_weight
+        # film_id -> [title, vote_count, vote_sum]
+        self._stats: dict[int, list] = {}
+        self._loaded_at: float | None = None
+        self._ranking: list[RankedFilm] | None = None
+        self.reload_lock = asyncio.Lock()
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.max_staleness
+        )
+
+    def load(self, rows: Iterable[tuple[int, str, int, int]]) -> None:
+        """Replace the snapshot with (film_id, title, vote_count, vote_sum) rows."""
+        self._stats = {
+            film_id: [title, vote_count, vote_sum]
+            for film_id, title, vote_count, vote_sum in rows
+        }
+        self._ranking = None
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Drop the snapshot, the next read reloads it."""
+        self._loaded_at = None
+
+    def apply(self, deltas: Mapping[int, Mapping[str, int]]) -> None:
+        """Apply committed FilmVoteStats deltas ({film_id: {column: delta}})."""
+        if self._loaded_at is None:
+            return
+        for film_id, delta in deltas.items():
+            if film_id not in self._stats:
+                # The title of the film is not in the snapshot.
+                self.invalidate()
+                return
+            stats = self._stats[film_id]
+            stats[1] += delta.get("vote_count", 0)
+            stats[2] += delta.get("vote_sum", 0)
+        self._ranking = None
+
+    def top(self, limit: int) -> list[RankedFilm]:
+        """Return the `limit` best ranked films with at least one vote."""
+        if self._ranking is None:
+            self._ranking = self._rank()
+        return self._ranking[:limit]
+
+    def _rank(self) -> list[RankedFilm]:
+        total_count = sum(count for _, count, _ in self._stats.values())
+        if not total_count:
+            return []
+        mean = sum(total for _, _, total in self._stats.values()) / total_count
+        prior = self.prior_weight * mean
+        ranking = [
+            RankedFilm(
+                film_id=film_id,
+                title=title,
+                vote_count=count,
+                average=total / count,
+                score=(prior + total) / (self.prior_weight + count),
+            )
+            for film_id, (title, count, total) in self._stats.items()
+            if count > 0
+        ]
+        ranking.sort(key=lambda film: (-film.score, -film.vote_count, film.film_id))
+        return ranking
+
+
+film_leaderboard = FilmLeaderboard(
+    max_staleness=settings.FILM_LEADERBOARD_MAX_STALENESS,
+    prior_weight=settings.FILM_LEADERBOARD_PRIOR_WEIGHT,
+)
@@ -1,11 +1,16 @@
+from datetime import datetime
+
 from sqlalchemy import (
+    DateTime,
     ForeignKey,
+    Index,
     Integer,
     SmallInteger,
     String,
     UniqueConstraint,
 )
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
 
 from src.films.models import Film
 from src.models import Base, Timestamps
@@ -14,7 +19,16 @@ from src.users.models import User
 
 class Vote(Base, Timestamps):
     __tablename__ = "votes"
-    __table_args__ = (UniqueConstraint("user_id", "film_id", name="uq_vote_user_film"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "film_id", name="uq_vote_user_film"),
+        # Serves the substring search (ILIKE) in `VoteRepository.search`.
+        Index(
+            "ix_votes_feedback_trgm",
+            "feedback",
+            postgresql_using="gin",
+            postgresql_ops={"feedback": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -25,3 +39,47 @@ class Vote(Base, Timestamps):
     )
     value: Mapped[int] = mapped_column(SmallInteger)
     feedback: Mapped[str] = mapped_column(String, nullable=True)
+
+
+# Names Postgres gives the foreign keys of `votes`, as reported by violations.
+VOTE_FILM_FK = "votes_film_id_fkey"
+VOTE_USER_FK = "votes_user_id_fkey"
+
+# Scores a vote can have, each one has a histogram column in FilmVoteStats.
+SCORES = range(1, 6)
+# Columns of FilmVoteStats holding counters.
+COUNTER_COLUMNS = ("vote_count", "vote_sum", *(f"count_{score}" for score in SCORES))
+
+
+class FilmVoteStats(Base):
+    """Per film vote statistics, a read model of the `votes` table.
+
+    Rows are updated incrementally by `VoteService` in the same transaction as
+    the votes. Votes removed through cascades (e.g. deleted users) are not
+    accounted for, `python src/votes/commands.py rebuild-stats` recomputes
+    every row from the `votes` table.
+    """
+
+    __tablename__ = "film_vote_stats"
+
+    film_id: Mapped[int] = mapped_column(
+        ForeignKey(Film.id, ondelete="CASCADE"), primary_key=True
+    )
+    vote_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    vote_sum: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    count_1: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    count_2: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    count_3: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    count_4: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    count_5: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now()
+    )
+
+    @property
+    def average(self) -> float | None:
+        return self.vote_sum / self.vote_count if self.vote_count else None
+
+    @property
+    def histogram(self) -> dict[int, int]:
+        return {score: getattr(self, f"count_{score}") for score in SCORES}
@@ -1,5 +1,20 @@
+from typing import Any, Collection, Mapping, Sequence
+
+from sqlalchemy import (
+    Select,
+    bindparam,
+    case,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+
+from src.films.models import Film
 from src.repository import Repository
-from src.votes.model import Vote
+from src.votes.model import COUNTER_COLUMNS, SCORES, FilmVoteStats, Vote
 
 
 class VoteRepository(Repository[Vote]):
@@ -8,3 +23,155 @@ class VoteRepository(Repository[Vote]):
     _model = Vote
 
     SEARCH_QUERY_ATTR = "feedback"
+
+    async def upsert(self, votes: Sequence[Mapping[str, Any]]) -> Sequence[Vote]:
+        """Create or replace votes keyed by (user_id, film_id) in one statement.
+
+        Runs a single `INSERT ... ON CONFLICT (user_id, film_id) DO UPDATE ...
+        RETURNING` against `uq_vote_user_film`, so concurrent votes of a user
+        for the same film serialize on the row and the last one wins.
+        """
+        stmt = self._insert().values(list(votes))
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "film_id"],
+                set_={
+                    "value": stmt.excluded.value,
+                    "feedback": stmt.excluded.feedback,
+                    "updated_at": func.now(),
+                },
+            )
+            .returning(Vote)
+            .execution_options(populate_existing=True)
+        )
+        return (await self.session.scalars(stmt)).all()
+
+    async def value_of(self, id: int) -> int | None:
+        """Return the value of a vote, None if it does not exist."""
+        return await self.session.scalar(select(Vote.value).where(Vote.id == id))
+
+    async def values_by_user_film(
+        self, keys: Collection[tuple[int, int]]
+    ) -> dict[tuple[int, int], tuple[int, int]]:
+        """Map (user_id, film_id) pairs to the (film_id, value) of their votes.
+
+        Pairs without a vote are skipped.
+        """
+        if not keys:
+            return {}
+        stmt = select(Vote.user_id, Vote.film_id, Vote.value).where(
+            tuple_(Vote.user_id, Vote.film_id).in_(list(keys))
+        )
+        rows = (await self.session.execute(stmt)).tuples()
+        return {
+            (user_id, film_id): (film_id, value) for user_id, film_id, value in rows
+        }
+
+
+class FilmVoteStatsRepository(Repository[FilmVoteStats]):
+    """Film vote statistics repository."""
+
+    _model = FilmVoteStats
+
+    async def by_film(self, film_id: int) -> FilmVoteStats | None:
+        """Get the statistics of a film by its primary key."""
+        stmt = (
+            select(FilmVoteStats)
+            .where(FilmVoteStats.film_id == film_id)
+            .execution_options(populate_existing=True)
+        )
+        return await self.session.scalar(stmt)
+
+    async def with_titles(self) -> list[tuple[int, str, int, int]]:
+        """Return (film_id, title, vote_count, vote_sum) of films with votes."""
+        stmt = (
+            select(
+                FilmVoteStats.film_id,
+                Film.title,
+                FilmVoteStats.vote_count,
+                FilmVoteStats.vote_sum,
+            )
+            .join(Film, Film.id == FilmVoteStats.film_id)
+            .where(FilmVoteStats.vote_count > 0)
+        )
+        return list((await self.session.execute(stmt)).tuples().all())
+
+    async def lock(self, film_ids: Collection[int]) -> set[int]:
+        """Create the missing rows of `film_ids` and lock them (does not commit).
+
+        Vote writers for the same film serialize on these row locks until the
+        end of their transaction, so the previous votes they read stay valid.
+        Only films that exist get a row, their IDs are returned. Rows are
+        locked in film_id order to avoid deadlocks.
+        """
+        ids = sorted(set(film_ids))
+        if not ids:
+            return set()
+        return await self._lock_from(
+            select(Film.id).where(Film.id.in_(ids)).order_by(Film.id)
+        )
+
+    async def lock_for_vote(self, vote_id: int) -> int | None:
+        """Create and lock the row of the film of a vote, see `lock`.
+
+        Returns the ID of the film, None if there is no vote with this ID.
+        """
+        film_ids = await self._lock_from(select(Vote.film_id).where(Vote.id == vote_id))
+        return next(iter(film_ids), None)
+
+    async def _lock_from(self, film_ids: Select) -> set[int]:
+        """Create and lock the rows of the films selected by `film_ids`.
+
+        A single INSERT ... SELECT ... ON CONFLICT DO UPDATE, the no-op update
+        locking the existing rows.
+        """
+        stmt = self._insert().from_select(["film_id"], film_ids)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["film_id"], set_={"film_id": stmt.excluded.film_id}
+        ).returning(FilmVoteStats.film_id)
+        return set((await self.session.scalars(stmt)).all())
+
+    async def apply(self, deltas: Mapping[int, Mapping[str, int]]) -> None:
+        """Add `deltas` ({film_id: {column: delta}}) to locked rows.
+
+        Runs a single executemany UPDATE for all films.
+        """
+        if not deltas:
+            return
+        table = FilmVoteStats.__table__
+        stmt = (
+            update(table)
+            .where(table.c.film_id == bindparam("_film_id"))
+            .values(
+                {
+                    name: table.c[name] + bindparam(f"_{name}")
+                    for name in COUNTER_COLUMNS
+                }
+                | {"updated_at": func.now()}
+            )
+        )
+        await self.session.execute(
+            stmt,
+            [
+                {"_film_id": film_id}
+                | {f"_{name}": delta.get(name, 0) for name in COUNTER_COLUMNS}
+                for film_id, delta in deltas.items()
+            ],
+        )
+
+    async def rebuild(self) -> int:
+        """Recompute every row from the `votes` table (does not commit).
+
+        Returns the number of films with votes.
+        """
+        histogram = [
+            func.sum(case((Vote.value == score, 1), else_=0)) for score in SCORES
+        ]
+        aggregate = select(
+            Vote.film_id, func.count(), func.sum(Vote.value), *histogram
+        ).group_by(Vote.film_id)
+        await self.session.execute(delete(FilmVoteStats))
+        result = await self.session.execute(
+            insert(FilmVoteStats).from_select(["film_id", *COUNTER_COLUMNS], aggregate)
+        )
+        return result.rowcount
@@ -1,55 +1,171 @@
 """This module contains the characters router for the FastAPI application."""
 
+import http
 import logging
+import math
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
 
 from src.depends import VoteServiceDI, get_user_id
 from src.exceptions import (
-    ORMDuplicateException,
+    InvalidCursorException,
     ORMNotFoundException,
-    ServicePermissionDenied,
+    UnknownUserException,
+    VoteBufferFullException,
 )
+from src.repository import LoadProfile
+from src.settings import settings
+from src.utils.pagination import AFTER_CURSOR_DESCRIPTION, CountStrategy
 from src.utils.schemas import Page
-from src.votes.schemas import VoteOut
+from src.votes.buffer import vote_buffer
+from src.votes.schemas import (
+    VoteBatchIn,
+    VoteBatchItemOut,
+    VoteBatchStatus,
+    VoteBufferMetrics,
+    VoteIn,
+    VoteOut,
+    VoteQueued,
+)
 
 logger = logging.getLogger(__name__)
 
+# Sent with 503s when the vote buffer is full.
+RETRY_AFTER = {"Retry-After": str(math.ceil(settings.VOTE_BUFFER_FLUSH_INTERVAL))}
+
 votes_router = APIRouter(
     prefix="/votes",
     tags=["votes"],
 )
 
 
-@votes_router.post("/vote", description="Vote a film", response_model=VoteOut)
+@votes_router.post(
+    "/vote",
+    description="Vote a film",
+    response_model=VoteOut | VoteQueued,
+    responses={http.HTTPStatus.ACCEPTED.value: {"model": VoteQueued}},
+)
 async def vote_film(
     VoteServiceDI: VoteServiceDI,
+    vote_in: VoteIn,
+    response: Response,
     user_id: int = Depends(get_user_id),
-    vote_id: int = Body(..., ge=1),
-    score: int = Body(..., ge=1, le=5),
-    feedback: str | None = Body(None, max_length=500),
-) -> VoteOut:
-    """Fetch and store all characters in DB."""
+) -> VoteOut | VoteQueued:
+    """Create or update the vote of the authenticated user for a film.
+
+    With the vote buffer enabled the vote is queued and written later, and
+    votes for films that do not exist are dropped at flush time.
+    """
+    if settings.VOTE_BUFFER_ENABLED:
+        try:
+            vote_buffer.add(
+                user_id=user_id,
+                film_id=vote_in.film_id,
+                score=vote_in.score,
+                feedback=vote_in.feedback,
+            )
+        except VoteBufferFullException as e:
+            raise HTTPException(
+                status_code=e.status_code, detail=e.detail, headers=RETRY_AFTER
+            ) from e
+        response.status_code = http.HTTPStatus.ACCEPTED
+        return VoteQueued(
+            film_id=vote_in.film_id, value=vote_in.score, feedback=vote_in.feedback
+        )
+
     try:
         vote = await VoteServiceDI.vote(
-            vote_id=vote_id, user_id=user_id, score=score, feedback=feedback
+            film_id=vote_in.film_id,
+            user_id=user_id,
+            score=vote_in.score,
+            feedback=vote_in.feedback,
         )
-    except ORMDuplicateException as e:
-        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
-    except ServicePermissionDenied as e:
-        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+    except (ORMNotFoundException, UnknownUserException) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
 
     return VoteOut.model_validate(vote)
 
 
+@votes_router.post(
+    "/batch",
+    description="Vote many films at once",
+    response_model=list[VoteBatchItemOut],
+)
+async def vote_films(
+    VoteServiceDI: VoteServiceDI,
+    batch: VoteBatchIn,
+    user_id: int = Depends(get_user_id),
+) -> list[VoteBatchItemOut]:
+    """Create or update the votes of the authenticated user in one transaction.
+
+    Returns a result per vote, in the order of the request.
+    """
+    try:
+        written = await VoteServiceDI.vote_many(
+            user_id=user_id,
+            votes=[
+                {
+                    "film_id": vote.film_id,
+                    "value": vote.score,
+                    "feedback": vote.feedback,
+                }
+                for vote in batch.votes
+            ],
+        )
+    except UnknownUserException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+    last = {vote.film_id: i for i, vote in enumerate(batch.votes)}
+    results = []
+    for i, vote in enumerate(batch.votes):
+        if vote.film_id not in written:
+            result = VoteBatchItemOut(
+                film_id=vote.film_id, status=VoteBatchStatus.FILM_NOT_FOUND
+            )
+        elif last[vote.film_id] != i:
+            result = VoteBatchItemOut(
+                film_id=vote.film_id, status=VoteBatchStatus.SUPERSEDED
+            )
+        else:
+            result = VoteBatchItemOut(
+                film_id=vote.film_id,
+                status=VoteBatchStatus.WRITTEN,
+                vote=VoteOut.model_validate(written[vote.film_id]),
+            )
+        results.append(result)
+    return results
+
+
+@votes_router.get(
+    "/buffer/metrics",
+    description="GET vote buffer metrics",
+    response_model=VoteBufferMetrics,
+    dependencies=[Depends(get_user_id)],
+)
+async def vote_buffer_metrics() -> VoteBufferMetrics:
+    """Return the queue depth and flush statistics of the vote buffer."""
+    return VoteBufferMetrics(**vote_buffer.metrics())
+
+
 @votes_router.get("/", description="GET all votes", response_model=Page[VoteOut])
 async def list_films(
     VoteServiceDI: VoteServiceDI,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=1000),
+    after: str | None = Query(None, description=AFTER_CURSOR_DESCRIPTION),
+    include_total: bool = Query(True),
+    count_strategy: CountStrategy | None = Query(None),
 ) -> Page[VoteOut]:
     """Fetch and store all characters in DB."""
-    votes = await VoteServiceDI.list(page=page, page_size=page_size)
+    try:
+        votes = await VoteServiceDI.list(
+            page=page,
+            page_size=page_size,
+            after=after,
+            count_strategy=count_strategy if include_total else CountStrategy.NONE,
+            profile=LoadProfile.NONE,
+        )
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
     return votes
 
 
@@ -59,7 +175,7 @@ async def retrieve_vote(
 ) -> VoteOut:
     """Fetch and store all characters in DB."""
     try:
-        vote = await VoteServiceDI.get(id=id)
+        vote = await VoteServiceDI.get(id=id, profile=LoadProfile.NONE)
     except ORMNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail) from e
 
@@ -1,12 +1,56 @@
+import enum
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
+
+from src.settings import settings
+
+
+class VoteIn(BaseModel):
+    """Vote input schema."""
+
+    # `vote_id` is the historical name of this field.
+    film_id: int = Field(ge=1, validation_alias=AliasChoices("film_id", "vote_id"))
+    score: int = Field(ge=1, le=5)
+    feedback: str | None = Field(None, max_length=500)
+
+
+class VoteBatchIn(BaseModel):
+    """Batch of votes input schema, the last vote for a film wins."""
+
+    votes: list[VoteIn] = Field(min_length=1, max_length=settings.VOTE_BATCH_MAX_SIZE)
+
+
+class VoteQueued(BaseModel):
+    """Vote accepted by the vote buffer, written to the database later."""
+
+    film_id: int
+    value: int
+    feedback: str | None = None
+
+
+class VoteBufferMetrics(BaseModel):
+    """Vote buffer metrics schema."""
+
+    running: bool
+    queue_depth: int
+    max_size: int
+    max_pending: int
+    flush_interval: float
+    flushes: int
+    failed_flushes: int
+    flushed_votes: int
+    dropped_votes: int
+    rejected_votes: int
+    last_flush_duration: float
+    max_flush_duration: float
 
 
 class VoteOut(BaseModel):
     """Vote output schema."""
 
     id: int
+    film_id: int
     value: int
     feedback: str | None = None
     created_at: datetime | None = None
@@ -15,3 +59,44 @@ class VoteOut(BaseModel):
     model_config = {
         "from_attributes": True  # Allows parsing from ORM attributes in Pydantic v2
     }
+
+
+class FilmRatingOut(BaseModel):
+    """Film vote statistics schema."""
+
+    film_id: int
+    vote_count: int
+    vote_sum: int
+    average: float | None = None
+    histogram: dict[int, int]
+
+    model_config = {"from_attributes": True}
+
+
+class RankedFilmOut(BaseModel):
+    """Top rated film schema."""
+
+    film_id: int
+    title: str
+    vote_count: int
+    average: float
+    score: float
+
+    model_config = {"from_attributes": True}
+
+
+class VoteBatchStatus(str, enum.Enum):
+    """Outcome of a vote of a batch."""
+
+    WRITTEN = "written"
+    # A later vote of the batch for the same film won.
+    SUPERSEDED = "superseded"
+    FILM_NOT_FOUND = "film_not_found"
+
+
+class VoteBatchItemOut(BaseModel):
+    """Result of a vote of a batch, in the order of the input."""
+
+    film_id: int
+    status: VoteBatchStatus
+    vote: VoteOut | None = None
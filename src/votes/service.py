@@ -1,11 +1,13 @@
 import logging
+from collections import Counter, defaultdict
+from typing import Any, Iterable, Mapping, Sequence
 
+import sqlalchemy.exc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.exceptions import (
-    ServicePermissionDenied,
-)
+from src.exceptions import ORMNotFoundException, UnknownUserException
 from src.films.repository import FilmRepository
+from src.repository import violated_constraint
 from src.service import (
     CreateORMService,
     GetORMService,
@@ -13,12 +15,35 @@ from src.service import (
     UpdateORMService,
 )
 from src.users.repository import UserRepository
-from src.votes.model import Vote
-from src.votes.repository import VoteRepository
+from src.utils.iterables import chunked
+from src.utils.pagination import count_cache
+from src.votes.leaderboard import RankedFilm, film_leaderboard
+from src.votes.model import (
+    COUNTER_COLUMNS,
+    VOTE_FILM_FK,
+    VOTE_USER_FK,
+    FilmVoteStats,
+    Vote,
+)
+from src.votes.repository import FilmVoteStatsRepository, VoteRepository
 
 logger = logging.getLogger(__name__)
 
 
+def _stats_deltas(
+    added: Iterable[tuple[int, int]], removed: Iterable[tuple[int, int]]
+) -> dict[int, Counter]:
+    """Turn added and removed (film_id, value) votes into FilmVoteStats deltas."""
+    deltas: dict[int, Counter] = defaultdict(Counter)
+    for sign, votes in ((1, added), (-1, removed)):
+        for film_id, value in votes:
+            delta = deltas[film_id]
+            delta["vote_count"] += sign
+            delta["vote_sum"] += sign * value
+            delta[f"count_{value}"] += sign
+    return deltas
+
+
 class VoteService(
     CreateORMService[Vote],
     GetORMService[Vote],
@@ -30,26 +55,193 @@ class VoteService(
     def __init__(self, session: AsyncSession):
         self.session = session
         self._repository = VoteRepository(session)
+        self._stats_repository = FilmVoteStatsRepository(session)
         self._film_repository = FilmRepository(session)
         self._user_repository = UserRepository(session)
         super().__init__(repository=self._repository)
 
     async def vote(
-        self, vote_id: int, user_id: int, score: int, feedback: str | None = None
+        self, film_id: int, user_id: int, score: int, feedback: str | None = None
     ) -> Vote:
-        """Create or update a vote for a film."""
-        async with self.session.begin():
-            vote = await self.get(vote_id)
-            if vote.user_id != user_id:
-                raise ServicePermissionDenied(detail="Action not allowed.")
+        """Create or update the vote of a user for a film.
 
-            if vote is None:
-                v = Vote(
-                    user_id=user_id, film_id=vote_id, value=score, feedback=feedback
-                )
-                updated_vote = await self.create(obj=v)
-            else:
-                updated_vote = await self.update(
-                    id=vote.id, attrs={"value": score, "feedback": feedback}
+        Raises ORMNotFoundException if the film does not exist and
+        UnknownUserException if the user does not.
+        """
+        deltas: dict[int, Counter] = defaultdict(Counter)
+        try:
+            async with self.session.begin():
+                written = await self._write(
+                    [
+                        {
+                            "user_id": user_id,
+                            "film_id": film_id,
+                            "value": score,
+                            "feedback": feedback,
+                        }
+                    ],
+                    deltas,
                 )
-            return updated_vote
+        except sqlalchemy.exc.IntegrityError as e:
+            constraint = violated_constraint(e)
+            if constraint == VOTE_FILM_FK:
+                raise ORMNotFoundException(id=film_id) from e
+            if constraint == VOTE_USER_FK:
+                raise UnknownUserException(id=user_id) from e
+            raise
+        if not written:
+            raise ORMNotFoundException(id=film_id)
+        await self._publish(deltas)
+        return written[0]
+
+    async def vote_many(
+        self, user_id: int, votes: Sequence[Mapping[str, Any]]
+    ) -> dict[int, Vote]:
+        """Create or update the votes of a user for many films at once.
+
+        `votes` are dicts with film_id, value and feedback, the last vote for
+        a film wins. Everything is written in one transaction. Returns the
+        written votes by film ID, films that do not exist are skipped.
+
+        Raises UnknownUserException if the user does not exist.
+        """
+        try:
+            written = await self._upsert_known(
+                [{"user_id": user_id, **vote} for vote in votes]
+            )
+        except sqlalchemy.exc.IntegrityError as e:
+            if violated_constraint(e) == VOTE_USER_FK:
+                raise UnknownUserException(id=user_id) from e
+            raise
+        return {vote.film_id: vote for vote in written}
+
+    async def upsert_votes(self, votes: Sequence[Mapping[str, Any]]) -> int:
+        """Write many votes in one transaction, batched into multi-row upserts.
+
+        Votes for films that do not exist are dropped with a warning. Returns
+        the number of votes written.
+        """
+        return len(await self._upsert_known(votes))
+
+    async def update(self, id: int, attrs: dict) -> Vote:
+        """Update the value or feedback of a vote, and the film vote statistics.
+
+        Like other vote writers, the statistics row of the film is locked
+        before the vote. The update is committed and its statistics deltas are
+        published to the leaderboard.
+
+        Raises ORMNotFoundException if there is no vote with this ID and
+        ValueError on an attempt to move the vote to another user or film.
+        """
+        if moved := attrs.keys() & {"user_id", "film_id"}:
+            raise ValueError(f"Cannot update {sorted(moved)} of a vote.")
+        async with self.session.begin():
+            film_id = await self._stats_repository.lock_for_vote(id)
+            if film_id is None:
+                raise ORMNotFoundException(id=id)
+            previous = await self._repository.value_of(id)
+            vote = await self._repository.update(id=id, attrs=attrs)
+            deltas = _stats_deltas(
+                added=[(film_id, vote.value)], removed=[(film_id, previous)]
+            )
+            await self._stats_repository.apply(deltas)
+        film_leaderboard.apply(deltas)
+        return vote
+
+    async def rating(self, film_id: int) -> FilmVoteStats:
+        """Return the vote statistics of a film.
+
+        Raises ORMNotFoundException if the film does not exist.
+        """
+        stats = await self._stats_repository.by_film(film_id)
+        if stats is not None:
+            return stats
+        if not await self._film_repository.existing_ids([film_id]):
+            raise ORMNotFoundException(id=film_id)
+        return FilmVoteStats(film_id=film_id, **dict.fromkeys(COUNTER_COLUMNS, 0))
+
+    async def top_films(self, limit: int) -> list[RankedFilm]:
+        """Return the best films by Bayesian average rating.
+
+        Served from `film_leaderboard`, its snapshot of the film vote
+        statistics is reloaded when stale, once for all concurrent readers.
+        """
+        if film_leaderboard.stale:
+            async with film_leaderboard.reload_lock:
+                # Reloaded by another reader while waiting for the lock.
+                if film_leaderboard.stale:
+                    film_leaderboard.load(await self._stats_repository.with_titles())
+        return film_leaderboard.top(limit)
+
+    async def rebuild_stats(self) -> int:
+        """Recompute the vote statistics of every film from the votes.
+
+        Returns the number of films with votes.
+        """
+        async with self.session.begin():
+            films = await self._stats_repository.rebuild()
+        film_leaderboard.invalidate()
+        logger.info(f"Rebuilt vote statistics of {films} films.")
+        return films
+
+    async def _upsert_known(self, votes: Sequence[Mapping[str, Any]]) -> list[Vote]:
+        """Write the votes for existing films in one transaction.
+
+        Retried once if a film is deleted between its check and the write.
+        """
+        # A statement may not touch the same row twice, last one wins.
+        unique = {(vote["user_id"], vote["film_id"]): vote for vote in votes}
+        try:
+            return await self._upsert_existing(unique)
+        except sqlalchemy.exc.IntegrityError as e:
+            if violated_constraint(e) != VOTE_FILM_FK:
+                raise
+            logger.warning("A film was deleted while writing votes, retrying.")
+            return await self._upsert_existing(unique)
+
+    async def _upsert_existing(
+        self, unique: Mapping[tuple[int, int], Mapping[str, Any]]
+    ) -> list[Vote]:
+        deltas: dict[int, Counter] = defaultdict(Counter)
+        async with self.session.begin():
+            written = await self._write(list(unique.values()), deltas)
+        await self._publish(deltas)
+        return written
+
+    @staticmethod
+    async def _publish(deltas: Mapping[int, Mapping[str, int]]) -> None:
+        """Publish committed FilmVoteStats deltas to the caches of the votes.
+
+        The cached total of votes is dropped only when votes were added.
+        """
+        film_leaderboard.apply(deltas)
+        if any(delta.get("vote_count") for delta in deltas.values()):
+            await count_cache.invalidate(Vote.__tablename__)
+
+    async def _write(
+        self, votes: Sequence[Mapping[str, Any]], deltas: dict[int, Counter]
+    ) -> list[Vote]:
+        """Upsert unique votes and update the film vote statistics (does not commit).
+
+        Votes for films that do not exist are dropped with a warning. The
+        statistics deltas are added to `deltas`, to be published to the
+        leaderboard once committed.
+        """
+        known = await self._stats_repository.lock({vote["film_id"] for vote in votes})
+        rows = [vote for vote in votes if vote["film_id"] in known]
+        if dropped := len(votes) - len(rows):
+            logger.warning(f"Dropped {dropped} votes for unknown films.")
+        written: list[Vote] = []
+        for batch in chunked(rows, self._repository.UPSERT_BATCH_SIZE):
+            previous = await self._repository.values_by_user_film(
+                [(vote["user_id"], vote["film_id"]) for vote in batch]
+            )
+            written.extend(await self._repository.upsert(batch))
+            batch_deltas = _stats_deltas(
+                added=[(vote["film_id"], vote["value"]) for vote in batch],
+                removed=previous.values(),
+            )
+            await self._stats_repository.apply(batch_deltas)
+            for film_id, delta in batch_deltas.items():
+                deltas[film_id].update(delta)
+        return written
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from unittest.mock import patch
+
+import pytest
+import sqlalchemy.exc
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from conftest import FilmFactory, UserFactory
+from src.exceptions import VoteBufferFullException
+from src.votes.buffer import VoteBuffer
+from src.votes.model import Vote
+from src.votes.service import VoteService
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.anyio
+class TestVoteBuffer:
+    """Integration tests for the vote buffer."""
+
+    @pytest.fixture(autouse=True)
+    async def setup(self, engine, session: AsyncSession) -> None:
+        self.session = session
+        self.session_factory = async_sessionmaker(
+            engine, expire_on_commit=False, class_=AsyncSession
+        )
+        self.user = await UserFactory.create()
+        self.films = await FilmFactory.create_batch(2)
+        self.buffer = VoteBuffer(
+            session_factory=self.session_factory,
+            max_size=100,
+            flush_interval=60,
+            max_pending=100,
+            max_retries=1,
+        )
+
+    async def _votes(self) -> list[Vote]:
+        stmt = select(Vote).where(Vote.user_id == self.user.id).order_by(Vote.film_id)
+        return list((await self.session.scalars(stmt)).all())
+
+    async def test_flush_coalesces_votes(self) -> None:
+        """Test only the last buffered vote of a user for a film is written."""
+        film, other = self.films
+        self.buffer.add(user_id=self.user.id, film_id=film.id, score=1)
+        self.buffer.add(user_id=self.user.id, film_id=film.id, score=5, feedback="!")
+        self.buffer.add(user_id=self.user.id, film_id=other.id, score=2)
+        assert self.buffer.metrics()["queue_depth"] == 2
+
+        assert await self.buffer.flush() == 2
+
+        votes = await self._votes()
+        assert [(v.film_id, v.value, v.feedback) for v in votes] == [
+            (film.id, 5, "!"),
+            (other.id, 2, None),
+        ]
+        metrics = self.buffer.metrics()
+        assert metrics["queue_depth"] == 0
+        assert metrics["flushes"] == 1
+        assert metrics["flushed_votes"] == 2
+
+    async def test_flush_drops_unknown_films(self) -> None:
+        """Test votes for films that do not exist are not written."""
+        self.buffer.add(user_id=self.user.id, film_id=self.films[0].id, score=3)
+        self.buffer.add(user_id=self.user.id, film_id=999_999, score=3)
+
+        assert await self.buffer.flush() == 1
+        assert [v.film_id for v in await self._votes()] == [self.films[0].id]
+
+    async def test_failed_flush_keeps_votes(self) -> None:
+        """Test votes stay buffered when a flush fails."""
+
+        def broken_session_factory():
+            raise ConnectionError
+
+        buffer = VoteBuffer(
+            session_factory=broken_session_factory,
+            max_size=100,
+            flush_interval=60,
+            max_pending=100,
+            max_retries=1,
+        )
+        buffer.add(user_id=self.user.id, film_id=self.films[0].id, score=3)
+
+        with pytest.raises(ConnectionError):
+            await buffer.flush()
+
+        metrics = buffer.metrics()
+        assert metrics["queue_depth"] == 1
+        assert metrics["failed_flushes"] == 1
+
+    async def test_failed_flush_drops_bad_votes(self) -> None:
+        """Test votes that keep failing are isolated and dropped after retries."""
+        bad_user_id = 999_999
+        upsert_votes = VoteService.upsert_votes
+
+        async def fail_bad_user(service, votes):
+            if any(vote["user_id"] == bad_user_id for vote in votes):
+                raise sqlalchemy.exc.IntegrityError("INSERT", {}, Exception())
+            return await upsert_votes(service, votes)
+
+        for film in self.films:
+            self.buffer.add(user_id=self.user.id, film_id=film.id, score=2)
+        self.buffer.add(user_id=bad_user_id, film_id=self.films[0].id, score=2)
+
+        with patch.object(
+            VoteService, "upsert_votes", autospec=True, side_effect=fail_bad_user
+        ):
+            with pytest.raises(sqlalchemy.exc.IntegrityError):
+                await self.buffer.flush()
+            assert self.buffer.metrics()["queue_depth"] == 3
+
+            assert await self.buffer.flush() == 2
+
+        metrics = self.buffer.metrics()
+        assert metrics["queue_depth"] == 0
+        assert metrics["dropped_votes"] == 1
+        assert len(await self._votes()) == 2
+
+    async def test_add_rejects_when_full(self) -> None:
+        """Test new votes are rejected once `max_pending` votes are buffered."""
+        film, other = self.films
+        self.buffer.max_pending = 1
+        self.buffer.add(user_id=self.user.id, film_id=film.id, score=1)
+
+        with pytest.raises(VoteBufferFullException):
+            self.buffer.add(user_id=self.user.id, film_id=other.id, score=1)
+        # Replacing a buffered vote does not grow the buffer.
+        self.buffer.add(user_id=self.user.id, film_id=film.id, score=2)
+
+        metrics = self.buffer.metrics()
+        assert metrics["queue_depth"] == 1
+        assert metrics["rejected_votes"] == 1
+
+    async def test_flushes_when_full(self) -> None:
+        """Test the background task flushes as soon as the buffer is full."""
+        self.buffer.max_size = 2
+        self.buffer.start()
+        try:
+            for film in self.films:
+                self.buffer.add(user_id=self.user.id, film_id=film.id, score=4)
+            for _ in range(100):
+                if self.buffer.metrics()["flushes"]:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await self.buffer.stop()
+
+        assert self.buffer.metrics()["flushed_votes"] == 2
+        assert len(await self._votes()) == 2
+
+    async def test_stop_during_flush(self) -> None:
+        """Test stopping the buffer while it flushes loses no vote."""
+        upsert_votes = VoteService.upsert_votes
+        flushing, resume = asyncio.Event(), asyncio.Event()
+
+        async def slow_upsert_votes(service, votes):
+            flushing.set()
+            await resume.wait()
+            return await upsert_votes(service, votes)
+
+        self.buffer.max_size = 2
+        with patch.object(
+            VoteService, "upsert_votes", autospec=True, side_effect=slow_upsert_votes
+        ):
+            self.buffer.start()
+            for film in self.films:
+                self.buffer.add(user_id=self.user.id, film_id=film.id, score=4)
+            await asyncio.wait_for(flushing.wait(), 1)
+            stop = asyncio.create_task(self.buffer.stop())
+            await asyncio.sleep(0.01)
+            resume.set()
+            await stop
+
+        metrics = self.buffer.metrics()
+        assert metrics["flushed_votes"] == 2
+        assert metrics["queue_depth"] == 0
+        assert len(await self._votes()) == 2
+
+    async def test_cancelled_flush_keeps_votes(self) -> None:
+        """Test votes of a cancelled flush are put back in the buffer."""
+
+        async def hang(service, votes):
+            await asyncio.Event().wait()
+
+        self.buffer.add(user_id=self.user.id, film_id=self.films[0].id, score=4)
+        with patch.object(VoteService, "upsert_votes", autospec=True, side_effect=hang):
+            flush = asyncio.create_task(self.buffer.flush())
+            await asyncio.sleep(0.01)
+            flush.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await flush
+
+        assert self.buffer.metrics()["queue_depth"] == 1
+
+    async def test_stop_drains_buffer(self) -> None:
+        """Test stopping the buffer writes the buffered votes."""
+        self.buffer.start()
+        self.buffer.add(user_id=self.user.id, film_id=self.films[0].id, score=4)
+
+        await self.buffer.stop()
+
+        assert not self.buffer.running
+        assert len(await self._votes()) == 1
@@ -0,0 +1,204 @@
+import http
+import logging
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from conftest import FilmFactory, UserFactory
+from src.settings import settings
+from src.utils.jwt import JwtAuthenticationService
+from src.votes.buffer import vote_buffer
+from src.votes.leaderboard import film_leaderboard
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.anyio
+class TestVoteRouter:
+    """Integration tests for the vote router."""
+
+    path = "v1/votes/"
+
+    @pytest.fixture(autouse=True)
+    async def setup(self) -> None:
+        self.user = await UserFactory.create()
+        self.film = await FilmFactory.create()
+        token = JwtAuthenticationService().encode(user_id=self.user.id)
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def test_vote(self, client: AsyncClient) -> None:
+        """Test voting a film and voting it again."""
+        response = await client.post(
+            f"{self.path}vote",
+            json={"film_id": self.film.id, "score": 4, "feedback": "Nice"},
+            headers=self.headers,
+        )
+        assert response.status_code == http.HTTPStatus.OK
+        vote = response.json()
+        assert vote["film_id"] == self.film.id
+        assert vote["value"] == 4
+
+        response = await client.post(
+            f"{self.path}vote",
+            json={"film_id": self.film.id, "score": 2},
+            headers=self.headers,
+        )
+        assert response.status_code == http.HTTPStatus.OK
+        assert response.json()["id"] == vote["id"]
+        assert response.json()["value"] == 2
+
+    async def test_vote_legacy_field_name(self, client: AsyncClient) -> None:
+        """Test the film can still be sent as `vote_id`."""
+        response = await client.post(
+            f"{self.path}vote",
+            json={"vote_id": self.film.id, "score": 3},
+            headers=self.headers,
+        )
+        assert response.status_code == http.HTTPStatus.OK
+        assert response.json()["film_id"] == self.film.id
+
+    async def test_vote_invalid_score(self, client: AsyncClient) -> None:
+        """Test scores outside 1-5 are rejected."""
+        response = await client.post(
+            f"{self.path}vote",
+            json={"film_id": self.film.id, "score": 6},
+            headers=self.headers,
+        )
+        assert response.status_code == http.HTTPStatus.UNPROCESSABLE_ENTITY
+
+    async def test_vote_unauthenticated(self, client: AsyncClient) -> None:
+        """Test voting requires a bearer token."""
+        response = await client.post(
+            f"{self.path}vote", json={"film_id": self.film.id, "score": 4}
+        )
+        assert response.status_code == http.HTTPStatus.FORBIDDEN
+
+    async def test_vote_buffered(
+        self, client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test votes are queued when the vote buffer is enabled."""
+        monkeypatch.setattr(settings, "VOTE_BUFFER_ENABLED", True)
+        monkeypatch.setattr(vote_buffer, "_pending", {})
+
+        response = await client.post(
+            f"{self.path}vote",
+            json={"film_id": self.film.id, "score": 4},
+            headers=self.headers,
+        )
+        assert response.status_code == http.HTTPStatus.ACCEPTED
+        assert response.json() == {
+            "film_id": self.film.id,
+            "value": 4,
+            "feedback": None,
+        }
+
+        response = await client.get(f"{self.path}buffer/metrics")
+        assert response.status_code == http.HTTPStatus.FORBIDDEN
+
+        response = await client.get(f"{self.path}buffer/metrics", headers=self.headers)
+        assert response.status_code == http.HTTPStatus.OK
+        assert response.json()["queue_depth"] == 1
+
+    async def test_vote_buffer_full(
+        self, client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test votes are rejected with a 503 when the vote buffer is full."""
+        monkeypatch.setattr(settings, "VOTE_BUFFER_ENABLED", True)
+        monkeypatch.setattr(vote_buffer, "_pending", {})
+        monkeypatch.setattr(vote_buffer, "max_pending", 0)
+
+        response = await client.post(
+            f"{self.path}vote",
+            json={"film_id": self.film.id, "score": 4},
+            headers=self.headers,
+        )
+        assert response.status_code == http.HTTPStatus.SERVICE_UNAVAILABLE
+        assert "Retry-After" in response.headers
+
+    async def test_film_rating(self, client: AsyncClient) -> None:
+        """Test the film rating reflects the votes."""
+        await client.post(
+            f"{self.path}vote",
+            json={"film_id": self.film.id, "score": 4},
+            headers=self.headers,
+        )
+
+        response = await client.get(f"v1/film/{self.film.id}/rating/")
+        assert response.status_code == http.HTTPStatus.OK
+        assert response.json() == {
+            "film_id": self.film.id,
+            "vote_count": 1,
+            "vote_sum": 4,
+            "average": 4.0,
+            "histogram": {"1": 0, "2": 0, "3": 0, "4": 1, "5": 0},
+        }
+
+        response = await client.get("v1/film/999999/rating/")
+        assert response.status_code == http.HTTPStatus.NOT_FOUND
+
+    async def test_top_films(self, client: AsyncClient, session: AsyncSession) -> None:
+        """Test top films are ranked and follow the votes of this process."""
+        film_id = self.film.id
+        film_leaderboard.invalidate()
+        await client.post(
+            f"{self.path}vote",
+            json={"film_id": film_id, "score": 5},
+            headers=self.headers,
+        )
+
+        response = await client.get("v1/film/top/", params={"limit": 100})
+        assert response.status_code == http.HTTPStatus.OK
+        films = {film["film_id"]: film for film in response.json()}
+        assert films[film_id]["title"] == self.film.title
+        assert films[film_id]["average"] == 5
+
+        # The client shares one session across requests, end the read.
+        await session.rollback()
+        await client.post(
+            f"{self.path}vote",
+            json={"film_id": film_id, "score": 1},
+            headers=self.headers,
+        )
+        response = await client.get("v1/film/top/", params={"limit": 100})
+        films = {film["film_id"]: film for film in response.json()}
+        assert films[film_id]["vote_count"] == 1
+        assert films[film_id]["average"] == 1
+
+    async def test_vote_batch(self, client: AsyncClient) -> None:
+        """Test voting many films returns a result per vote."""
+        film_id = self.film.id
+        response = await client.post(
+            f"{self.path}batch",
+            json={
+                "votes": [
+                    {"film_id": film_id, "score": 1},
+                    {"film_id": 999_999, "score": 3},
+                    {"film_id": film_id, "score": 5, "feedback": "Better"},
+                ]
+            },
+            headers=self.headers,
+        )
+        assert response.status_code == http.HTTPStatus.OK
+        results = response.json()
+        assert [(r["film_id"], r["status"]) for r in results] == [
+            (film_id, "superseded"),
+            (999_999, "film_not_found"),
+            (film_id, "written"),
+        ]
+        assert results[2]["vote"]["value"] == 5
+        assert results[2]["vote"]["feedback"] == "Better"
+
+    async def test_vote_batch_validation(self, client: AsyncClient) -> None:
+        """Test a batch is rejected as a whole when a vote is invalid."""
+        response = await client.post(
+            f"{self.path}batch",
+            json={"votes": [{"film_id": self.film.id, "score": 4}, {"score": 4}]},
+            headers=self.headers,
+        )
+        assert response.status_code == http.HTTPStatus.UNPROCESSABLE_ENTITY
+
+        response = await client.post(
+            f"{self.path}batch", json={"votes": []}, headers=self.headers
+        )
+        assert response.status_code == http.HTTPStatus.UNPROCESSABLE_ENTITY
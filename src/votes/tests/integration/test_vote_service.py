@@ -0,0 +1,278 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import sqlalchemy.exc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from conftest import FilmFactory, InMemoryRedis, UserFactory, VoteFactory
+from src.exceptions import ORMNotFoundException, UnknownUserException
+from src.votes.leaderboard import FilmLeaderboard
+from src.votes.model import VOTE_FILM_FK, VOTE_USER_FK, Vote
+from src.votes.service import VoteService
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.anyio
+class TestVoteService:
+    """Integration tests for the vote service."""
+
+    entities: list[Vote]
+
+    @pytest.fixture(autouse=True)
+    async def setup(self, session: AsyncSession) -> None:
+        self.user = await UserFactory.create()
+        self.films = await FilmFactory.create_batch(3)
+        self.entities = [
+            await VoteFactory.create(user_id=self.user.id, film_id=film.id, value=3)
+            for film in self.films
+        ]
+        self.service = VoteService(session=session)
+
+    async def test_update(self) -> None:
+        """Test updating a vote returns the new values."""
+        vote = self.entities[0]
+        updated = await self.service.update(
+            id=vote.id, attrs={"value": 5, "feedback": "Great"}
+        )
+        assert updated.id == vote.id
+        assert updated.value == 5
+        assert updated.feedback == "Great"
+
+    async def test_update_ignores_read_only_columns(self) -> None:
+        """Test read-only columns are not updated."""
+        vote = self.entities[0]
+        updated = await self.service.update(id=vote.id, attrs={"id": 0, "value": 1})
+        assert updated.id == vote.id
+        assert updated.value == 1
+
+    async def test_update_unknown_attribute(self) -> None:
+        """Test updating an unknown attribute is rejected."""
+        with pytest.raises(ValueError):
+            await self.service.update(id=self.entities[0].id, attrs={"score": 5})
+
+    async def test_update_not_found(self) -> None:
+        """Test updating a missing vote raises not found."""
+        with pytest.raises(ORMNotFoundException):
+            await self.service.update(id=999999999, attrs={"value": 5})
+
+    async def test_vote_creates_vote(self) -> None:
+        """Test voting a film for the first time creates a vote."""
+        film = await FilmFactory.create()
+        vote = await self.service.vote(
+            film_id=film.id, user_id=self.user.id, score=4, feedback="Nice"
+        )
+        assert vote.id is not None
+        assert vote.film_id == film.id
+        assert vote.user_id == self.user.id
+        assert vote.value == 4
+        assert vote.feedback == "Nice"
+
+    @pytest.mark.parametrize("new, invalidated", [(True, True), (False, False)])
+    async def test_vote_invalidates_cached_count(
+        self, redis: InMemoryRedis, new: bool, invalidated: bool
+    ) -> None:
+        """Test only new votes drop the cached total of votes."""
+        film = await FilmFactory.create() if new else self.films[0]
+        redis.data["count:votes"] = b"3"
+        await self.service.vote(film_id=film.id, user_id=self.user.id, score=4)
+        assert ("count:votes" not in redis.data) is invalidated
+
+    async def test_vote_replaces_existing_vote(self) -> None:
+        """Test voting a film again updates the same vote."""
+        existing = self.entities[0]
+        vote = await self.service.vote(
+            film_id=existing.film_id, user_id=self.user.id, score=1
+        )
+        assert vote.id == existing.id
+        assert vote.value == 1
+        assert vote.feedback is None
+
+    async def test_vote_updates_rating(self) -> None:
+        """Test new and replaced votes are reflected in the film rating."""
+        film = await FilmFactory.create()
+        other_user = await UserFactory.create()
+        await self.service.vote(film_id=film.id, user_id=self.user.id, score=2)
+        await self.service.vote(film_id=film.id, user_id=other_user.id, score=5)
+        await self.service.vote(film_id=film.id, user_id=self.user.id, score=4)
+
+        stats = await self.service.rating(film_id=film.id)
+        assert stats.vote_count == 2
+        assert stats.vote_sum == 9
+        assert stats.average == 4.5
+        assert stats.histogram == {1: 0, 2: 0, 3: 0, 4: 1, 5: 1}
+
+    async def test_upsert_votes_updates_rating(self) -> None:
+        """Test batched votes are reflected in the film rating."""
+        film = await FilmFactory.create()
+        other_user = await UserFactory.create()
+        written = await self.service.upsert_votes(
+            [
+                {"user_id": self.user.id, "film_id": film.id, "value": 1},
+                {"user_id": other_user.id, "film_id": film.id, "value": 3},
+                {"user_id": self.user.id, "film_id": film.id, "value": 5},
+            ]
+        )
+        assert written == 2
+
+        stats = await self.service.rating(film_id=film.id)
+        assert stats.vote_count == 2
+        assert stats.histogram == {1: 0, 2: 0, 3: 1, 4: 0, 5: 1}
+
+    async def test_update_updates_rating(self) -> None:
+        """Test updating the value of a vote is reflected in the film rating."""
+        film = await FilmFactory.create()
+        vote = await self.service.vote(film_id=film.id, user_id=self.user.id, score=2)
+        await self.service.update(id=vote.id, attrs={"value": 3})
+
+        stats = await self.service.rating(film_id=film.id)
+        assert stats.vote_count == 1
+        assert stats.vote_sum == 3
+        assert stats.histogram == {1: 0, 2: 0, 3: 1, 4: 0, 5: 0}
+
+    async def test_update_publishes_deltas(self) -> None:
+        """Test updating a vote publishes the statistics deltas to the leaderboard."""
+        film = await FilmFactory.create()
+        vote = await self.service.vote(film_id=film.id, user_id=self.user.id, score=2)
+
+        with patch("src.votes.service.film_leaderboard") as leaderboard:
+            await self.service.update(id=vote.id, attrs={"value": 5})
+
+        (deltas,) = leaderboard.apply.call_args.args
+        assert deltas == {
+            film.id: {"vote_count": 0, "vote_sum": 3, "count_2": -1, "count_5": 1}
+        }
+
+    async def test_update_film(self) -> None:
+        """Test a vote cannot be moved to another film."""
+        with pytest.raises(ValueError):
+            await self.service.update(
+                id=self.entities[0].id, attrs={"film_id": self.films[1].id}
+            )
+
+    async def test_vote_unknown_film(self) -> None:
+        """Test voting a film that does not exist raises not found."""
+        with pytest.raises(ORMNotFoundException):
+            await self.service.vote(film_id=999_999, user_id=self.user.id, score=4)
+
+    async def test_top_films_reloads_once(self) -> None:
+        """Test concurrent stale reads share a single reload."""
+
+        async def with_titles():
+            await asyncio.sleep(0.01)
+            return [(1, "A", 1, 5)]
+
+        leaderboard = FilmLeaderboard(max_staleness=60, prior_weight=0)
+        reload = AsyncMock(side_effect=with_titles)
+        with (
+            patch("src.votes.service.film_leaderboard", leaderboard),
+            patch.object(self.service._stats_repository, "with_titles", reload),
+        ):
+            tops = await asyncio.gather(
+                *(self.service.top_films(limit=1) for _ in range(3))
+            )
+
+        reload.assert_awaited_once()
+        assert [[film.film_id for film in top] for top in tops] == [[1]] * 3
+
+    async def test_rebuild_stats(self) -> None:
+        """Test rebuilding computes the rating of votes written directly."""
+        await self.service.rebuild_stats()
+
+        stats = await self.service.rating(film_id=self.films[0].id)
+        assert stats.vote_count == 1
+        assert stats.average == 3
+        assert stats.histogram[3] == 1
+
+    async def test_rating_without_votes(self) -> None:
+        """Test the rating of a film without votes is empty."""
+        film = await FilmFactory.create()
+        stats = await self.service.rating(film_id=film.id)
+        assert stats.vote_count == 0
+        assert stats.average is None
+
+    async def test_rating_unknown_film(self) -> None:
+        """Test the rating of a film that does not exist raises."""
+        with pytest.raises(ORMNotFoundException):
+            await self.service.rating(film_id=999_999)
+
+    @pytest.mark.parametrize(
+        "constraint, exception",
+        [
+            (VOTE_FILM_FK, ORMNotFoundException),
+            (VOTE_USER_FK, UnknownUserException),
+            ("uq_vote_user_film", sqlalchemy.exc.IntegrityError),
+        ],
+    )
+    async def test_vote_integrity_error(self, constraint, exception) -> None:
+        """Test only foreign key violations are mapped, by constraint name."""
+        # As raised by psycopg, the constraint is reported in `diag`.
+        orig = Exception()
+        orig.diag = SimpleNamespace(constraint_name=constraint)
+        error = sqlalchemy.exc.IntegrityError("INSERT", {}, orig)
+        with (
+            patch.object(self.service._repository, "upsert", side_effect=error),
+            pytest.raises(exception),
+        ):
+            await self.service.vote(
+                film_id=self.films[0].id, user_id=self.user.id, score=4
+            )
+
+    async def test_vote_many(self) -> None:
+        """Test voting many films writes the last vote of each known film."""
+        film = await FilmFactory.create()
+        existing = self.entities[0]
+        written = await self.service.vote_many(
+            user_id=self.user.id,
+            votes=[
+                {"film_id": film.id, "value": 1, "feedback": None},
+                {"film_id": existing.film_id, "value": 5, "feedback": "Again"},
+                {"film_id": film.id, "value": 2, "feedback": None},
+                {"film_id": 999_999, "value": 2, "feedback": None},
+            ],
+        )
+        assert written.keys() == {film.id, existing.film_id}
+        assert written[film.id].value == 2
+        assert written[existing.film_id].id == existing.id
+        assert written[existing.film_id].value == 5
+
+    async def test_vote_many_retries_deleted_film(self) -> None:
+        """Test votes are retried once when a film is deleted while writing."""
+        film_id = (await FilmFactory.create()).id
+        upsert = self.service._repository.upsert
+        calls = 0
+
+        async def fail_once(batch):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                orig = Exception()
+                orig.diag = SimpleNamespace(constraint_name=VOTE_FILM_FK)
+                raise sqlalchemy.exc.IntegrityError("INSERT", {}, orig)
+            return await upsert(batch)
+
+        with patch.object(self.service._repository, "upsert", side_effect=fail_once):
+            written = await self.service.vote_many(
+                user_id=self.user.id,
+                votes=[{"film_id": film_id, "value": 4, "feedback": None}],
+            )
+
+        assert calls == 2
+        assert written[film_id].value == 4
+
+    async def test_vote_many_unknown_user(self) -> None:
+        """Test voting as a user that does not exist raises."""
+        orig = Exception()
+        orig.diag = SimpleNamespace(constraint_name=VOTE_USER_FK)
+        error = sqlalchemy.exc.IntegrityError("INSERT", {}, orig)
+        with (
+            patch.object(self.service._repository, "upsert", side_effect=error),
+            pytest.raises(UnknownUserException),
+        ):
+            await self.service.vote_many(
+                user_id=self.user.id,
+                votes=[{"film_id": self.films[0].id, "value": 4, "feedback": None}],
+            )
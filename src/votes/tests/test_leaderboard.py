@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.votes.leaderboard import FilmLeaderboard
+
+
+@pytest.mark.anyio
+class TestFilmLeaderboard:
+    """Tests for FilmLeaderboard."""
+
+    async def test_ranks_by_bayesian_average(self):
+        leaderboard = FilmLeaderboard(max_staleness=60, prior_weight=2)
+        # The mean score is 2.7, a single 5 does not beat many 4s.
+        leaderboard.load(
+            [(1, "A", 1, 5), (2, "B", 10, 40), (3, "C", 9, 9), (4, "D", 0, 0)]
+        )
+
+        top = leaderboard.top(limit=10)
+
+        assert [film.film_id for film in top] == [2, 1, 3]
+        assert top[0].average == 4
+        assert top[0].score == pytest.approx((2 * 2.7 + 40) / 12)
+        assert leaderboard.top(limit=1) == top[:1]
+
+    async def test_apply_updates_ranking(self):
+        leaderboard = FilmLeaderboard(max_staleness=60, prior_weight=0)
+        leaderboard.load([(1, "A", 1, 5), (2, "B", 1, 4)])
+        assert leaderboard.top(limit=1)[0].film_id == 1
+
+        leaderboard.apply({1: {"vote_sum": -4, "count_5": -1, "count_1": 1}})
+
+        assert leaderboard.top(limit=1)[0].film_id == 2
+        assert not leaderboard.stale
+
+    async def test_apply_unknown_film_invalidates(self):
+        leaderboard = FilmLeaderboard(max_staleness=60, prior_weight=0)
+        leaderboard.load([(1, "A", 1, 5)])
+
+        leaderboard.apply({2: {"vote_count": 1, "vote_sum": 3}})
+
+        assert leaderboard.stale
+
+    async def test_snapshot_goes_stale(self):
+        leaderboard = FilmLeaderboard(max_staleness=30, prior_weight=0)
+        assert leaderboard.stale
+        with patch("src.votes.leaderboard.time.monotonic", return_value=100.0):
+            leaderboard.load([])
+        with patch("src.votes.leaderboard.time.monotonic", return_value=130.0):
+            assert not leaderboard.stale
+        with patch("src.votes.leaderboard.time.monotonic", return_value=131.0):
+            assert leaderboard.stale
+
+    async def test_load_across_apply_is_kept(self):
+        leaderboard = FilmLeaderboard(max_staleness=60, prior_weight=0)
+        # Committed while the rows are read, they may already include it.
+        leaderboard.apply({1: {"vote_count": 1, "vote_sum": 5}})
+
+        leaderboard.load([(1, "A", 1, 5)])
+
+        assert not leaderboard.stale
+        assert [film.film_id for film in leaderboard.top(limit=1)] == [1]